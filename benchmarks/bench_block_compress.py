@@ -0,0 +1,93 @@
+# 对比 gztar/xztar 的块并行压缩与 shutil.make_archive 的单线程路径。
+# 在仓库根目录运行: python -m benchmarks.bench_block_compress --size 256 --workers 8
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from zip_gui.blockcompress import DEFAULT_BLOCK_SIZE
+from zip_gui.packer import pack_archive
+
+
+def make_corpus(root, size_mb, seed=0):
+    """生成一半文本 (易压缩)、一半随机数据 (难压缩) 的测试目录"""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(2000)]
+    corpus = os.path.join(root, "corpus")
+    os.makedirs(corpus)
+    per_file = 4 * 1024 * 1024
+    for i in range(max(1, size_mb * 1024 * 1024 // per_file)):
+        path = os.path.join(corpus, f"file{i:04d}")
+        with open(path, "wb") as f:
+            if i % 2 == 0:
+                text = " ".join(rng.choice(words) for _ in range(per_file // 6))
+                f.write(text.encode()[:per_file])
+            else:
+                f.write(rng.randbytes(per_file))
+    return corpus
+
+
+def run(archive_format, root, out_dir, workers, block_size):
+    results = []
+    started = time.perf_counter()
+    path = shutil.make_archive(
+        os.path.join(out_dir, f"shutil_{archive_format}"),
+        archive_format,
+        root_dir=root,
+        base_dir="corpus",
+    )
+    results.append(("shutil", time.perf_counter() - started, os.path.getsize(path)))
+
+    started = time.perf_counter()
+    path = pack_archive(
+        os.path.join(out_dir, f"block_{archive_format}"),
+        archive_format,
+        root,
+        "corpus",
+        workers=workers,
+        block_size=block_size,
+    )
+    results.append(
+        (f"block x{workers}", time.perf_counter() - started, os.path.getsize(path))
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="块并行压缩与 shutil.make_archive 的对比"
+    )
+    parser.add_argument("--size", type=int, default=128, help="测试数据大小 (MB)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--block-size", type=int, default=DEFAULT_BLOCK_SIZE // (1024 * 1024), help="MB"
+    )
+    parser.add_argument("--formats", nargs="+", default=["gztar", "xztar"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        make_corpus(root, args.size)
+        out_dir = os.path.join(root, "out")
+        os.makedirs(out_dir)
+        print(f"{'format':<8} {'method':<12} {'seconds':>9} {'MB/s':>8} {'size MB':>9}")
+        for archive_format in args.formats:
+            baseline = None
+            for method, seconds, size in run(
+                archive_format,
+                root,
+                out_dir,
+                args.workers,
+                args.block_size * 1024 * 1024,
+            ):
+                baseline = baseline or seconds
+                print(
+                    f"{archive_format:<8} {method:<12} {seconds:9.2f}"
+                    f" {args.size / seconds:8.1f} {size / 1024 / 1024:9.1f}"
+                    f"  (x{baseline / seconds:.2f})"
+                )
+
+
+if __name__ == "__main__":
+    main()
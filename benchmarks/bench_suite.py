@@ -0,0 +1,328 @@
+# 打包、解压和列出内容的吞吐量基准: 生成几种典型形状的测试目录，对 shutil.get_archive_formats()
+# 中的每种格式分别计时，结果 (墙钟时间、CPU 时间、峰值内存、MB/s、压缩率) 保存为 JSON，
+# 并可以与之前的结果对比、标出超过阈值的退化。界面的 PackWorker / UnpackWorker 只是在线程中
+# 调用同样的 pack_archive / unpack_archive，这里直接测引擎，不需要 Qt。
+# 在仓库根目录运行:
+#   python -m benchmarks.bench_suite run --scale 0.25 -o baseline.json
+#   python -m benchmarks.bench_suite run -o new.json --compare baseline.json
+#   python -m benchmarks.bench_suite compare baseline.json new.json --threshold 10
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from zip_gui import fastio
+from zip_gui.packer import pack_archive
+from zip_gui.unpacker import list_archive, unpack_archive
+
+MB = 1024 * 1024
+OPERATIONS = ("pack", "unpack", "list")
+
+# 对比时检查的指标，数值越大越差
+_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss", "ratio")
+_TIME_METRICS = ("wall_seconds", "cpu_seconds")
+
+
+def _text(rng, size) -> bytes:
+    # 由有限词表组成的文本，压缩率与源代码、日志相近
+    words = [f"w{rng.randrange(5000)}" for _ in range(4096)]
+    out = bytearray()
+    while len(out) < size:
+        out += (" ".join(rng.sample(words, 12)) + "\n").encode()
+    return bytes(out[:size])
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _tiny(root, rng, scale):
+    # 大量 0 ~ 2 KB 的小文件，分布在若干子目录中: 测试每条目的固定开销
+    count = max(10, int(4000 * scale))
+    for i in range(count):
+        size = rng.randrange(2048)
+        data = _text(rng, size) if i % 2 else rng.randbytes(size)
+        _write(os.path.join(root, f"d{i % 40:02d}", f"f{i:05d}.txt"), data)
+
+
+def _huge(root, rng, scale):
+    # 少量大文件 (一半文本一半随机数据): 测试大块读写和 mmap / 内核复制路径
+    size = max(MB, int(96 * MB * scale))
+    block = _text(rng, MB)
+    with open(os.path.join(root, "text.bin"), "wb") as f:
+        for _ in range(size // MB):
+            f.write(block)
+    with open(os.path.join(root, "random.bin"), "wb") as f:
+        for _ in range(size // MB):
+            f.write(rng.randbytes(MB))
+
+
+def _random(root, rng, scale):
+    # 无法压缩的数据: 测试自适应存储和纯吞吐
+    for i in range(16):
+        _write(os.path.join(root, f"r{i:02d}.dat"), rng.randbytes(int(4 * MB * scale)))
+
+
+def _text_corpus(root, rng, scale):
+    # 高度可压缩的文本
+    for i in range(16):
+        _write(os.path.join(root, f"t{i:02d}.log"), _text(rng, int(4 * MB * scale)))
+
+
+def _deep(root, rng, scale):
+    # 很深的目录层级，每层几个小文件: 测试扫描和路径处理
+    depth = max(4, int(64 * min(1.0, scale * 4)))
+    path = root
+    for level in range(depth):
+        path = os.path.join(path, f"level{level:03d}")
+        for i in range(3):
+            _write(os.path.join(path, f"file{i}.txt"), _text(rng, rng.randrange(8192)))
+
+
+CORPORA = {
+    "tiny": _tiny,
+    "huge": _huge,
+    "random": _random,
+    "text": _text_corpus,
+    "deep": _deep,
+}
+
+
+def make_corpus(parent, name, scale, seed=0) -> int:
+    """在 parent/name 下生成测试目录 (同样的 seed 结果相同)，返回数据总字节数"""
+    root = os.path.join(parent, name)
+    os.makedirs(root)
+    CORPORA[name](root, random.Random(f"{seed}-{name}"), scale)
+    total = 0
+    for dirpath, _dirnames, filenames in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(dirpath, n)) for n in filenames)
+    return total
+
+
+def measure(func, repeat=1, setup=None):
+    """
+    运行 repeat 次，返回墙钟时间最短的一次的 (墙钟秒数, CPU 秒数, 峰值内存, 返回值)。
+    setup 在每次运行前调用，不计入时间。
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        fastio.reset_peak_rss()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        result = func()
+        run = (
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            fastio.peak_rss() or 0,
+            result,
+        )
+        if best is None or run[0] < best[0]:
+            best = run
+    return best
+
+
+def bench_format(work, corpus, data_bytes, archive_format, args) -> list:
+    """对一个测试目录和一种格式依次测试打包、解压和列出内容"""
+    results = []
+    base_name = os.path.join(work, "out", f"{corpus}_{archive_format}")
+    extract_dir = os.path.join(work, "extract")
+
+    def record(operation, wall, cpu, rss, archive_bytes):
+        results.append(
+            {
+                "corpus": corpus,
+                "format": archive_format,
+                "operation": operation,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4),
+                "peak_rss": rss,
+                "mb_per_s": round(data_bytes / MB / wall, 2) if wall else None,
+                "input_bytes": data_bytes,
+                "archive_bytes": archive_bytes,
+                "ratio": round(archive_bytes / data_bytes, 4) if data_bytes else None,
+            }
+        )
+
+    wall, cpu, rss, archive = measure(
+        lambda: pack_archive(
+            base_name, archive_format, work, corpus, workers=args.workers
+        ),
+        args.repeat,
+    )
+    size = os.path.getsize(archive)
+    if "pack" in args.operations:
+        record("pack", wall, cpu, rss, size)
+
+    if "unpack" in args.operations:
+        wall, cpu, rss, _report = measure(
+            lambda: unpack_archive(archive, extract_dir, workers=args.workers),
+            args.repeat,
+            # 删除上一次解压的结果不计入时间
+            setup=lambda: shutil.rmtree(extract_dir, ignore_errors=True),
+        )
+        record("unpack", wall, cpu, rss, size)
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+    if "list" in args.operations:
+        wall, cpu, rss, _members = measure(lambda: list_archive(archive), args.repeat)
+        record("list", wall, cpu, rss, size)
+    os.remove(archive)
+    return results
+
+
+def run_suite(args) -> dict:
+    formats = args.formats or [name for name, _ in shutil.get_archive_formats()]
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work:
+        os.makedirs(os.path.join(work, "out"))
+        for corpus in args.corpora:
+            data_bytes = make_corpus(work, corpus, args.scale, args.seed)
+            print(f"# {corpus}: {data_bytes / MB:.1f} MB", file=sys.stderr)
+            for archive_format in formats:
+                for row in bench_format(work, corpus, data_bytes, archive_format, args):
+                    results.append(row)
+                    print(_format_row(row), file=sys.stderr)
+            shutil.rmtree(os.path.join(work, corpus))
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "workers": args.workers,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def _format_row(row) -> str:
+    speed = row["mb_per_s"]
+    return (
+        f"{row['corpus']:<7} {row['format']:<8} {row['operation']:<7}"
+        f" {row['wall_seconds']:8.3f}s cpu {row['cpu_seconds']:8.3f}s"
+        f" {speed if speed is not None else 0:9.1f} MB/s"
+        f" rss {row['peak_rss'] / MB:7.1f} MB ratio {row['ratio'] or 0:.3f}"
+    )
+
+
+def compare(base, new, threshold=10.0, min_seconds=0.05) -> list:
+    """
+    逐项对比两次结果，返回 [(键, 指标, 旧值, 新值, 变化百分比), ...] 中超过 threshold% 的退化。
+    两次都短于 min_seconds 的计时只是噪声，不参与比较。
+    """
+    old = {_key(row): row for row in base["results"]}
+    regressions = []
+    for row in new["results"]:
+        before = old.get(_key(row))
+        if before is None:
+            continue
+        for metric in _METRICS:
+            a, b = before.get(metric), row.get(metric)
+            if not a or b is None:
+                continue
+            if metric in _TIME_METRICS and max(a, b) < min_seconds:
+                continue
+            change = (b - a) / a * 100
+            if change > threshold:
+                regressions.append((_key(row), metric, a, b, change))
+    return regressions
+
+
+def _key(row):
+    return (row["corpus"], row["format"], row["operation"])
+
+
+def _report_regressions(regressions, threshold) -> int:
+    if not regressions:
+        print(f"没有超过 {threshold:g}% 的退化")
+        return 0
+    print(f"{len(regressions)} 项退化超过 {threshold:g}%:")
+    for (corpus, archive_format, operation), metric, a, b, change in regressions:
+        print(
+            f"  {corpus:<7} {archive_format:<8} {operation:<7} {metric:<13}"
+            f" {a:>12g} -> {b:<12g} (+{change:.1f}%)"
+        )
+    return 1
+
+
+def _load(path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _add_compare_arguments(parser):
+    parser.add_argument("--threshold", type=float, default=10.0, help="退化阈值 (%%)")
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="两次都短于该秒数的计时不参与比较",
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="打包 / 解压 / 列出内容的吞吐量基准")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="运行基准并输出 JSON")
+    run.add_argument(
+        "--corpora", nargs="+", choices=sorted(CORPORA), default=list(CORPORA)
+    )
+    run.add_argument(
+        "--formats", nargs="+", help="默认为 shutil.get_archive_formats() 中的全部格式"
+    )
+    run.add_argument(
+        "--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS)
+    )
+    run.add_argument(
+        "--scale", type=float, default=1.0, help="测试数据大小倍数 (1 约为 64~200 MB)"
+    )
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    run.add_argument("--repeat", type=int, default=1, help="每项重复次数，取最快的一次")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--work-dir", help="生成测试数据的目录 (默认为系统临时目录)")
+    run.add_argument("-o", "--output", help="结果 JSON 文件 (默认输出到标准输出)")
+    run.add_argument("--compare", metavar="BASE", help="与之前的结果 JSON 对比")
+    _add_compare_arguments(run)
+
+    cmp = commands.add_parser("compare", help="对比两次结果，有退化时返回 1")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    _add_compare_arguments(cmp)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = compare(
+            _load(args.base), _load(args.new), args.threshold, args.min_seconds
+        )
+        return _report_regressions(regressions, args.threshold)
+
+    suite = run_suite(args)
+    text = json.dumps(suite, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        regressions = compare(
+            _load(args.compare), suite, args.threshold, args.min_seconds
+        )
+        return _report_regressions(regressions, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
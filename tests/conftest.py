@@ -0,0 +1,68 @@
+import os
+import random
+import struct
+import zipfile
+
+import pytest
+
+from zip_gui.packer import ARCHIVE_EXTENSIONS
+
+# 已安装 zstandard / lz4 时包含 zstdtar 和 lz4tar
+ALL_FORMATS = sorted(ARCHIVE_EXTENSIONS)
+TAR_FORMATS = [name for name in ALL_FORMATS if name != "zip"]
+
+# 并行块压缩测试使用较小的块，让几百 KB 的源目录也能切成多个 gzip 成员 / xz 流
+SMALL_BLOCK = 64 * 1024
+
+
+def make_tree(root):
+    """生成覆盖常见情况的源目录: 可压缩的文本、随机数据、空文件、空目录和多级子目录"""
+    rng = random.Random(1234)
+    os.makedirs(os.path.join(root, "docs", "deep", "er"))
+    os.makedirs(os.path.join(root, "empty"))
+    for i in range(20):
+        with open(os.path.join(root, "docs", f"note{i}.txt"), "w") as f:
+            f.write(f"line {i}\n" * (i * 50))
+    with open(os.path.join(root, "docs", "deep", "er", "random.bin"), "wb") as f:
+        f.write(rng.randbytes(300_000))
+    with open(os.path.join(root, "docs", "deep", "text.log"), "wb") as f:
+        f.write(b"repeated log line\n" * 20_000)
+    open(os.path.join(root, "zero.dat"), "wb").close()
+    return root
+
+
+def snapshot(root) -> dict:
+    """相对路径 -> 文件内容 (目录为 None)，用于比较打包前后的目录"""
+    result = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        for name in dirnames:
+            result[os.path.normpath(os.path.join(rel, name))] = None
+        for name in filenames:
+            with open(os.path.join(dirpath, name), "rb") as f:
+                result[os.path.normpath(os.path.join(rel, name))] = f.read()
+    return result
+
+
+def corrupt_zip_member(path, name):
+    """翻转 zip 中某个条目压缩数据中间的一个字节，中央目录保持不变"""
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(name)
+    with open(path, "r+b") as f:
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack("<HH", f.read(4))
+        offset = (
+            info.header_offset + 30 + name_len + extra_len + info.compress_size // 2
+        )
+        f.seek(offset)
+        byte = f.read(1)[0]
+        f.seek(offset)
+        f.write(bytes([byte ^ 0xFF]))
+
+
+@pytest.fixture
+def source(tmp_path):
+    """(root_dir, base_dir): 打包 root_dir 下的 base_dir，与 shutil.make_archive 的参数一致"""
+    root_dir = tmp_path / "src"
+    make_tree(root_dir / "data")
+    return str(root_dir), "data"
@@ -0,0 +1,74 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+
+import pytest
+
+from zip_gui.blockcompress import ParallelBlockWriter
+from zip_gui.fastcodecs import open_tar, open_tar_stream
+from zip_gui.packer import ARCHIVE_EXTENSIONS, pack_archive
+from zip_gui.unpacker import unpack_archive, unpack_stream
+
+from .conftest import SMALL_BLOCK, snapshot
+
+# 块并行压缩写出的格式 -> (编码, 每个块开头的文件头)
+BLOCK_FORMATS = {
+    "gztar": ("gzip", b"\x1f\x8b"),
+    "bztar": ("bzip2", b"BZh"),
+    "xztar": ("xz", b"\xfd7zXZ\x00"),
+}
+_DECOMPRESS = {"gzip": gzip.decompress, "bzip2": bz2.decompress, "xz": lzma.decompress}
+
+
+@pytest.mark.parametrize("codec", ["gzip", "bzip2", "xz"])
+def test_blocks_are_concatenated_streams(codec):
+    data = os.urandom(100_000) * 3
+    out = io.BytesIO()
+    with ParallelBlockWriter(out, codec, block_size=SMALL_BLOCK, workers=4) as writer:
+        writer.write(data)
+    assert _DECOMPRESS[codec](out.getvalue()) == data
+
+
+@pytest.fixture(params=sorted(BLOCK_FORMATS))
+def parallel_archive(request, source, tmp_path):
+    archive_format = request.param
+    archive = pack_archive(
+        str(tmp_path / "out"),
+        archive_format,
+        *source,
+        workers=4,
+        block_size=SMALL_BLOCK,
+    )
+    assert archive.endswith(ARCHIVE_EXTENSIONS[archive_format])
+    magic = BLOCK_FORMATS[archive_format][1]
+    with open(archive, "rb") as f:
+        # 确实由多个成员 / 流组成，否则下面的测试没有意义
+        assert f.read().count(magic) > 1
+    return archive
+
+
+def test_parallel_output_seekable_read(parallel_archive, source, tmp_path):
+    root_dir, base_dir = source
+    expected = snapshot(os.path.join(root_dir, base_dir))
+    with tarfile.open(parallel_archive, "r:*") as tf:
+        names = {m.name for m in tf.getmembers()}
+    assert f"{base_dir}/docs/deep/er/random.bin" in names
+    with open(parallel_archive, "rb") as raw, open_tar(raw) as tf:
+        assert {m.name for m in tf} == names
+    unpack_archive(parallel_archive, tmp_path / "seek")
+    assert snapshot(tmp_path / "seek" / base_dir) == expected
+
+
+def test_parallel_output_streaming_read(parallel_archive, source, tmp_path):
+    root_dir, base_dir = source
+    with open(parallel_archive, "rb") as raw, open_tar_stream(raw) as tf:
+        names = [m.name for m in tf]
+    assert f"{base_dir}/docs/deep/er/random.bin" in names
+    with open(parallel_archive, "rb") as raw:
+        unpack_stream(raw, tmp_path / "stream")
+    assert snapshot(tmp_path / "stream" / base_dir) == snapshot(
+        os.path.join(root_dir, base_dir)
+    )
@@ -0,0 +1,115 @@
+import os
+import threading
+
+import pytest
+
+from zip_gui.packer import pack_archive
+from zip_gui.progress import JobCancelled, JobControl
+from zip_gui.unpacker import unpack_archive
+
+from .conftest import ALL_FORMATS, snapshot
+
+# 小缓冲区让每个任务都有足够多的检查点
+BUFFER_SIZE = 16 * 1024
+
+
+def _cancel_midway(control):
+    """返回进度回调: 第一次报告进度时取消任务 (回调限频，小目录只会收到一两次)"""
+
+    def on_progress(info):
+        control.cancel()
+
+    return on_progress
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("archive_format", ALL_FORMATS)
+def test_cancel_pack(archive_format, workers, source, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    control = JobControl()
+    seen = []
+
+    def on_progress(info):
+        seen.extend(os.listdir(out))
+        control.cancel()
+
+    with pytest.raises(JobCancelled):
+        pack_archive(
+            str(out / "archive"),
+            archive_format,
+            *source,
+            workers=workers,
+            buffer_size=BUFFER_SIZE,
+            control=control,
+            progress_callback=on_progress,
+        )
+    # 取消时正在写临时文件 (.part)，取消后它被删除，也没有生成目标压缩包
+    assert [name for name in seen if name.endswith(".part")]
+    assert os.listdir(out) == []
+
+
+def test_cancel_keeps_previous_archive(source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source)
+    with open(archive, "rb") as f:
+        before = f.read()
+    control = JobControl()
+    with pytest.raises(JobCancelled):
+        pack_archive(
+            str(tmp_path / "archive"),
+            "zip",
+            *source,
+            incremental=True,
+            buffer_size=BUFFER_SIZE,
+            control=control,
+            progress_callback=_cancel_midway(control),
+        )
+    with open(archive, "rb") as f:
+        assert f.read() == before
+    assert sorted(os.listdir(tmp_path)) == ["archive.zip", "src"]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("archive_format", ["zip", "gztar"])
+def test_cancel_unpack(archive_format, workers, source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), archive_format, *source)
+    control = JobControl()
+    out = tmp_path / "out"
+    with pytest.raises(JobCancelled):
+        unpack_archive(
+            archive,
+            str(out),
+            workers=workers,
+            buffer_size=BUFFER_SIZE,
+            control=control,
+            progress_callback=_cancel_midway(control),
+        )
+    # 已解压的文件保留，写了一半的文件被删除: 留下的每个文件都与源文件相同
+    full = snapshot(os.path.join(*source))
+    extracted = snapshot(out / "data") if (out / "data").exists() else {}
+    assert len(extracted) < len(full)
+    for name, data in extracted.items():
+        assert data == full[name]
+
+
+def test_pause_and_resume(source, tmp_path):
+    control = JobControl()
+    paused = []
+
+    def on_progress(info):
+        if not paused:
+            paused.append(info)
+            control.pause()
+            threading.Timer(0.2, control.resume).start()
+
+    archive = pack_archive(
+        str(tmp_path / "archive"),
+        "zip",
+        *source,
+        buffer_size=BUFFER_SIZE,
+        control=control,
+        progress_callback=on_progress,
+    )
+    assert control.paused_seconds() >= 0.15
+    unpack_archive(archive, str(tmp_path / "out"))
+    assert snapshot(tmp_path / "out" / "data") == snapshot(os.path.join(*source))
@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+from zip_gui.packer import PackStats, pack_archive
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "symlink") or os.name == "nt", reason="需要符号链接"
+)
+
+
+@pytest.fixture
+def linked_source(source):
+    root = os.path.join(*source)
+    os.symlink("zero.dat", os.path.join(root, "empty_link"))
+    os.symlink(os.path.join("docs", "deep", "text.log"), os.path.join(root, "log_link"))
+    os.symlink("missing", os.path.join(root, "dangling"))
+    return source
+
+
+def _pack(source, tmp_path, workers):
+    stats = PackStats()
+    progress = []
+    pack_archive(
+        str(tmp_path / "archive"),
+        "zip",
+        *source,
+        workers=workers,
+        incremental=True,
+        stats=stats,
+        progress_callback=progress.append,
+    )
+    return stats, progress[-1]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_unchanged_links_are_reused(linked_source, tmp_path, workers):
+    _stats, first = _pack(linked_source, tmp_path, workers)
+    # 第一次打包读取了链接指向的内容，总量中也计入了这部分
+    assert first.done_bytes == first.total_bytes
+    stats, second = _pack(linked_source, tmp_path, workers)
+    assert stats.compressed_files == 0
+    assert stats.reused_files == 25  # 23 个文件和 2 个链接，无效链接被跳过
+    assert second.done_bytes == second.total_bytes
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_changed_links_are_recompressed(linked_source, tmp_path, workers):
+    root = os.path.join(*linked_source)
+    _pack(linked_source, tmp_path, workers)
+    later = time.time() + 10
+    # 重新指向另一个文件 (链接被重建，修改时间变化)
+    os.remove(os.path.join(root, "empty_link"))
+    os.symlink(os.path.join("docs", "note3.txt"), os.path.join(root, "empty_link"))
+    os.utime(os.path.join(root, "empty_link"), (later, later), follow_symlinks=False)
+    # 目标文件被修改
+    target = os.path.join(root, "docs", "deep", "text.log")
+    with open(target, "ab") as f:
+        f.write(b"appended\n")
+    os.utime(target, (later, later))
+    stats, _progress = _pack(linked_source, tmp_path, workers)
+    assert stats.compressed_files == 3  # 两个链接和被修改的 text.log
@@ -0,0 +1,16 @@
+import pytest
+
+from zip_gui.jobs import RESOURCE_CPU, RESOURCE_IO, pack_job, unpack_job
+
+from .conftest import ALL_FORMATS
+
+
+@pytest.mark.parametrize("archive_format", ALL_FORMATS)
+def test_pack_resource(archive_format):
+    job = pack_job("out", archive_format, ".", "src")
+    expected = RESOURCE_IO if archive_format == "tar" else RESOURCE_CPU
+    assert job.resource == expected
+
+
+def test_unpack_is_io_bound():
+    assert unpack_job("a.zip", "out").resource == RESOURCE_IO
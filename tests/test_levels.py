@@ -0,0 +1,92 @@
+import io
+import os
+
+import pytest
+
+from zip_gui.packer import PackStats, compression_levels, pack_archive, pack_stream
+
+
+@pytest.mark.parametrize(
+    "archive_format, method, level",
+    [
+        ("zip", "bzip2", 0),
+        ("zip", "deflate", 42),
+        ("zip", "zstd", 23),
+        ("gztar", None, 42),
+        ("xztar", None, -1),
+    ],
+)
+@pytest.mark.parametrize("workers", [1, 4])
+def test_out_of_range_level_is_rejected(
+    archive_format, method, level, workers, source, tmp_path
+):
+    low, high, _default = compression_levels(archive_format, method)
+    message = f"必须在 {low} 到 {high} 之间"
+    with pytest.raises(ValueError, match=message):
+        pack_archive(
+            str(tmp_path / "archive"),
+            archive_format,
+            *source,
+            method=method,
+            level=level,
+            workers=workers,
+        )
+    # 没有留下临时文件或不完整的压缩包
+    assert sorted(os.listdir(tmp_path)) == ["src"]
+    with pytest.raises(ValueError, match=message):
+        pack_stream(io.BytesIO(), archive_format, *source, method=method, level=level)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_bzip2_level_is_honored(workers, source, tmp_path):
+    sizes = []
+    for level in (1, 9):
+        archive = pack_archive(
+            str(tmp_path / f"level{level}"),
+            "zip",
+            *source,
+            method="bzip2",
+            level=level,
+            workers=workers,
+            adaptive=False,
+        )
+        sizes.append(os.path.getsize(archive))
+    # 级别 1 使用 100 KB 的块，重复的日志压缩得更差
+    assert sizes[0] > sizes[1]
+
+
+def test_level_ignored_without_compression(source, tmp_path):
+    # tar 和存储方式没有压缩级别，与之前一样忽略
+    pack_archive(str(tmp_path / "plain"), "tar", *source, level=42)
+    pack_archive(str(tmp_path / "stored"), "zip", *source, method="stored", level=42)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_incremental_recompresses_when_level_changes(workers, source, tmp_path):
+    def pack(level):
+        stats = PackStats()
+        archive = pack_archive(
+            str(tmp_path / "archive"),
+            "zip",
+            *source,
+            level=level,
+            workers=workers,
+            incremental=True,
+            stats=stats,
+        )
+        return stats, os.path.getsize(archive)
+
+    first, fast_size = pack(1)
+    assert first.compressed_files > 0
+    # 级别不变: 压缩过的条目全部复用
+    same, _size = pack(1)
+    assert same.compressed_files == 0
+    assert same.reused_files == first.compressed_files + first.stored_files
+    # 级别改变: 压缩过的条目按新的级别重新压缩，只复用存储的条目
+    changed, best_size = pack(9)
+    assert changed.compressed_files == first.compressed_files
+    assert changed.reused_files == first.stored_files
+    assert best_size < fast_size
+    # 不指定级别等同于默认级别 6，与上次的 9 不同
+    assert pack(None)[0].compressed_files == first.compressed_files
+    assert pack(6)[0].compressed_files == 0
@@ -0,0 +1,51 @@
+import os
+import zipfile
+
+import pytest
+
+from zip_gui.packer import pack_archive
+from zip_gui.unpacker import ExtractionError, unpack_archive
+
+from .conftest import corrupt_zip_member, snapshot
+
+# 按压缩包中的顺序排列；分散在不同大小的条目上，并行时会落到不同的线程
+CORRUPTED = [
+    "data/docs/deep/er/random.bin",
+    "data/docs/deep/text.log",
+    "data/docs/note5.txt",
+]
+
+
+@pytest.mark.parametrize("workers", [2, 4, 8])
+def test_parallel_zip_matches_serial(workers, source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source)
+    serial = unpack_archive(archive, str(tmp_path / "serial"), workers=1)
+    parallel = unpack_archive(archive, str(tmp_path / "parallel"), workers=workers)
+    assert snapshot(tmp_path / "parallel") == snapshot(tmp_path / "serial")
+    # 条目统计同样按压缩包中的顺序排列
+    assert [m.name for m in parallel.members] == [m.name for m in serial.members]
+    assert parallel.written_bytes == serial.written_bytes
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_parallel_failures_in_archive_order(workers, source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source)
+    for name in CORRUPTED:
+        corrupt_zip_member(archive, name)
+    runs = []
+    for run in range(3):
+        out = tmp_path / f"out{run}"
+        with pytest.raises(ExtractionError) as excinfo:
+            unpack_archive(archive, str(out), workers=workers)
+        runs.append([name for name, _message in excinfo.value.failures])
+        # 其余条目照常解压，损坏的条目不留下写了一半的文件
+        written = snapshot(out / "data")
+        full = snapshot(os.path.join(*source))
+        assert sorted(written) == sorted(
+            name for name in full if f"data/{name}" not in CORRUPTED
+        )
+        assert all(written[name] == full[name] for name in written)
+    assert runs == [CORRUPTED] * 3
+    # 串行解压在第一个损坏的条目处停止，与并行报告的第一项一致
+    with pytest.raises(zipfile.BadZipFile, match=CORRUPTED[0]):
+        unpack_archive(archive, str(tmp_path / "serial"), workers=1)
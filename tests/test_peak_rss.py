@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from zip_gui import fastio
+from zip_gui.packer import PackStats, pack_archive
+from zip_gui.progress import JobCancelled, JobControl
+from zip_gui.unpacker import unpack_archive
+
+pytestmark = pytest.mark.skipif(
+    fastio.peak_rss() is None, reason="无法获取峰值常驻内存"
+)
+
+
+def test_single_job_reports_peak(source, tmp_path):
+    stats = PackStats()
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source, stats=stats)
+    assert stats.peak_rss > 0
+    assert unpack_archive(archive, str(tmp_path / "out")).peak_rss > 0
+
+
+def test_overlapping_jobs_report_no_peak(source, tmp_path):
+    # 两个任务同时运行: 峰值属于整个进程，不能算作其中任何一个
+    barrier = threading.Barrier(2, timeout=10)
+    results = {}
+
+    def run(name):
+        stats = PackStats()
+        waited = []
+
+        def on_progress(info):
+            if not waited:
+                waited.append(info)
+                barrier.wait()
+
+        pack_archive(
+            str(tmp_path / name),
+            "zip",
+            *source,
+            stats=stats,
+            progress_callback=on_progress,
+        )
+        results[name] = stats.peak_rss
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"a": 0, "b": 0}
+
+    # 外层任务在内层任务开始后同样无法区分
+    with fastio.PeakRssMeter() as outer:
+        report = unpack_archive(str(tmp_path / "a.zip"), str(tmp_path / "out"))
+    assert report.peak_rss == 0
+    assert outer.peak is None
+
+
+def test_cancelled_job_releases_meter(source, tmp_path):
+    control = JobControl()
+    control.cancel()
+    with pytest.raises(JobCancelled):
+        pack_archive(str(tmp_path / "archive"), "zip", *source, control=control)
+    # 取消的任务退出后不再算作运行中，之后的任务照常测量
+    with fastio.PeakRssMeter() as meter:
+        pass
+    assert meter.peak > 0
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+from zip_gui.preflight import (
+    DEFAULT_MAX_RATIO,
+    RATIO_MIN_BYTES,
+    SuspiciousRatio,
+    preflight_archive,
+)
+from zip_gui.unpacker import unpack_archive
+
+# 解压后刚好超过不检查压缩比的下限，全零的数据压缩后只有几百 KB
+BOMB_SIZE = RATIO_MIN_BYTES + 16 * 1024 * 1024
+_CHUNK = b"\0" * (1024 * 1024)
+
+
+class _Zeros:
+    """只读的全零文件对象，供 tarfile.addfile 读取"""
+
+    def __init__(self, size):
+        self.remaining = size
+
+    def read(self, size=-1):
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        self.remaining -= size
+        return bytes(size)
+
+
+def _write_zip_bomb(path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        with zf.open("zeros.bin", "w", force_zip64=True) as dest:
+            for _ in range(BOMB_SIZE // len(_CHUNK)):
+                dest.write(_CHUNK)
+
+
+def _write_tar_bomb(path):
+    with tarfile.open(path, "w:gz", compresslevel=1) as tf:
+        info = tarfile.TarInfo("zeros.bin")
+        info.size = BOMB_SIZE
+        tf.addfile(info, _Zeros(BOMB_SIZE))
+
+
+@pytest.fixture(scope="module", params=["zip", "gztar"])
+def bomb(request, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("bomb")
+    if request.param == "zip":
+        path = str(directory / "bomb.zip")
+        _write_zip_bomb(path)
+    else:
+        path = str(directory / "bomb.tar.gz")
+        _write_tar_bomb(path)
+    return path
+
+
+def test_preflight_refuses_bomb(bomb, tmp_path):
+    with pytest.raises(SuspiciousRatio) as excinfo:
+        preflight_archive(bomb, str(tmp_path))
+    report = excinfo.value.report
+    assert report.total_bytes == BOMB_SIZE
+    assert report.ratio > DEFAULT_MAX_RATIO
+    assert report.largest == [("zeros.bin", BOMB_SIZE)]
+    # 关闭压缩比检查后只比较磁盘空间
+    assert not preflight_archive(bomb, str(tmp_path), max_ratio=0).suspicious
+
+
+def test_unpack_writes_nothing_for_bomb(bomb, tmp_path):
+    extract_dir = tmp_path / "out"
+    with pytest.raises(SuspiciousRatio):
+        unpack_archive(
+            bomb, str(extract_dir), preflight=True, max_ratio=DEFAULT_MAX_RATIO
+        )
+    assert not extract_dir.exists() or not os.listdir(extract_dir)
+
+
+def test_cli_preflight_reports_bomb(bomb, tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-m", "zip_gui.cli", "preflight", bomb, "-d", str(tmp_path)],
+        capture_output=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    assert result.returncode == 1
+    assert "疑似解压炸弹" in result.stderr.decode()
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from zip_gui.packer import ARCHIVE_EXTENSIONS, pack_archive
+from zip_gui.unpacker import unpack_archive
+from zip_gui.verify import test_archive as verify_archive
+
+from .conftest import ALL_FORMATS, SMALL_BLOCK, snapshot
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("archive_format", ALL_FORMATS)
+def test_pack_unpack_round_trip(archive_format, workers, source, tmp_path):
+    progress = []
+    archive = pack_archive(
+        str(tmp_path / "archive"),
+        archive_format,
+        *source,
+        workers=workers,
+        block_size=SMALL_BLOCK,
+        progress_callback=progress.append,
+    )
+    assert archive.endswith(ARCHIVE_EXTENSIONS[archive_format])
+    assert progress[-1].percent == 100
+    result = verify_archive(archive, workers=workers)
+    assert result.ok, result.bad
+    report = unpack_archive(archive, str(tmp_path / "out"), workers=workers)
+    expected = snapshot(os.path.join(*source))
+    assert report.written_bytes == sum(len(data or b"") for data in expected.values())
+    assert snapshot(tmp_path / "out" / "data") == expected
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from zip_gui.archive_index import select_zip_infos
+from zip_gui.packer import pack_archive
+from zip_gui.unpacker import MemberSelector, unpack_archive
+from zip_gui.zipraw import MemberReader
+
+from .conftest import snapshot
+
+NOTES = [f"data/docs/note{i}.txt" for i in range(20)]
+
+
+def test_member_selector():
+    selector = MemberSelector(["data/zero.dat", "data/docs/deep/", "*.log", "  "])
+    assert selector("data/zero.dat")
+    assert selector("./data/zero.dat")
+    assert selector("data/docs/deep/er/random.bin")
+    assert selector("data/other/app.log")
+    assert not selector("data/docs/note1.txt")
+    assert not selector("data/docs/deep")  # 只选中目录下的条目
+    assert not selector.complete  # 有目录和通配符时必须读完整个 tar
+
+    # 不带 "/" 的名称按遇到的条目判断是文件还是目录
+    selector = MemberSelector(["data/docs"])
+    assert not selector.complete
+    assert selector("data/docs/", is_dir=True)
+    assert selector("data/docs/note1.txt")
+    assert not selector("data/docs2.txt")
+    assert not selector.complete  # 目录下的条目仍可能出现在后面
+
+    # 只选了文件时，全部找到后 tar 可以提前结束
+    selector = MemberSelector(["data/zero.dat", "data/docs/note1.txt"])
+    assert selector("data/zero.dat") and not selector.complete
+    assert selector("data/docs/note1.txt") and selector.complete
+
+    assert not MemberSelector(["", " "])
+
+
+def test_select_zip_infos_and_member_reader(source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source)
+    selector = MemberSelector(["data/docs/note1*"])
+    infos = select_zip_infos(archive, selector)
+    assert [info.filename for info in infos] == [
+        "data/docs/note1.txt",
+        *(f"data/docs/note{i}.txt" for i in range(10, 20)),
+    ]
+    with MemberReader(archive) as reader:
+        for info in infos:
+            with reader.open(info) as src:
+                with open(os.path.join(*source, info.filename[5:]), "rb") as f:
+                    assert src.read() == f.read()
+
+
+def _written(extract_dir) -> list:
+    return sorted(
+        name for name, data in snapshot(extract_dir).items() if data is not None
+    )
+
+
+@pytest.mark.parametrize(
+    "members, expected",
+    [
+        (["data/docs/note3.txt"], ["data/docs/note3.txt"]),
+        (
+            ["data/docs/deep"],
+            ["data/docs/deep/er/random.bin", "data/docs/deep/text.log"],
+        ),
+        (
+            ["data/docs/deep/"],
+            ["data/docs/deep/er/random.bin", "data/docs/deep/text.log"],
+        ),
+        (["*.txt"], NOTES),
+        (["data/docs/note1?.txt", "data/zero.dat"], NOTES[10:] + ["data/zero.dat"]),
+    ],
+)
+@pytest.mark.parametrize("archive_format", ["zip", "tar", "gztar"])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_selective_extraction(
+    archive_format, workers, members, expected, source, tmp_path
+):
+    archive = pack_archive(str(tmp_path / "archive"), archive_format, *source)
+    out = tmp_path / "out"
+    unpack_archive(archive, str(out), workers=workers, members=members)
+    assert _written(out) == sorted(expected)
+    full = snapshot(os.path.join(*source))
+    for name in expected:
+        assert snapshot(out)[name] == full[name[5:]]
+
+
+def test_tar_stops_after_selected_files(source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "tar", *source)
+    progress = []
+    # random.bin 是压缩包中的第一个文件，找到后不再读取其余条目
+    unpack_archive(
+        archive,
+        str(tmp_path / "out"),
+        members=["data/docs/deep/er/random.bin"],
+        progress_callback=progress.append,
+    )
+    assert _written(tmp_path / "out") == ["data/docs/deep/er/random.bin"]
+    assert progress[-1].done_bytes < os.path.getsize(archive) // 2
@@ -0,0 +1,148 @@
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import threading
+import zipfile
+
+import pytest
+
+from zip_gui.fastcodecs import DECODE_ERRORS
+from zip_gui.packer import pack_stream
+from zip_gui.unpacker import unpack_stream
+
+from .conftest import SMALL_BLOCK, TAR_FORMATS, snapshot
+
+
+def _pipe_pack(archive_format, source, workers, **options):
+    """在后台线程中把源目录打包写入管道，返回管道的读取端和线程"""
+    root_dir, base_dir = source
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def produce():
+        try:
+            with open(write_fd, "wb") as out:
+                pack_stream(
+                    out,
+                    archive_format,
+                    root_dir,
+                    base_dir,
+                    workers=workers,
+                    block_size=SMALL_BLOCK,
+                    **options,
+                )
+        except BaseException as e:  # 在主线程中重新抛出
+            errors.append(e)
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    return open(read_fd, "rb"), thread, errors
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("archive_format", TAR_FORMATS)
+def test_pipe_round_trip(archive_format, workers, source, tmp_path):
+    inp, thread, errors = _pipe_pack(archive_format, source, workers)
+    with inp:
+        assert not inp.seekable()
+        report = unpack_stream(inp, tmp_path / "out")
+    thread.join()
+    assert not errors
+    root_dir, base_dir = source
+    assert snapshot(tmp_path / "out" / base_dir) == snapshot(
+        os.path.join(root_dir, base_dir)
+    )
+    assert report.written_bytes > 0
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_zip_stream_is_readable(workers, source):
+    inp, thread, errors = _pipe_pack("zip", source, workers)
+    with inp:
+        data = inp.read()
+    thread.join()
+    assert not errors
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        root_dir, base_dir = source
+        with open(os.path.join(root_dir, base_dir, "docs", "note7.txt"), "rb") as f:
+            assert zf.read(f"{base_dir}/docs/note7.txt") == f.read()
+
+
+def _packed_bytes(archive_format, source):
+    inp, thread, errors = _pipe_pack(archive_format, source, 4)
+    with inp:
+        data = inp.read()
+    thread.join()
+    assert not errors
+    return data
+
+
+@pytest.mark.parametrize("archive_format", [f for f in TAR_FORMATS if f != "tar"])
+def test_truncated_stream_raises_decode_error(archive_format, source, tmp_path):
+    data = _packed_bytes(archive_format, source)
+    with pytest.raises(DECODE_ERRORS):
+        unpack_stream(io.BytesIO(data[: len(data) // 2]), tmp_path / "out")
+
+
+def test_cli_reports_truncated_stream(source, tmp_path):
+    data = _packed_bytes("xztar", source)
+    result = subprocess.run(
+        [sys.executable, "-m", "zip_gui.cli", "unpack", "-", "-d", str(tmp_path)],
+        input=data[: len(data) // 2],
+        capture_output=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    assert result.returncode == 1
+    stderr = result.stderr.decode()
+    assert "错误" in stderr and "Traceback" not in stderr
+
+
+@pytest.fixture
+def duplicated_source(source):
+    # 去重后 tar 中的 dup2.txt 是指向 dup1.txt 的硬链接
+    sub = os.path.join(*source, "sub")
+    os.makedirs(sub)
+    for name in ("dup1.txt", "dup2.txt"):
+        with open(os.path.join(sub, name), "wb") as f:
+            f.write(b"duplicated content\n" * 1000)
+    return source
+
+
+def _unpack_selected(source, tmp_path, members):
+    inp, thread, errors = _pipe_pack("gztar", source, 1, dedup=True)
+    try:
+        with inp:
+            unpack_stream(inp, tmp_path / "out", members=members)
+    finally:
+        thread.join()
+    assert not errors
+    return snapshot(tmp_path / "out")
+
+
+@pytest.mark.parametrize(
+    "members, expected",
+    [
+        (["data/sub"], ["data", "data/sub", "data/sub/dup1.txt", "data/sub/dup2.txt"]),
+        (["data/sub/dup1.txt"], ["data", "data/sub", "data/sub/dup1.txt"]),
+        (
+            ["data/sub/dup1.txt", "data/sub/dup2.txt"],
+            ["data", "data/sub", "data/sub/dup1.txt", "data/sub/dup2.txt"],
+        ),
+    ],
+)
+def test_stream_selection_with_hardlinks(
+    duplicated_source, tmp_path, members, expected
+):
+    extracted = _unpack_selected(duplicated_source, tmp_path, members)
+    assert sorted(extracted) == expected
+    assert extracted["data/sub/dup1.txt"] == b"duplicated content\n" * 1000
+    if "data/sub/dup2.txt" in extracted:
+        assert extracted["data/sub/dup2.txt"] == extracted["data/sub/dup1.txt"]
+
+
+def test_stream_selection_of_hardlink_without_target(duplicated_source, tmp_path):
+    with pytest.raises(tarfile.ExtractError, match="data/sub/dup1.txt 未被选中"):
+        _unpack_selected(duplicated_source, tmp_path, ["data/sub/dup2.txt"])
@@ -0,0 +1,76 @@
+import tarfile
+import zipfile
+import zlib
+
+import pytest
+
+from zip_gui.packer import pack_archive
+from zip_gui.verify import test_archive as verify_archive
+
+from .conftest import SMALL_BLOCK, corrupt_zip_member
+
+LOG = "data/docs/deep/text.log"
+
+
+def _gzip_members(data) -> list:
+    """并行写出的 tar.gz 由多个 gzip 成员拼接而成，返回每个成员的
+    (压缩数据起点, 压缩数据终点, 解压后起点, 解压后终点)"""
+    members = []
+    offset = unpacked = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(31)
+        size = len(decompressor.decompress(data[offset:]))
+        end = len(data) - len(decompressor.unused_data)
+        members.append((offset, end, unpacked, unpacked + size))
+        offset, unpacked = end, unpacked + size
+    return members
+
+
+def _corrupt_tar_gz_member(path, name):
+    """翻转完全落在条目 name 数据中间的某个 gzip 成员的一个字节"""
+    with tarfile.open(path) as tf:
+        member = tf.getmember(name)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    # 成员末尾的 CRC 校验出错时 tarfile 仍在读取 name，而不是后面的条目
+    start, end = member.offset_data, member.offset_data + member.size - SMALL_BLOCK
+    offset, stop, _, _ = next(
+        m for m in _gzip_members(data) if m[2] >= start and m[3] <= end
+    )
+    data[(offset + stop) // 2] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_verify_reports_corrupted_zip_members(workers, source, tmp_path):
+    archive = pack_archive(str(tmp_path / "archive"), "zip", *source)
+    with zipfile.ZipFile(archive) as zf:
+        count = len(zf.infolist())
+    assert verify_archive(archive, workers=workers).ok
+    corrupted = ["data/docs/deep/er/random.bin", "data/docs/note5.txt"]
+    for name in corrupted:
+        corrupt_zip_member(archive, name)
+    result = verify_archive(archive, workers=workers)
+    assert not result.ok
+    # 其余条目照常校验，损坏的条目按压缩包中的顺序报告
+    assert result.checked == count
+    assert [name for name, _message in result.bad] == corrupted
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_verify_reports_corrupted_tar_gz(workers, source, tmp_path):
+    # 小块并行压缩，得到多个 gzip 成员
+    archive = pack_archive(
+        str(tmp_path / "archive"),
+        "gztar",
+        *source,
+        workers=4,
+        block_size=SMALL_BLOCK,
+    )
+    assert verify_archive(archive, workers=workers).ok
+    _corrupt_tar_gz_member(archive, LOG)
+    result = verify_archive(archive, workers=workers)
+    assert not result.ok
+    # gzip 流出错后无法继续读取，报告出错时正在读取的条目
+    assert [name for name, _message in result.bad] == [LOG]
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pytest
+
+from zip_gui.jobs import archive_stem
+from zip_gui.packer import pack_archive
+from zip_gui.preflight import preflight_archive
+from zip_gui.unpacker import unpack_archive
+from zip_gui.volumes import archive_size, is_volume, volume_base, volume_path
+
+from .conftest import snapshot
+
+
+@pytest.mark.parametrize(
+    "archive_format, name",
+    [("zip", "dump.1234"), ("gztar", "backup.2024"), ("zip", "dump.123")],
+)
+def test_numeric_suffix_is_not_a_volume(source, tmp_path, archive_format, name):
+    # 名称以数字结尾、但旁边没有 .001 的普通压缩包
+    archive = pack_archive(str(tmp_path / "archive"), archive_format, *source)
+    path = str(tmp_path / name)
+    os.rename(archive, path)
+    assert not is_volume(path)
+    assert archive_size(path) == os.path.getsize(path)
+    assert archive_stem(path) == os.path.splitext(name)[0]
+    preflight_archive(path, str(tmp_path))
+    unpack_archive(path, str(tmp_path / "out"))
+    assert snapshot(tmp_path / "out" / "data") == snapshot(os.path.join(*source))
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "gztar"])
+def test_volume_set(source, tmp_path, archive_format):
+    first = pack_archive(
+        str(tmp_path / "archive"), archive_format, *source, volume_size=100 * 1024
+    )
+    assert is_volume(first)
+    second = volume_path(volume_base(first), 2)
+    assert is_volume(second)
+    assert archive_stem(second) == "archive"
+    unpack_archive(second, str(tmp_path / "out"))
+    assert snapshot(tmp_path / "out" / "data") == snapshot(os.path.join(*source))
+
+    # 缺少第一个分卷时不再当作分卷组
+    shutil.move(first, str(tmp_path / "first"))
+    assert not is_volume(second)
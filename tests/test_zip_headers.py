@@ -0,0 +1,55 @@
+import os
+import zipfile
+
+import pytest
+
+from zip_gui.cache import CompressionCache
+from zip_gui.packer import ZIP_METHODS, PackStats, pack_archive
+from zip_gui.unpacker import unpack_archive
+
+from .conftest import snapshot
+
+# 缓存只保存较大的文件，源目录中的 random.bin 和 text.log 超过了这个大小
+CACHED_NAMES = ("data/docs/deep/er/random.bin", "data/docs/deep/text.log")
+
+
+def _headers(archive) -> dict:
+    with zipfile.ZipFile(archive) as zf:
+        return {
+            info.filename: (info.compress_type, info.extract_version, info.flag_bits)
+            for info in zf.infolist()
+        }
+
+
+def _pack(source, tmp_path, name, **options):
+    stats = PackStats()
+    archive = pack_archive(
+        str(tmp_path / name), "zip", *source, stats=stats, adaptive=False, **options
+    )
+    return archive, stats
+
+
+@pytest.mark.parametrize("method", sorted(ZIP_METHODS))
+def test_cache_hit_keeps_headers(method, source, tmp_path):
+    cache = CompressionCache(str(tmp_path / "cache"))
+    first, _ = _pack(source, tmp_path, "first", method=method, cache=cache)
+    second, stats = _pack(source, tmp_path, "second", method=method, cache=cache)
+    assert stats.cache_hits == len(CACHED_NAMES)
+    assert _headers(second) == _headers(first)
+    unpack_archive(second, tmp_path / "out")
+    assert snapshot(tmp_path / "out" / "data") == snapshot(os.path.join(*source))
+
+
+@pytest.mark.parametrize("method", sorted(ZIP_METHODS))
+def test_incremental_reuse_keeps_headers(method, source, tmp_path):
+    first, _ = _pack(source, tmp_path, "archive", method=method)
+    before = _headers(first)
+    second, stats = _pack(source, tmp_path, "archive", method=method, incremental=True)
+    assert stats.reused_files == sum(1 for name in before if not name.endswith("/"))
+    after = _headers(second)
+    assert after == before
+    # 同一个压缩包中同一方法的条目使用相同的版本号
+    versions = {header[:2] for name, header in after.items() if not name.endswith("/")}
+    assert len(versions) == 1
+    unpack_archive(second, tmp_path / "out")
+    assert snapshot(tmp_path / "out" / "data") == snapshot(os.path.join(*source))
@@ -0,0 +1,107 @@
+# 自适应压缩: 图片、视频、压缩包等本身已经压缩过的文件再压缩几乎没有收益，却要花费大量 CPU。
+# zip 的每个条目可以单独选择压缩方法，这些文件直接以存储 (不压缩) 方式写入。
+# 判断依据先看扩展名，再对较大的文件试压缩开头的一块数据，压缩率不够好时同样改为存储。
+
+import os
+import threading
+import time
+import zipfile
+
+from .zipraw import new_compressor
+
+# 常见的已压缩格式 (小写，不含 ".")
+COMPRESSED_EXTENSIONS = frozenset(
+    """
+    jpg jpeg png gif webp heic heif avif jxl
+    mp3 m4a aac ogg oga opus flac wma
+    mp4 m4v mkv mov avi webm wmv flv 3gp
+    zip gz tgz bz2 tbz2 xz txz lzma lz lz4 zst tzst 7z rar cab br
+    jar war apk aab ipa whl nupkg crx xpi
+    docx xlsx pptx odt ods odp epub
+    woff woff2 dmg msi
+    """.split()
+)
+
+STORE_THRESHOLD = 0.9  # 试压缩后的大小超过原大小的 90% 时改为存储
+PROBE_SIZE = 64 * 1024  # 试压缩开头的 64 KB
+MIN_PROBE_FILE_SIZE = 256 * 1024  # 更小的文件直接压缩，试压缩省不下多少时间
+
+
+def has_compressed_extension(path) -> bool:
+    extension = os.path.splitext(path)[1][1:].lower()
+    return extension in COMPRESSED_EXTENSIONS
+
+
+class AdaptivePolicy:
+    """
+    为每个 zip 条目决定是压缩还是存储，并估算因此节省的 CPU 时间。
+    节省的时间按本次任务中测得的每字节 CPU 耗时推算: 优先使用试压缩 (多为难以压缩的数据)
+    的测量结果，没有试压缩时使用正常压缩的结果。
+    可在多个工作线程中同时调用。
+    """
+
+    def __init__(
+        self,
+        compress_type=zipfile.ZIP_DEFLATED,
+        level=None,
+        threshold=STORE_THRESHOLD,
+        probe_size=PROBE_SIZE,
+    ):
+        self.compress_type = compress_type
+        self.level = level
+        self.threshold = threshold
+        self.probe_size = probe_size
+        self._lock = threading.Lock()
+        self._measured_bytes = 0
+        self._measured_seconds = 0.0
+        self._probed_bytes = 0
+        self._skipped_bytes = 0
+        self._probe_seconds = 0.0
+
+    def should_store(self, path, size) -> bool:
+        """path 是否应以存储方式写入; 为 True 时调用方不要再压缩"""
+        if self.compress_type == zipfile.ZIP_STORED or size == 0:
+            return False
+        store = has_compressed_extension(path)
+        if not store and size >= MIN_PROBE_FILE_SIZE:
+            store = self._probe(path)
+        if store:
+            with self._lock:
+                self._skipped_bytes += size
+        return store
+
+    def _probe(self, path) -> bool:
+        """试压缩文件开头的一块数据，压缩率达不到 threshold 时返回 True"""
+        try:
+            with open(path, "rb") as src:
+                head = src.read(self.probe_size)
+        except OSError:
+            # 读不了的文件留给正式压缩时报错
+            return False
+        if not head:
+            return False
+        started = time.thread_time()
+        compressor = new_compressor(self.compress_type, self.level)
+        compressed = len(compressor.compress(head)) + len(compressor.flush())
+        seconds = time.thread_time() - started
+        with self._lock:
+            self._probed_bytes += len(head)
+            self._probe_seconds += seconds
+        return compressed > len(head) * self.threshold
+
+    def record(self, nbytes, cpu_seconds):
+        """记录一次实际压缩的字节数和 CPU 时间，用于估算节省的时间"""
+        with self._lock:
+            self._measured_bytes += nbytes
+            self._measured_seconds += cpu_seconds
+
+    def saved_seconds(self) -> float:
+        """存储的文件如果压缩大约要花的 CPU 时间，减去试压缩本身的开销"""
+        with self._lock:
+            if self._probed_bytes:
+                per_byte = self._probe_seconds / self._probed_bytes
+            elif self._measured_bytes:
+                per_byte = self._measured_seconds / self._measured_bytes
+            else:
+                return 0.0
+            return max(0.0, self._skipped_bytes * per_byte - self._probe_seconds)
@@ -1,6 +1,10 @@
 import sys
 import os
-import shutil
+import time
+
+# 启动计时 (--startup-time) 的起点，在导入 Qt 之前记录
+_IMPORT_START = time.perf_counter()
+
 from PySide6.QtWidgets import (
     QApplication,
     QWidget,
@@ -17,45 +21,113 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QGroupBox,
     QFrame,
+    QSpinBox,
+    QCheckBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
+    QTreeView,
+    QToolButton,
+    QPlainTextEdit,
+    QStackedWidget,
+)
+from PySide6.QtCore import Qt, QThread, Signal, QObject, QTimer
+from PySide6.QtGui import QFontDatabase
+from .style import (
+    TONE_BUSY,
+    TONE_ERROR,
+    TONE_NORMAL,
+    TONE_OK,
+    load_stylesheet,
+    set_style_property,
+)
+
+# 打包/解压引擎 (packer、unpacker、jobs 等) 及其依赖的 tarfile、zipfile、压缩库在首次绘制后
+# 由 PackApp.load_engine 导入，各 Worker 和页面在用到时再导入所需的名称，不推迟窗口显示
+from .icons import ICON_SIZE, icon
+from .progress import JobCancelled, JobControl, format_progress, format_size
+from .telemetry import (
+    STATUS_RUNNING,
+    Telemetry,
+    TelemetrySummary,
+    default_log_path,
 )
-from PySide6.QtCore import Qt, QThread, Signal, QSize
-from PySide6.QtGui import QIcon
-import qtawesome as qta
-from .style import load_stylesheet
-from PySide6.QtWidgets import QStackedWidget
 
 
 class PackWorker(QThread):
     finished = Signal(str)
     error = Signal(str)
+    cancelled = Signal(str)
     progress = Signal(int)
+    status = Signal(str)
+    telemetry_event = Signal(object)  # TelemetryEvent: 各阶段耗时、计数器和队列深度
 
     def __init__(
-        self, dest_file_base, archive_format, root_dir_for_shutil, base_dir_to_archive
+        self,
+        dest_file_base,
+        archive_format,
+        root_dir_for_shutil,
+        base_dir_to_archive,
+        telemetry_log=None,
+        **options,
     ):
         super().__init__()
         self.dest_file_base = dest_file_base
         self.archive_format = archive_format
         self.root_dir_for_shutil = root_dir_for_shutil  # 这是父目录
         self.base_dir_to_archive = base_dir_to_archive  # 这是要打包的文件夹名
+        self.options = options  # 线程数、块大小、增量更新等，原样传给 pack_archive
+        self.control = JobControl()  # 取消/暂停控制，由界面线程调用
+        # telemetry_log 不为空时遥测事件同时追加到该 JSON Lines 文件
+        self.telemetry = Telemetry(
+            job=os.path.basename(dest_file_base),
+            on_event=self.telemetry_event.emit,
+            log_path=telemetry_log,
+        )
+
+    def on_progress(self, info):
+        # ProgressTracker 已限制回调频率 (<= 20 次/秒)，这里可以直接发送信号
+        self.progress.emit(info.percent)
+        self.status.emit(f"正在打包 {format_progress(info)}")
 
     def run(self):
+        from .packer import PackStats, pack_archive
+
         try:
-            self.progress.emit(10)
+            self.status.emit("正在扫描源文件...")
             # 更新打印信息以反映实际使用的参数
             print(
                 f"开始打包: base_name='{self.dest_file_base}', format='{self.archive_format}', "
                 f"root_dir='{self.root_dir_for_shutil}', base_dir='{self.base_dir_to_archive}'"
             )
-            # 修改 shutil.make_archive 调用
-            archive_path = shutil.make_archive(
-                base_name=self.dest_file_base,
+            stats = PackStats()
+            with self.telemetry.job_scope(
+                "pack",
                 format=self.archive_format,
-                root_dir=self.root_dir_for_shutil,  # 使用父目录作为 root_dir
-                base_dir=self.base_dir_to_archive,  # 使用文件夹名作为 base_dir
-            )
+                source=os.path.join(self.root_dir_for_shutil, self.base_dir_to_archive),
+                target=self.dest_file_base,
+            ):
+                archive_path = pack_archive(
+                    base_name=self.dest_file_base,
+                    archive_format=self.archive_format,
+                    root_dir=self.root_dir_for_shutil,  # 使用父目录作为 root_dir
+                    base_dir=self.base_dir_to_archive,  # 使用文件夹名作为 base_dir
+                    progress_callback=self.on_progress,
+                    control=self.control,
+                    stats=stats,
+                    telemetry=self.telemetry,
+                    **self.options,
+                )
             self.progress.emit(100)
-            self.finished.emit(f"成功打包到: {archive_path}")
+            summary = stats.summary()
+            if summary:
+                print(summary)
+                summary = f"\n{summary}"
+            self.finished.emit(f"成功打包到: {archive_path}{summary}")
+        except JobCancelled:
+            print("打包已取消")
+            self.cancelled.emit("打包已取消，未生成压缩文件")
         except Exception as e:
             print(f"打包出错: {e}")
             # 考虑添加更具体的错误信息，例如检查 root_dir 和 base_dir 是否有效
@@ -69,57 +141,232 @@ class PackWorker(QThread):
             pass
 
 
+class EstimateWorker(QThread):
+    """在后台抽样压缩源目录，预估各压缩选项的大小和耗时"""
+
+    estimated = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, source, archive_format, workers=1, excludes=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.archive_format = archive_format
+        self.workers = workers
+        self.excludes = excludes
+        self.control = JobControl()
+
+    def run(self):
+        from .estimate import estimate_source
+
+        try:
+            self.estimated.emit(
+                estimate_source(
+                    self.source,
+                    self.archive_format,
+                    workers=self.workers,
+                    control=self.control,
+                    excludes=self.excludes,
+                )
+            )
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class UnpackWorker(QThread):
     finished = Signal(str)
     error = Signal(str)
+    cancelled = Signal(str)
     progress = Signal(int)
+    status = Signal(str)
+    telemetry_event = Signal(object)
 
-    def __init__(self, archive_file, extract_dir):
+    def __init__(
+        self,
+        archive_file,
+        extract_dir,
+        workers=1,
+        members=None,
+        telemetry_log=None,
+        preflight=True,
+        max_ratio=None,
+    ):
         super().__init__()
+        if max_ratio is None:
+            from .preflight import DEFAULT_MAX_RATIO
+
+            max_ratio = DEFAULT_MAX_RATIO
         self.archive_file = archive_file
         self.extract_dir = extract_dir
+        self.workers = workers  # zip 并发解压线程数
+        self.members = members  # 只解压这些条目 (路径或通配符)，None 表示全部
+        self.preflight = preflight  # 解压前检查磁盘空间和压缩比
+        self.max_ratio = max_ratio  # 压缩比上限，0 表示不检查
+        self.control = JobControl()
+        self.telemetry = Telemetry(
+            job=os.path.basename(archive_file),
+            on_event=self.telemetry_event.emit,
+            log_path=telemetry_log,
+        )
+
+    def on_progress(self, info):
+        self.progress.emit(info.percent)
+        self.status.emit(f"正在解压 {info.current} · {format_progress(info)}")
 
     def run(self):
+        import shutil
+        import tarfile
+        import zipfile
+
+        from .preflight import InsufficientSpace, PreflightError
+        from .unpacker import unpack_archive
+
         try:
-            self.progress.emit(10)
             print(
                 f"开始解压: archive='{self.archive_file}', extract_dir='{self.extract_dir}'"
             )
 
             os.makedirs(self.extract_dir, exist_ok=True)
 
-            shutil.unpack_archive(self.archive_file, self.extract_dir)
+            if self.preflight:
+                self.status.emit("正在检查磁盘空间...")
+            with self.telemetry.job_scope(
+                "unpack", source=self.archive_file, target=self.extract_dir
+            ):
+                report = unpack_archive(
+                    self.archive_file,
+                    self.extract_dir,
+                    progress_callback=self.on_progress,
+                    workers=self.workers,
+                    control=self.control,
+                    members=self.members,
+                    telemetry=self.telemetry,
+                    preflight=self.preflight,
+                    max_ratio=self.max_ratio,
+                )
+            if report.preflight is not None:
+                print(
+                    f"预检 ({report.preflight.elapsed * 1000:.1f} 毫秒): "
+                    f"{report.preflight.summary()}"
+                )
+            # 输出耗时最长的条目，便于定位拖慢解压的文件
+            for member in report.slowest():
+                print(f"  {member.seconds:8.3f}s  {member.name}")
 
             self.progress.emit(100)
-            self.finished.emit(f"成功解压到: {self.extract_dir}")
+            memory = ""
+            if report.peak_rss:
+                memory = f", 峰值内存 {format_size(report.peak_rss)}"
+            self.finished.emit(
+                f"成功解压到: {self.extract_dir} (用时 {report.elapsed:.1f} 秒{memory})"
+            )
+        except JobCancelled:
+            print("解压已取消")
+            self.cancelled.emit(f"解压已取消，已解压的文件保留在: {self.extract_dir}")
         except Exception as e:
             print(f"解压出错: {e}")
             error_msg = f"解压失败: {str(e)}"
-            if isinstance(e, shutil.ReadError):
+            if isinstance(
+                e, (shutil.ReadError, zipfile.BadZipFile, tarfile.ReadError, EOFError)
+            ):
                 error_msg = f"解压失败: 文件 '{os.path.basename(self.archive_file)}' 可能不是受支持的压缩格式或已损坏。"
             elif isinstance(e, FileNotFoundError):
                 error_msg = f"解压失败: 找不到文件 '{self.archive_file}'。"
             elif isinstance(e, PermissionError):
                 error_msg = f"解压失败: 没有权限写入目标文件夹 '{self.extract_dir}'。"
+            elif isinstance(e, PreflightError):
+                # 预检未通过时没有写出任何文件; 解压中途发现压缩比异常时停在当前条目
+                hint = (
+                    "请清理磁盘或换一个目标文件夹"
+                    if isinstance(e, InsufficientSpace)
+                    else "如确认压缩包可信，可调高或关闭压缩比上限"
+                )
+                error_msg = f"已取消解压: {e}\n{hint}。"
 
             self.error.emit(error_msg)
         finally:
             pass
 
 
+class TestWorker(QThread):
+    """解压到空设备，校验压缩包中每个条目的 CRC-32 / 压缩流校验和"""
+
+    finished = Signal(str)
+    error = Signal(str)
+    cancelled = Signal(str)
+    progress = Signal(int)
+    status = Signal(str)
+
+    def __init__(self, archive_file, workers=1):
+        super().__init__()
+        self.archive_file = archive_file
+        self.workers = workers  # zip 并发校验线程数
+        self.control = JobControl()
+
+    def on_progress(self, info):
+        self.progress.emit(info.percent)
+        self.status.emit(f"正在校验 {info.current} · {format_progress(info)}")
+
+    def run(self):
+        from .verify import test_archive
+
+        name = os.path.basename(self.archive_file)
+        try:
+            result = test_archive(
+                self.archive_file,
+                progress_callback=self.on_progress,
+                control=self.control,
+                workers=self.workers,
+            )
+            for member, message in result.bad:
+                print(f"  损坏: {member}: {message}")
+            self.progress.emit(100)
+            if result.ok:
+                self.finished.emit(
+                    f"{name} 校验通过: {result.checked} 项 (用时 {result.elapsed:.1f} 秒)"
+                )
+                return
+            lines = [f"{member}: {message}" for member, message in result.bad[:10]]
+            if len(result.bad) > 10:
+                lines.append(f"... 另有 {len(result.bad) - 10} 个条目损坏")
+            self.error.emit(
+                f"{name} 中有 {len(result.bad)} 个条目损坏:\n" + "\n".join(lines)
+            )
+        except JobCancelled:
+            self.cancelled.emit("校验已取消")
+        except Exception as e:
+            print(f"校验出错: {e}")
+            self.error.emit(f"校验失败: 文件 '{name}' 无法读取 ({e})")
+
+
+class JobSignals(QObject):
+    """把调度器在工作线程中的回调转发到界面线程"""
+
+    updated = Signal(object)
+
+
 class PackApp(QWidget):
     MODE_PACK = 0
     MODE_UNPACK = 1
 
+    first_painted = Signal()  # 第一次绘制完成、图标和引擎加载之后发出
+
     def __init__(self):
         super().__init__()
+        self.first_paint_time = None
+        self.icons_ready_time = None
+        self.pending_icons = {}  # 首次绘制前设置的按钮图标: 按钮 -> 图标名称
         self.worker = None
         self.current_mode = self.MODE_PACK
+        self.job_signals = JobSignals()
+        self.scheduler = None  # 任务调度器，由 load_engine 创建
+        self.job_rows = {}  # job_id -> 任务表格中的行号
         self.initUI()
 
     def initUI(self):
         self.setWindowTitle("简易打包解压工具")
-        self.setGeometry(300, 300, 450, 400)  # 调整窗口大小
+        self.setGeometry(300, 300, 560, 640)  # 调整窗口大小
 
         # --- 主布局 ---
         main_layout = QVBoxLayout()
@@ -147,35 +394,11 @@ class PackApp(QWidget):
         self.pack_group = QGroupBox("打包选项")
         pack_layout = QGridLayout()
 
-        # 图标
-        icon_size = QSize(20, 20)
-        icon_color = "#A9A9A9"
-        icon_color_active = "#E0E0E0"
-        folder_icon = qta.icon(
-            "fa5s.folder-open", color=icon_color, color_active=icon_color_active
-        )
-        save_icon = qta.icon(
-            "fa5s.save", color=icon_color, color_active=icon_color_active
-        )
-        pack_icon = qta.icon(
-            "fa5s.compress-alt", color=icon_color, color_active=icon_color_active
-        )
-        unpack_icon = qta.icon(
-            "fa5s.expand-alt", color=icon_color, color_active=icon_color_active
-        )  # 解压图标
-        archive_icon = qta.icon(
-            "fa5s.file-archive", color=icon_color, color_active=icon_color_active
-        )  # 压缩文件图标
-        extract_folder_icon = qta.icon(
-            "fa5s.folder-plus", color=icon_color, color_active=icon_color_active
-        )
-
         self.source_label = QLabel("源文件/文件夹:")
         self.source_edit = QLineEdit()
         self.source_edit.setPlaceholderText("选择文件夹或输入文件路径")
         self.source_button = QPushButton()
-        self.source_button.setIcon(folder_icon)
-        self.source_button.setIconSize(icon_size)
+        self.set_button_icon(self.source_button, "fa5s.folder-open")
         self.source_button.setToolTip("选择源文件夹 (或手动输入文件路径)")
         pack_layout.addWidget(self.source_label, 0, 0)
         pack_layout.addWidget(self.source_edit, 0, 1)
@@ -183,68 +406,203 @@ class PackApp(QWidget):
 
         self.format_label = QLabel("压缩类型:")
         self.format_combo = QComboBox()
-        supported_formats = [fmt[0] for fmt in shutil.get_archive_formats()]
-        supported_formats.reverse()
-        self.format_combo.addItems(supported_formats)
+        # 默认的 zip 先显示出来，其余格式 (包括 zstdtar 等可选格式) 由 load_engine 补上
+        self.format_combo.addItem("zip")
+        # zip 的压缩方法和各格式的压缩级别，引擎加载前禁用
+        self.method_combo = QComboBox()
+        self.method_combo.setEnabled(False)
+        self.method_combo.setToolTip(
+            "zip 条目的压缩方法 (zstd 需要 7-Zip 21+、WinZip 24+ 等较新的工具才能解压)"
+        )
+        self.level_label = QLabel("级别:")
+        self.level_spin = QSpinBox()
+        self.level_spin.setEnabled(False)
+        self.level_spin.setToolTip("压缩级别: 越高压缩率越好，但速度越慢")
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(self.format_combo, 1)
+        format_layout.addWidget(self.method_combo)
+        format_layout.addWidget(self.level_label)
+        format_layout.addWidget(self.level_spin)
         pack_layout.addWidget(self.format_label, 1, 0)
-        pack_layout.addWidget(self.format_combo, 1, 1)
+        pack_layout.addLayout(format_layout, 1, 1)
 
         # 打包: 保存路径
         self.dest_label = QLabel("保存路径:")
         self.dest_edit = QLineEdit()
         self.dest_edit.setPlaceholderText("选择压缩文件的保存位置和名称")
         self.dest_button = QPushButton()
-        self.dest_button.setIcon(save_icon)
-        self.dest_button.setIconSize(icon_size)
+        self.set_button_icon(self.dest_button, "fa5s.save")
         self.dest_button.setToolTip("选择保存路径和文件名")
         pack_layout.addWidget(self.dest_label, 2, 0)
         pack_layout.addWidget(self.dest_edit, 2, 1)
         pack_layout.addWidget(self.dest_button, 2, 2)
 
-        self.pack_group.setLayout(pack_layout)
-
-        # --- 解压控件容器 ---
-        self.unpack_group = QGroupBox("解压选项")
-        unpack_layout = QGridLayout()
+        # 打包: 并发压缩线程数
+        self.workers_label = QLabel("压缩线程:")
+        self.workers_spin = QSpinBox()
+        cpu_count = os.cpu_count() or 1
+        self.workers_spin.setRange(1, cpu_count)
+        self.workers_spin.setValue(cpu_count)
+        self.workers_spin.setToolTip(
+            "并发压缩的线程数: zip 按条目并行，gztar/bztar/xztar/lz4tar 按数据块并行，"
+            "zstdtar 使用 zstd 自带的多线程"
+        )
+        pack_layout.addWidget(self.workers_label, 3, 0)
+        pack_layout.addWidget(self.workers_spin, 3, 1)
+
+        # 打包: 块并行压缩的块大小
+        self.block_size_label = QLabel("块大小:")
+        self.block_size_spin = QSpinBox()
+        self.block_size_spin.setRange(1, 64)
+        self.block_size_spin.setSuffix(" MB")
+        self.block_size_spin.setToolTip(
+            "gztar/bztar/xztar/lz4tar 多线程压缩时每个数据块的大小"
+        )
+        pack_layout.addWidget(self.block_size_label, 4, 0)
+        pack_layout.addWidget(self.block_size_spin, 4, 1)
+
+        # 打包: 按固定大小切分为多个分卷
+        self.volume_label = QLabel("分卷大小:")
+        self.volume_spin = QSpinBox()
+        self.volume_spin.setRange(0, 1024 * 1024)
+        self.volume_spin.setSingleStep(100)
+        self.volume_spin.setSuffix(" MB")
+        self.volume_spin.setSpecialValueText("不分卷")
+        self.volume_spin.setToolTip(
+            "边写边切分为 .001、.002 ... 的分卷，适合有单文件大小限制的传输方式；"
+            "解压时选择第一个分卷即可"
+        )
+        pack_layout.addWidget(self.volume_label, 5, 0)
+        pack_layout.addWidget(self.volume_spin, 5, 1)
 
-        # 解压: 压缩文件
-        self.archive_label = QLabel("压缩文件:")
-        self.archive_edit = QLineEdit()
-        self.archive_edit.setPlaceholderText("选择要解压的压缩文件")
-        self.archive_button = QPushButton()
-        self.archive_button.setIcon(archive_icon)
-        self.archive_button.setIconSize(icon_size)
-        self.archive_button.setToolTip("选择压缩文件")
-        unpack_layout.addWidget(self.archive_label, 0, 0)
-        unpack_layout.addWidget(self.archive_edit, 0, 1)
-        unpack_layout.addWidget(self.archive_button, 0, 2)
+        # 打包: 增量更新已存在的 zip
+        self.incremental_check = QCheckBox("增量更新")
+        self.incremental_check.setToolTip(
+            "目标 zip 已存在时，未变化的文件直接复用旧的压缩数据，只重新压缩新增或修改的文件"
+        )
+        self.verify_hash_check = QCheckBox("按内容比较 (CRC)")
+        self.verify_hash_check.setToolTip(
+            "按文件内容而不是修改时间判断是否变化，较慢但不受修改时间变化的影响"
+        )
+        self.adaptive_check = QCheckBox("已压缩的文件直接存储")
+        self.adaptive_check.setChecked(True)
+        self.adaptive_check.setToolTip(
+            "图片、视频、压缩包等已经压缩过的文件 (按扩展名和试压缩判断) 不再压缩，节省 CPU 时间"
+        )
+        incremental_layout = QHBoxLayout()
+        incremental_layout.addWidget(self.incremental_check)
+        incremental_layout.addWidget(self.verify_hash_check)
+        incremental_layout.addWidget(self.adaptive_check)
+        self.verify_check = QCheckBox("打包后校验")
+        self.verify_check.setToolTip(
+            "打包完成后用所有 CPU 核心校验压缩包，发现损坏时保留原有文件并报错"
+        )
+        incremental_layout.addWidget(self.verify_check)
+        self.dedup_check = QCheckBox("重复文件去重")
+        self.dedup_check.setToolTip(
+            "内容相同的文件只读取和压缩一次: tar 中的副本写为硬链接，zip 中的副本复制已压缩的数据"
+        )
+        incremental_layout.addWidget(self.dedup_check)
+        incremental_layout.addStretch(1)
+        pack_layout.addLayout(incremental_layout, 6, 1)
+
+        # 打包: 按内容哈希缓存压缩结果，跨任务复用
+        self.cache_label = QLabel("压缩缓存:")
+        self.cache_check = QCheckBox("启用")
+        self.cache_check.setToolTip(
+            "相同内容的较大文件只压缩一次，之后直接复用缓存中的压缩数据 (仅 zip)"
+        )
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(1, 512)
+        self.cache_size_spin.setSuffix(" GB")
+        self.cache_size_spin.setToolTip(
+            "缓存占用的磁盘空间上限，超出时淘汰最久未使用的条目"
+        )
+        self.cache_stats_label = QLabel("")
+        self.cache_stats_label.setObjectName("HintLabel")
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(self.cache_check)
+        cache_layout.addWidget(self.cache_size_spin)
+        cache_layout.addWidget(self.cache_stats_label, 1)
+        pack_layout.addWidget(self.cache_label, 7, 0)
+        pack_layout.addLayout(cache_layout, 7, 1, 1, 2)
+
+        # 打包: .gitignore 风格的排除规则
+        self.excludes_label = QLabel("排除:")
+        self.excludes_edit = QLineEdit()
+        self.excludes_edit.setPlaceholderText(
+            "例如 .git; node_modules/; *.pyc (用 ; 分隔，! 开头表示重新包含)"
+        )
+        pack_layout.addWidget(self.excludes_label, 8, 0)
+        pack_layout.addWidget(self.excludes_edit, 8, 1, 1, 2)
+
+        # 打包: 抽样预估各压缩选项的结果，点击一行即可采用该选项
+        self.estimate_label = QLabel("预估:")
+        self.estimate_table = QTableWidget(0, 4)
+        self.estimate_table.setHorizontalHeaderLabels(
+            ["选项", "预计大小", "压缩率", "预计用时"]
+        )
+        self.estimate_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        self.estimate_table.verticalHeader().setVisible(False)
+        self.estimate_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.estimate_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.estimate_table.setSelectionMode(
+            QAbstractItemView.SelectionMode.SingleSelection
+        )
+        self.estimate_table.setMaximumHeight(150)
+        self.estimate_table.setToolTip("根据抽样压缩推算的结果，点击一行采用该选项")
+        self.estimate_status_label = QLabel("")
+        self.estimate_status_label.setObjectName("HintLabel")
+        pack_layout.addWidget(self.estimate_label, 9, 0, Qt.AlignmentFlag.AlignTop)
+        pack_layout.addWidget(self.estimate_table, 9, 1, 1, 2)
+        pack_layout.addWidget(self.estimate_status_label, 10, 1, 1, 2)
+        self.estimates = []
+        self.estimate_worker = None
+        # 输入变化后稍等片刻再预估，避免每敲一个字符都重新扫描
+        self.estimate_timer = QTimer(self)
+        self.estimate_timer.setSingleShot(True)
+        self.estimate_timer.setInterval(600)
 
-        # 解压: 目标文件夹
-        self.extract_label = QLabel("目标文件夹:")
-        self.extract_edit = QLineEdit()
-        self.extract_edit.setPlaceholderText("选择解压文件的存放位置")
-        self.extract_button = QPushButton()
-        self.extract_button.setIcon(extract_folder_icon)
-        self.extract_button.setIconSize(icon_size)
-        self.extract_button.setToolTip("选择目标文件夹")
-        unpack_layout.addWidget(self.extract_label, 1, 0)
-        unpack_layout.addWidget(self.extract_edit, 1, 1)
-        unpack_layout.addWidget(self.extract_button, 1, 2)
+        self.pack_group.setLayout(pack_layout)
 
-        self.unpack_group.setLayout(unpack_layout)
+        # --- 解压控件容器: 第一次切换到解压模式时才创建 (见 ensure_unpack_page) ---
+        self.unpack_group = None
+        self.index_worker = None
         self.stacked_widget = QStackedWidget()
         self.stacked_widget.addWidget(self.pack_group)  # 添加打包页面 (索引 0)
-        self.stacked_widget.addWidget(self.unpack_group)
 
         main_layout.addWidget(self.stacked_widget)
 
         # --- 公共控件 ---
         # 主操作按钮
-        self.action_button = QPushButton(" 开始打包")  # 初始文本
-        self.action_button.setIcon(pack_icon)  # 初始图标
-        self.action_button.setIconSize(icon_size)
+        self.action_button = QPushButton(
+            " 开始打包"
+        )  # 初始文本，图标见 update_action_button_style
         self.action_button.setObjectName("ActionButton")  # 使用新的 ObjectName
 
+        # 暂停 / 取消按钮，仅在任务运行时可用
+        self.pause_button = QPushButton(" 暂停")
+        self.set_button_icon(self.pause_button, "fa5s.pause")
+        self.pause_button.setEnabled(False)
+        self.cancel_button = QPushButton(" 取消")
+        self.set_button_icon(self.cancel_button, "fa5s.stop")
+        self.cancel_button.setEnabled(False)
+        # 校验按钮，仅在解压模式下显示
+        self.test_button = QPushButton(" 校验")
+        self.set_button_icon(self.test_button, "fa5s.check-circle")
+        self.test_button.setToolTip("解压到空设备，检查压缩包中每个条目是否完好")
+        action_layout = QHBoxLayout()
+        action_layout.addWidget(self.action_button, 1)
+        action_layout.addWidget(self.test_button)
+        action_layout.addWidget(self.pause_button)
+        action_layout.addWidget(self.cancel_button)
+
         # 进度条
         self.progress_bar = QProgressBar()
         self.progress_bar.setRange(0, 100)
@@ -258,24 +616,224 @@ class PackApp(QWidget):
 
         # --- 将公共控件添加到主布局 ---
         main_layout.addSpacing(15)
-        main_layout.addWidget(self.action_button)
+        main_layout.addLayout(action_layout)
         main_layout.addSpacing(10)
         main_layout.addWidget(self.progress_bar)
         main_layout.addWidget(self.status_label)
-        main_layout.addStretch(1)  # 添加伸缩因子，让控件靠上
+
+        # --- 任务详情: 最近一次打包/解压各阶段的耗时分解，默认折叠 ---
+        self.details_toggle = QToolButton()
+        self.details_toggle.setText("任务详情")
+        self.details_toggle.setCheckable(True)
+        self.details_toggle.setArrowType(Qt.ArrowType.RightArrow)
+        self.details_toggle.setToolButtonStyle(
+            Qt.ToolButtonStyle.ToolButtonTextBesideIcon
+        )
+        self.details_toggle.setAutoRaise(True)
+        self.telemetry_log_check = QCheckBox("记录遥测日志")
+        self.telemetry_log_check.setToolTip(
+            f"把每个任务的阶段耗时和计数追加到 JSON Lines 文件:\n{default_log_path()}"
+        )
+        details_header = QHBoxLayout()
+        details_header.addWidget(self.details_toggle)
+        details_header.addStretch(1)
+        details_header.addWidget(self.telemetry_log_check)
+        self.details_view = QPlainTextEdit()
+        self.details_view.setReadOnly(True)
+        self.details_view.setFont(
+            QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
+        )
+        self.details_view.setPlaceholderText(
+            "任务完成后在这里显示扫描、读取、压缩、写出等各阶段的耗时"
+        )
+        self.details_view.setMaximumHeight(150)
+        self.details_view.setVisible(False)
+        main_layout.addLayout(details_header)
+        main_layout.addWidget(self.details_view)
+
+        # --- 任务队列 ---
+        self.queue_group = QGroupBox("任务队列")
+        queue_layout = QVBoxLayout()
+        self.job_table = QTableWidget(0, 5)
+        self.job_table.setHorizontalHeaderLabels(["任务", "源", "状态", "进度", "速度"])
+        self.job_table.horizontalHeader().setSectionResizeMode(
+            1, QHeaderView.ResizeMode.Stretch
+        )
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.job_table.setSelectionBehavior(
+            QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        queue_layout.addWidget(self.job_table)
+
+        queue_controls = QHBoxLayout()
+        # 压缩打包主要占用 CPU，tar 打包和解压主要占用磁盘 IO，分别限制并发数
+        queue_controls.addWidget(QLabel("CPU 任务并发:"))
+        self.cpu_slots_spin = QSpinBox()
+        self.cpu_slots_spin.setRange(1, cpu_count)
+        self.cpu_slots_spin.setToolTip(
+            "同时运行的压缩打包任务数 (每个任务还会使用多个压缩线程)"
+        )
+        queue_controls.addWidget(self.cpu_slots_spin)
+        queue_controls.addWidget(QLabel("IO 任务并发:"))
+        self.io_slots_spin = QSpinBox()
+        self.io_slots_spin.setRange(1, 32)
+        self.io_slots_spin.setToolTip("同时运行的 tar 打包和解压任务数")
+        queue_controls.addWidget(self.io_slots_spin)
+        queue_controls.addStretch(1)
+        self.enqueue_button = QPushButton("加入队列")
+        self.enqueue_button.setToolTip(
+            "按当前选项把任务加入队列 (源路径可用 ; 分隔多个)"
+        )
+        self.cancel_jobs_button = QPushButton("全部取消")
+        self.clear_jobs_button = QPushButton("清除已结束")
+        queue_controls.addWidget(self.enqueue_button)
+        queue_controls.addWidget(self.cancel_jobs_button)
+        queue_controls.addWidget(self.clear_jobs_button)
+        queue_layout.addLayout(queue_controls)
+        self.queue_group.setLayout(queue_layout)
+
+        main_layout.addSpacing(10)
+        main_layout.addWidget(self.queue_group, 1)
 
         self.setLayout(main_layout)
 
         # --- 连接信号与槽 ---
+        self.details_toggle.toggled.connect(self.toggle_details)
         self.source_button.clicked.connect(self.select_source_path)
         self.dest_button.clicked.connect(self.select_dest_file)
-        self.archive_button.clicked.connect(self.select_archive_file)
-        self.extract_button.clicked.connect(self.select_extract_folder)
         self.action_button.clicked.connect(self.start_action)  # 连接到统一的启动函数
+        self.test_button.clicked.connect(self.start_testing)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button.clicked.connect(self.cancel_action)
+        self.enqueue_button.clicked.connect(self.enqueue_current)
+        self.job_signals.updated.connect(self.on_job_updated)
+        self.format_combo.currentTextChanged.connect(self.update_parallel_options)
+        self.method_combo.currentTextChanged.connect(self.update_level_range)
+        self.format_combo.currentTextChanged.connect(self.update_level_range)
+        self.estimate_timer.timeout.connect(self.start_estimate)
+        self.source_edit.textChanged.connect(self.schedule_estimate)
+        self.format_combo.currentTextChanged.connect(self.schedule_estimate)
+        self.workers_spin.valueChanged.connect(self.schedule_estimate)
+        self.excludes_edit.editingFinished.connect(self.schedule_estimate)
+        self.estimate_table.cellClicked.connect(self.apply_estimate)
+        self.workers_spin.valueChanged.connect(self.update_parallel_options)
+        self.incremental_check.toggled.connect(self.update_parallel_options)
+        self.cache_check.toggled.connect(self.update_parallel_options)
+        self.cache_check.toggled.connect(self.update_cache_stats)
+        self.cache_size_spin.valueChanged.connect(self.update_cache_stats)
+        self.update_parallel_options()
 
         # --- 更新图标 (在 switch_mode 中处理) ---
         self.update_action_button_style()  # 初始化按钮样式
 
+    def ensure_unpack_page(self):
+        """
+        创建解压页面 (只在第一次切换到解压模式时执行一次)。多数时候只用到打包页面，
+        推迟创建可以缩短启动时间，目录浏览模型和它的图标也随之推迟。
+        """
+        if self.unpack_group is not None:
+            return
+        self.unpack_group = QGroupBox("解压选项")
+        unpack_layout = QGridLayout()
+
+        # 解压: 压缩文件
+        from .browser import ArchiveTreeModel
+        from .preflight import DEFAULT_MAX_RATIO
+
+        self.archive_label = QLabel("压缩文件:")
+        self.archive_edit = QLineEdit()
+        self.archive_edit.setPlaceholderText("选择要解压的压缩文件")
+        self.archive_button = QPushButton()
+        self.set_button_icon(self.archive_button, "fa5s.file-archive")
+        self.archive_button.setToolTip("选择压缩文件")
+        unpack_layout.addWidget(self.archive_label, 0, 0)
+        unpack_layout.addWidget(self.archive_edit, 0, 1)
+        unpack_layout.addWidget(self.archive_button, 0, 2)
+
+        # 解压: 目标文件夹
+        self.extract_label = QLabel("目标文件夹:")
+        self.extract_edit = QLineEdit()
+        self.extract_edit.setPlaceholderText("选择解压文件的存放位置")
+        self.extract_button = QPushButton()
+        self.set_button_icon(self.extract_button, "fa5s.folder-plus")
+        self.extract_button.setToolTip("选择目标文件夹")
+        unpack_layout.addWidget(self.extract_label, 1, 0)
+        unpack_layout.addWidget(self.extract_edit, 1, 1)
+        unpack_layout.addWidget(self.extract_button, 1, 2)
+
+        # 解压: 并发解压线程数
+        cpu_count = os.cpu_count() or 1
+        self.unpack_workers_label = QLabel("解压线程:")
+        self.unpack_workers_spin = QSpinBox()
+        self.unpack_workers_spin.setRange(1, cpu_count)
+        self.unpack_workers_spin.setValue(cpu_count)
+        self.unpack_workers_spin.setToolTip("zip 文件按条目并发解压的线程数")
+        # 解压: 解压前检查磁盘空间，按压缩比拦截解压炸弹
+        self.preflight_check = QCheckBox("解压前检查空间")
+        self.preflight_check.setChecked(True)
+        self.preflight_check.setToolTip(
+            "只读取 zip 中央目录或 tar 头部，估算解压后的大小并与目标磁盘的剩余空间比较，"
+            "空间不足时不开始解压"
+        )
+        self.max_ratio_label = QLabel("压缩比上限:")
+        self.max_ratio_spin = QSpinBox()
+        self.max_ratio_spin.setRange(0, 100000)
+        self.max_ratio_spin.setValue(DEFAULT_MAX_RATIO)
+        self.max_ratio_spin.setSuffix(" 倍")
+        self.max_ratio_spin.setSpecialValueText("不限")
+        self.max_ratio_spin.setToolTip(
+            "解压后的大小超过压缩包大小的这个倍数时视为解压炸弹并拒绝解压 (0 表示不限)"
+        )
+        unpack_options = QHBoxLayout()
+        unpack_options.addWidget(self.unpack_workers_spin)
+        unpack_options.addWidget(self.preflight_check)
+        unpack_options.addWidget(self.max_ratio_label)
+        unpack_options.addWidget(self.max_ratio_spin)
+        unpack_options.addStretch(1)
+        unpack_layout.addWidget(self.unpack_workers_label, 2, 0)
+        unpack_layout.addLayout(unpack_options, 2, 1)
+
+        # 解压: 压缩包内容浏览 (只读取目录，不解压数据)
+        self.archive_model = ArchiveTreeModel(self)
+        self.archive_tree = QTreeView()
+        self.archive_tree.setModel(self.archive_model)
+        self.archive_tree.setUniformRowHeights(True)  # 行高固定时视图只需绘制可见行
+        self.archive_tree.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection
+        )
+        self.archive_tree.setMinimumHeight(140)
+        tree_header = self.archive_tree.header()
+        tree_header.setStretchLastSection(False)
+        tree_header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for column in range(1, len(ArchiveTreeModel.COLUMNS)):
+            tree_header.setSectionResizeMode(
+                column, QHeaderView.ResizeMode.ResizeToContents
+            )
+        self.archive_summary_label = QLabel("")
+        self.archive_summary_label.setObjectName("HintLabel")
+        unpack_layout.addWidget(self.archive_tree, 3, 0, 1, 3)
+        unpack_layout.addWidget(self.archive_summary_label, 4, 0, 1, 3)
+        self.archive_tree.selectionModel().selectionChanged.connect(
+            self.on_archive_selection_changed
+        )
+
+        # 解压: 只解压选中的条目
+        self.members_label = QLabel("仅解压:")
+        self.members_edit = QLineEdit()
+        self.members_edit.setPlaceholderText(
+            "留空解压全部; 可在上方选择，或输入路径/通配符 (用 ; 分隔)"
+        )
+        unpack_layout.addWidget(self.members_label, 5, 0)
+        unpack_layout.addWidget(self.members_edit, 5, 1, 1, 2)
+
+        self.unpack_group.setLayout(unpack_layout)
+        self.stacked_widget.addWidget(self.unpack_group)
+
+        self.archive_button.clicked.connect(self.select_archive_file)
+        self.extract_button.clicked.connect(self.select_extract_folder)
+        self.archive_edit.editingFinished.connect(self.browse_archive)
+
     # --- 模式切换槽函数 ---
     def switch_mode(self, checked):
         if self.pack_radio.isChecked():
@@ -288,6 +846,7 @@ class PackApp(QWidget):
         else:  # unpack_radio is checked
             if self.current_mode != self.MODE_UNPACK:
                 self.current_mode = self.MODE_UNPACK
+                self.ensure_unpack_page()
                 self.stacked_widget.setCurrentWidget(
                     self.unpack_group
                 )  # 切换到解压页面
@@ -297,62 +856,271 @@ class PackApp(QWidget):
 
     def update_action_button_style(self):
         """根据当前模式更新主操作按钮的文本和图标"""
-        icon_size = QSize(20, 20)
-        icon_color = "#A9A9A9"
-        icon_color_active = "#E0E0E0"
+        self.test_button.setVisible(self.current_mode == self.MODE_UNPACK)
         if self.current_mode == self.MODE_PACK:
             self.action_button.setText(" 开始打包")
-            try:
-                pack_icon = qta.icon(
-                    "fa5s.compress-alt",
-                    color=icon_color,
-                    color_active=icon_color_active,
-                )
-                self.action_button.setIcon(pack_icon)
-            except Exception:
-                self.action_button.setIcon(QIcon())
-            self.action_button.setIconSize(icon_size)
-            # 恢复打包按钮的绿色样式 (如果 QSS 中定义了 ActionButton)
-            self.action_button.setStyleSheet("")  # 清除可能存在的特定样式，让 QSS 生效
+            self.set_button_icon(self.action_button, "fa5s.compress-alt")
         else:  # MODE_UNPACK
             self.action_button.setText(" 开始解压")
-            try:
-                unpack_icon = qta.icon(
-                    "fa5s.expand-alt", color=icon_color, color_active=icon_color_active
-                )
-                self.action_button.setIcon(unpack_icon)
-            except Exception:
-                self.action_button.setIcon(QIcon())
-            self.action_button.setIconSize(icon_size)
-            self.action_button.setStyleSheet("")  # 清除可能存在的特定样式，让 QSS 生效
+            self.set_button_icon(self.action_button, "fa5s.expand-alt")
+
+    def set_button_icon(self, button, name):
+        """
+        设置按钮图标 (图标由 icons.icon 缓存)。窗口第一次绘制之前只记下图标名称，
+        等窗口显示出来后再由 load_pending_icons 统一生成，加载 qtawesome 不会推迟首次绘制。
+        """
+        button.setIconSize(ICON_SIZE)  # 先固定图标尺寸，之后补上图标时布局不会跳动
+        if self.pending_icons is None:
+            button.setIcon(icon(name))
+        else:
+            self.pending_icons[button] = name
+
+    def load_pending_icons(self):
+        pending, self.pending_icons = self.pending_icons, None
+        for button, name in (pending or {}).items():
+            button.setIcon(icon(name))
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_time is None:
+            self.first_paint_time = time.perf_counter()
+            # 等这一帧显示完后再加载图标
+            QTimer.singleShot(0, self.on_first_paint)
+
+    def on_first_paint(self):
+        self.load_pending_icons()
+        self.icons_ready_time = time.perf_counter()
+        self.load_engine()
+        self.first_painted.emit()
+
+    def load_engine(self):
+        """
+        导入打包/解压引擎并补全依赖它的控件: 格式列表、zip 压缩方法、级别范围、块大小和缓存上限的默认值，
+        以及任务调度器。首次绘制后调用，开始任务前也会调用 (只执行一次)。
+        """
+        if self.scheduler is not None:
+            return
+        import shutil
+
+        from .blockcompress import DEFAULT_BLOCK_SIZE
+        from .cache import DEFAULT_MAX_BYTES
+        from .jobs import RESOURCE_CPU, RESOURCE_IO, JobScheduler
+        from .packer import ZIP_METHODS
+
+        # 导入 packer 时才注册 zstdtar 等可选格式; 按原顺序插入到 zip 前后，当前选择不变
+        supported_formats = [fmt[0] for fmt in shutil.get_archive_formats()]
+        supported_formats.reverse()
+        for index, name in enumerate(supported_formats):
+            if name != "zip":
+                self.format_combo.insertItem(index, name)
+        self.method_combo.addItems(list(ZIP_METHODS))
+        self.block_size_spin.setValue(DEFAULT_BLOCK_SIZE // (1024 * 1024))
+        self.cache_size_spin.setValue(DEFAULT_MAX_BYTES // (1024 * 1024 * 1024))
+        self.update_level_range()
+
+        self.scheduler = JobScheduler(on_update=self.job_signals.updated.emit)
+        self.cpu_slots_spin.setValue(self.scheduler.limits[RESOURCE_CPU])
+        self.io_slots_spin.setValue(self.scheduler.limits[RESOURCE_IO])
+        self.cancel_jobs_button.clicked.connect(self.scheduler.cancel_all)
+        self.clear_jobs_button.clicked.connect(self.clear_finished_jobs)
+        self.cpu_slots_spin.valueChanged.connect(
+            lambda value: self.scheduler.set_limits(cpu_slots=value)
+        )
+        self.io_slots_spin.valueChanged.connect(
+            lambda value: self.scheduler.set_limits(io_slots=value)
+        )
+
+    def update_parallel_options(self, *_):
+        """只有支持并行压缩的格式才允许设置线程数和块大小，只有 zip 支持增量更新"""
+        archive_format = self.format_combo.currentText()
+        block_mode = archive_format in ("gztar", "bztar", "xztar", "lz4tar")
+        self.workers_spin.setEnabled(archive_format in ("zip", "zstdtar") or block_mode)
+        self.block_size_spin.setEnabled(block_mode and self.workers_spin.value() > 1)
+        # 只有 zip 能按条目复用旧的压缩数据
+        self.incremental_check.setEnabled(archive_format == "zip")
+        self.verify_hash_check.setEnabled(
+            archive_format == "zip" and self.incremental_check.isChecked()
+        )
+        self.cache_check.setEnabled(archive_format == "zip")
+        self.cache_size_spin.setEnabled(
+            archive_format == "zip" and self.cache_check.isChecked()
+        )
+
+    def update_level_range(self, *_):
+        """按所选格式和压缩方法更新级别的范围; 不支持设置级别时禁用"""
+        archive_format = self.format_combo.currentText()
+        self.method_combo.setEnabled(archive_format == "zip")
+        method = self.method_combo.currentText() if archive_format == "zip" else None
+        # 只有 zip 能按条目选择是否压缩
+        self.adaptive_check.setEnabled(method not in (None, "stored"))
+        from .packer import compression_levels
+
+        levels = compression_levels(archive_format, method)
+        self.level_spin.setEnabled(levels is not None)
+        if levels is not None:
+            low, high, default = levels
+            self.level_spin.setRange(low, high)
+            self.level_spin.setValue(default)
+
+    def schedule_estimate(self, *_):
+        self.estimate_timer.start()
+
+    def start_estimate(self):
+        """在后台预估当前源路径和格式下各压缩选项的结果"""
+        if self.estimate_worker is not None:
+            self.estimate_worker.control.cancel()
+            self.estimate_worker = None
+        self.estimates = []
+        self.estimate_table.setRowCount(0)
+        sources = split_paths(self.source_edit.text())
+        archive_format = self.format_combo.currentText()
+        if len(sources) != 1 or not os.path.exists(sources[0]):
+            self.estimate_status_label.setText("")
+            return
+        from .packer import compression_levels
+
+        if compression_levels(archive_format) is None and archive_format not in (
+            "zip",
+            "tar",
+        ):
+            self.estimate_status_label.setText(f"{archive_format} 格式不支持预估")
+            return
+        self.estimate_status_label.setText("正在抽样预估...")
+        worker = EstimateWorker(
+            sources[0],
+            archive_format,
+            self.workers_spin.value(),
+            self.pack_excludes(),
+            self,
+        )
+        worker.estimated.connect(self.on_estimated)
+        worker.failed.connect(
+            lambda message: self.estimate_status_label.setText(f"无法预估: {message}")
+        )
+        worker.finished.connect(worker.deleteLater)
+        self.estimate_worker = worker
+        worker.start()
+
+    def on_estimated(self, estimates):
+        if self.sender() is not self.estimate_worker:
+            return  # 输入已经变化，结果作废
+        self.estimate_worker = None
+        self.estimates = estimates
+        self.estimate_table.setRowCount(len(estimates))
+        for row, estimate in enumerate(estimates):
+            cells = [
+                estimate.label,
+                format_size(estimate.size),
+                f"{estimate.ratio:.1%}",
+                f"{estimate.seconds:.1f} 秒",
+            ]
+            for column, text in enumerate(cells):
+                self.estimate_table.setItem(row, column, QTableWidgetItem(text))
+        total = estimates[0].source_bytes if estimates else 0
+        self.estimate_status_label.setText(
+            f"源数据共 {format_size(total)}，以上为抽样推算的结果"
+        )
+
+    def apply_estimate(self, row, _column):
+        estimate = self.estimates[row]
+        if estimate.method is not None:
+            self.method_combo.setCurrentText(estimate.method)
+        if estimate.level is not None:
+            self.level_spin.setValue(estimate.level)
+
+    def compression_cache(self):
+        """启用压缩缓存时返回与其他任务共享的缓存实例，否则返回 None"""
+        if not (self.cache_check.isEnabled() and self.cache_check.isChecked()):
+            return None
+        from .cache import shared_cache
+
+        try:
+            return shared_cache(max_bytes=self.cache_size_spin.value() * 1024**3)
+        except OSError as e:
+            # 缓存目录不可写时照常打包，只是不使用缓存
+            print(f"压缩缓存不可用: {e}")
+            return None
+
+    def update_cache_stats(self, *_):
+        cache = self.compression_cache()
+        if cache is None:
+            self.cache_stats_label.setText("")
+            return
+        stats = cache.stats()
+        self.cache_stats_label.setText(
+            f"命中 {stats.hits} / 未命中 {stats.misses} · "
+            f"已用 {format_size(stats.size)} / {format_size(stats.max_bytes)}"
+        )
+
+    def pack_options(self) -> dict:
+        """当前界面上的打包选项，传给 pack_archive"""
+        incremental = (
+            self.incremental_check.isEnabled() and self.incremental_check.isChecked()
+        )
+        archive_format = self.format_combo.currentText()
+        method = None
+        if archive_format == "zip":
+            from .packer import DEFAULT_ZIP_METHOD
+
+            method = self.method_combo.currentText() or DEFAULT_ZIP_METHOD
+        level = self.level_spin.value() if self.level_spin.isEnabled() else None
+        return dict(
+            method=method,
+            level=level,
+            adaptive=self.adaptive_check.isEnabled()
+            and self.adaptive_check.isChecked(),
+            workers=self.workers_spin.value(),
+            block_size=self.block_size_spin.value() * 1024 * 1024,
+            incremental=incremental,
+            verify_hash=incremental and self.verify_hash_check.isChecked(),
+            cache=self.compression_cache(),
+            excludes=self.pack_excludes(),
+            verify=self.verify_check.isChecked(),
+            volume_size=self.volume_spin.value() * 1024 * 1024 or None,
+            dedup=self.dedup_check.isChecked(),
+        )
+
+    def pack_excludes(self):
+        """打包时的排除规则列表，未填写时返回 None"""
+        return split_paths(self.excludes_edit.text()) or None
 
     def clear_inputs(self):
         """清空所有输入框"""
         self.source_edit.clear()
         self.dest_edit.clear()
-        self.archive_edit.clear()
-        self.extract_edit.clear()
+        self.excludes_edit.clear()
+        if self.unpack_group is not None:
+            self.archive_edit.clear()
+            self.extract_edit.clear()
+            self.members_edit.clear()
+            self.browse_archive()
         self.progress_bar.setValue(0)
-        self.progress_bar.setStyleSheet("")  # 清除进度条样式
-        self.status_label.setStyleSheet("color: #A9A9A9;")  # 恢复默认颜色
+        self.set_progress_failed(False)  # 清除进度条样式
+        self.set_status_tone(TONE_NORMAL)  # 恢复默认颜色
 
     def select_source_path(self):
-        folder = QFileDialog.getExistingDirectory(self, "选择源文件夹")
-        if folder:
-            self.source_edit.setText(folder)
-            self.status_label.setText("已选择源文件夹")
-            self.status_label.setStyleSheet("color: #A9A9A9;")
+        dialog = QFileDialog(self, "选择源文件夹 (按住 Ctrl 可多选)")
+        dialog.setFileMode(QFileDialog.FileMode.Directory)
+        # 系统原生对话框不能多选文件夹，使用 Qt 对话框并放开其内部视图的多选
+        dialog.setOption(QFileDialog.Option.DontUseNativeDialog, True)
+        for view in dialog.findChildren(QAbstractItemView):
+            view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        if dialog.exec():
+            folders = dialog.selectedFiles()
+            self.source_edit.setText("; ".join(folders))
+            if len(folders) > 1:
+                self.status_label.setText(f"已选择 {len(folders)} 个源文件夹")
+            else:
+                self.status_label.setText("已选择源文件夹")
+            self.set_status_tone(TONE_NORMAL)
 
     def select_dest_file(self):
+        from .packer import ARCHIVE_EXTENSIONS
+
         selected_format = self.format_combo.currentText()
-        format_map = {
-            "zip": "zip",
-            "tar": "tar",
-            "gztar": "tar.gz",
-            "bztar": "tar.bz2",
-            "xztar": "tar.xz",
-        }
-        extension = format_map.get(selected_format, selected_format)
+        extension = ARCHIVE_EXTENSIONS.get(
+            selected_format, f".{selected_format}"
+        ).lstrip(".")
         filter_str = f"{selected_format.upper()} 文件 (*.{extension})"
 
         source_path = self.source_edit.text()  # 使用 source_path 变量名
@@ -377,28 +1145,102 @@ class PackApp(QWidget):
         if file_path:
             self.dest_edit.setText(file_path)
             self.status_label.setText("已选择保存路径")
-            self.status_label.setStyleSheet("color: #A9A9A9;")
+            self.set_status_tone(TONE_NORMAL)
 
     def select_archive_file(self):
-        filters = "压缩文件 (*.zip *.rar *.7z *.tar *.gz *.bz2 *.xz);;所有文件 (*.*)"
-        file_path, _ = QFileDialog.getOpenFileName(self, "选择压缩文件", "", filters)
-        if file_path:
-            self.archive_edit.setText(file_path)
-            self.status_label.setText("已选择压缩文件")
-            self.status_label.setStyleSheet("color: #A9A9A9;")
+        filters = (
+            "压缩文件 (*.zip *.rar *.7z *.tar *.gz *.bz2 *.xz *.zst *.tzst *.lz4 *.001);;"
+            "所有文件 (*.*)"
+        )
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "选择压缩文件", "", filters)
+        if file_paths:
+            self.archive_edit.setText("; ".join(file_paths))
+            if len(file_paths) > 1:
+                self.status_label.setText(f"已选择 {len(file_paths)} 个压缩文件")
+            else:
+                self.status_label.setText("已选择压缩文件")
+            self.set_status_tone(TONE_NORMAL)
+            self.browse_archive()
+
+    def browse_archive(self):
+        """在后台读取所选压缩包的目录并显示在内容树中 (选择了多个压缩包时不显示)"""
+        archives = split_paths(self.archive_edit.text())
+        archive_file = archives[0] if len(archives) == 1 else ""
+        if self.index_worker is not None:
+            if self.index_worker.archive_file == archive_file:
+                return
+            self.index_worker.control.cancel()
+            self.index_worker = None
+        current = self.archive_model.archive_index
+        if current is not None and current.archive_file == archive_file:
+            return
+        self.archive_model.set_index(None)
+        self.members_edit.clear()
+        if not archive_file or not os.path.isfile(archive_file):
+            self.archive_summary_label.setText("")
+            return
+        from .browser import IndexWorker
+
+        self.archive_summary_label.setText("正在读取压缩包目录...")
+        worker = IndexWorker(archive_file, self)
+        worker.progress.connect(
+            lambda count: self.archive_summary_label.setText(
+                f"正在读取压缩包目录... 已读取 {count} 项"
+            )
+        )
+        worker.loaded.connect(self.on_archive_indexed)
+        worker.failed.connect(
+            lambda message: self.archive_summary_label.setText(
+                f"无法读取压缩包目录: {message}"
+            )
+        )
+        worker.finished.connect(worker.deleteLater)
+        self.index_worker = worker
+        worker.start()
+
+    def on_archive_indexed(self, archive_index):
+        worker = self.sender()
+        if worker is not self.index_worker:
+            return  # 已经切换到另一个压缩包
+        self.index_worker = None
+        self.archive_model.set_index(archive_index)
+        self.archive_summary_label.setText(
+            f"{archive_index.file_count} 个文件, {archive_index.dir_count} 个文件夹, "
+            f"共 {format_size(archive_index.total_size)} "
+            f"(读取用时 {worker.elapsed:.2f} 秒)"
+        )
+
+    def on_archive_selection_changed(self, *_):
+        """把内容树中选中的文件和文件夹填入"仅解压"输入框"""
+        rows = self.archive_tree.selectionModel().selectedRows()
+        paths = [self.archive_model.item_path(index) for index in rows]
+        self.members_edit.setText("; ".join(paths))
+
+    def selected_members(self):
+        """要解压的条目列表，未指定时返回 None (解压全部)"""
+        return split_paths(self.members_edit.text()) or None
+
+    def closeEvent(self, event):
+        # 读取目录和预估的线程属于窗口，关闭前先让它们退出
+        for worker in (self.index_worker, self.estimate_worker):
+            if worker is not None:
+                worker.control.cancel()
+                worker.wait()
+        super().closeEvent(event)
 
     def select_extract_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "选择目标文件夹")
         if folder:
             self.extract_edit.setText(folder)
             self.status_label.setText("已选择目标文件夹")
-            self.status_label.setStyleSheet("color: #A9A9A9;")
+            self.set_status_tone(TONE_NORMAL)
 
     def start_action(self):
         """根据当前模式启动打包或解压"""
+        self.load_engine()
         self.action_button.setEnabled(False)
         self.progress_bar.setValue(0)
-        self.progress_bar.setStyleSheet("")
+        self.set_progress_failed(False)
 
         if self.current_mode == self.MODE_PACK:
             self.start_packaging()
@@ -406,8 +1248,16 @@ class PackApp(QWidget):
             self.start_unpacking()
 
     def start_packaging(self):
+        from .packer import ARCHIVE_EXTENSIONS
+
+        if len(split_paths(self.source_edit.text())) > 1:
+            # 选择了多个源文件夹时，逐个加入任务队列
+            self.enqueue_current()
+            self.action_button.setEnabled(True)
+            return
+
         # 使用更通用的变量名 source_path
-        source_path = self.source_edit.text()
+        source_path = self.source_edit.text().strip().rstrip(";").strip()
         dest_file_full_path = self.dest_edit.text()
         archive_format = self.format_combo.currentText()
 
@@ -446,14 +1296,7 @@ class PackApp(QWidget):
         dest_dir = os.path.dirname(dest_file_full_path)
         base_filename = os.path.basename(dest_file_full_path)
         base_name_for_shutil = dest_file_full_path
-        format_map = {
-            "zip": ".zip",
-            "tar": ".tar",
-            "gztar": ".tar.gz",
-            "bztar": ".tar.bz2",
-            "xztar": ".tar.xz",
-        }
-        expected_ext = format_map.get(archive_format)
+        expected_ext = ARCHIVE_EXTENSIONS.get(archive_format)
 
         if expected_ext:
             if base_name_for_shutil.lower().endswith(expected_ext):
@@ -475,7 +1318,7 @@ class PackApp(QWidget):
             return
 
         self.status_label.setText(f"正在打包 {archive_format}...")
-        self.status_label.setStyleSheet("color: #FFD700;")  # 黄色
+        self.set_status_tone(TONE_BUSY)
 
         # 使用计算好的 parent_dir 和 item_to_archive
         self.worker = PackWorker(
@@ -483,15 +1326,26 @@ class PackApp(QWidget):
             archive_format,
             parent_dir,  # root_dir: 父目录
             item_to_archive,  # base_dir: 要打包的文件或文件夹名
+            telemetry_log=self.telemetry_log_path(),
+            **self.pack_options(),
         )
+        self.worker.telemetry_event.connect(self.on_telemetry_event)
 
         self.worker.progress.connect(self.update_progress)
+        self.worker.status.connect(self.update_status)
         self.worker.finished.connect(self.on_action_finished)
         self.worker.error.connect(self.on_action_error)
+        self.worker.cancelled.connect(self.on_action_cancelled)
         self.worker.start()
+        self.set_job_controls_enabled(True)
 
     def start_unpacking(self):
-        archive_file = self.archive_edit.text()
+        if len(split_paths(self.archive_edit.text())) > 1:
+            self.enqueue_current()
+            self.action_button.setEnabled(True)
+            return
+
+        archive_file = self.archive_edit.text().strip().rstrip(";").strip()
         extract_dir = self.extract_edit.text()
 
         if not archive_file or not os.path.isfile(archive_file):
@@ -516,48 +1370,289 @@ class PackApp(QWidget):
                 return
 
         self.status_label.setText(f"正在解压 {os.path.basename(archive_file)}...")
-        self.status_label.setStyleSheet("color: #FFD700;")  # 黄色
-
-        self.worker = UnpackWorker(archive_file, extract_dir)
+        self.set_status_tone(TONE_BUSY)
+
+        self.worker = UnpackWorker(
+            archive_file,
+            extract_dir,
+            workers=self.unpack_workers_spin.value(),
+            members=self.selected_members(),
+            telemetry_log=self.telemetry_log_path(),
+            **self.unpack_check_options(),
+        )
+        self.worker.telemetry_event.connect(self.on_telemetry_event)
         self.worker.progress.connect(self.update_progress)
+        self.worker.status.connect(self.update_status)
         self.worker.finished.connect(self.on_action_finished)  # 连接到通用完成槽
         self.worker.error.connect(self.on_action_error)  # 连接到通用错误槽
+        self.worker.cancelled.connect(self.on_action_cancelled)
         self.worker.start()
+        self.set_job_controls_enabled(True)
+
+    def start_testing(self):
+        archive_file = self.archive_edit.text().strip().rstrip(";").strip()
+        if not archive_file or not os.path.isfile(archive_file):
+            QMessageBox.warning(self, "输入错误", "请选择一个有效的压缩文件！")
+            return
+        self.action_button.setEnabled(False)
+        self.test_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.set_progress_failed(False)
+        self.status_label.setText(f"正在校验 {os.path.basename(archive_file)}...")
+        self.set_status_tone(TONE_BUSY)
+
+        self.worker = TestWorker(archive_file, workers=self.unpack_workers_spin.value())
+        self.worker.progress.connect(self.update_progress)
+        self.worker.status.connect(self.update_status)
+        self.worker.finished.connect(self.on_action_finished)
+        self.worker.error.connect(self.on_action_error)
+        self.worker.cancelled.connect(self.on_action_cancelled)
+        self.worker.start()
+        self.set_job_controls_enabled(True)
+
+    def enqueue_current(self):
+        """按当前模式和选项把 (一个或多个) 任务加入队列"""
+        self.load_engine()
+        if self.current_mode == self.MODE_PACK:
+            jobs = self.build_pack_jobs(split_paths(self.source_edit.text()))
+        else:
+            jobs = self.build_unpack_jobs(split_paths(self.archive_edit.text()))
+        for job in jobs:
+            self.scheduler.submit(job)
+        if jobs:
+            self.status_label.setText(f"已加入 {len(jobs)} 个任务到队列")
+            self.set_status_tone(TONE_NORMAL)
+
+    def build_pack_jobs(self, sources):
+        from .jobs import pack_job_for
+
+        jobs = []
+        for source in sources:
+            try:
+                jobs.append(
+                    pack_job_for(
+                        source,
+                        self.format_combo.currentText(),
+                        dest=self.dest_edit.text().strip(),
+                        multiple=len(sources) > 1,
+                        **self.pack_options(),
+                    )
+                )
+            except ValueError as e:
+                QMessageBox.warning(self, "输入错误", str(e))
+        return jobs
+
+    def build_unpack_jobs(self, archives):
+        from .jobs import unpack_job_for
+
+        extract_dir = self.extract_edit.text().strip()
+        if not extract_dir:
+            QMessageBox.warning(self, "输入错误", "请选择目标文件夹！")
+            return []
+        jobs = []
+        for archive_file in archives:
+            try:
+                jobs.append(
+                    unpack_job_for(
+                        archive_file,
+                        extract_dir,
+                        multiple=len(archives) > 1,
+                        workers=self.unpack_workers_spin.value(),
+                        members=self.selected_members(),
+                        **self.unpack_check_options(),
+                    )
+                )
+            except ValueError as e:
+                QMessageBox.warning(self, "输入错误", str(e))
+        return jobs
+
+    def unpack_check_options(self) -> dict:
+        """解压前预检的选项，单个解压和队列任务共用"""
+        return dict(
+            preflight=self.preflight_check.isChecked(),
+            max_ratio=self.max_ratio_spin.value(),
+        )
+
+    def on_job_updated(self, job):
+        from .jobs import JOB_PACK, STATUS_DONE
+
+        row = self.job_rows.get(job.job_id)
+        if row is None:
+            row = self.job_table.rowCount()
+            self.job_table.insertRow(row)
+            self.job_rows[job.job_id] = row
+            kind = "打包" if job.kind == JOB_PACK else "解压"
+            self.job_table.setItem(row, 0, QTableWidgetItem(f"#{job.job_id} {kind}"))
+            source_item = QTableWidgetItem(os.path.basename(job.source))
+            source_item.setToolTip(f"{job.source}\n→ {job.target}")
+            self.job_table.setItem(row, 1, source_item)
+        status_item = QTableWidgetItem(job.status)
+        status_item.setToolTip(job.message)
+        self.job_table.setItem(row, 2, status_item)
+        info = job.progress
+        percent = 100 if job.status == STATUS_DONE else (info.percent if info else 0)
+        self.job_table.setItem(row, 3, QTableWidgetItem(f"{percent}%"))
+        speed = f"{info.speed / (1024 * 1024):.1f} MB/s" if info else ""
+        self.job_table.setItem(row, 4, QTableWidgetItem(speed))
+        if job.kind == JOB_PACK and not job.active:
+            self.update_cache_stats()
+
+    def clear_finished_jobs(self):
+        self.scheduler.clear_finished()
+        self.job_table.setRowCount(0)
+        self.job_rows.clear()
+        for job in self.scheduler.jobs:
+            self.on_job_updated(job)
 
     def update_progress(self, value):
         self.progress_bar.setValue(value)
 
+    def set_status_tone(self, tone):
+        """状态文字的颜色，各 tone 的颜色见样式表中的 QLabel#StatusLabel[tone=...]"""
+        set_style_property(self.status_label, "tone", tone)
+
+    def set_progress_failed(self, failed):
+        """任务失败时进度条显示为红色"""
+        set_style_property(self.progress_bar, "failed", failed)
+
+    def update_status(self, text):
+        if self.worker is not None and self.worker.control.paused:
+            return  # 暂停后仍可能收到排队中的进度信号，保留"已暂停"提示
+        self.status_label.setText(text)
+
+    def set_job_controls_enabled(self, running):
+        """任务运行期间启用暂停/取消按钮"""
+        self.pause_button.setEnabled(running)
+        self.cancel_button.setEnabled(running)
+        self.test_button.setEnabled(not running)
+        self.pause_button.setText(" 暂停")
+        self.set_button_icon(self.pause_button, "fa5s.pause")
+
+    def toggle_pause(self):
+        if self.worker is None:
+            return
+        control = self.worker.control
+        if control.paused:
+            control.resume()
+            self.pause_button.setText(" 暂停")
+            self.set_button_icon(self.pause_button, "fa5s.pause")
+            self.status_label.setText("继续运行...")
+            self.set_status_tone(TONE_BUSY)
+        else:
+            control.pause()
+            self.pause_button.setText(" 继续")
+            self.set_button_icon(self.pause_button, "fa5s.play")
+            self.status_label.setText("已暂停")
+            self.set_status_tone(TONE_NORMAL)
+
+    def cancel_action(self):
+        if self.worker is None:
+            return
+        self.worker.control.cancel()
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText("正在取消...")
+
+    def toggle_details(self, expanded):
+        self.details_view.setVisible(expanded)
+        self.details_toggle.setArrowType(
+            Qt.ArrowType.DownArrow if expanded else Qt.ArrowType.RightArrow
+        )
+
+    def telemetry_log_path(self):
+        return default_log_path() if self.telemetry_log_check.isChecked() else None
+
+    def on_telemetry_event(self, event):
+        """运行中按快照事件刷新详情面板，任务结束后显示完整的分解"""
+        if event.kind == "start":
+            self.details_view.clear()
+        elif event.kind == "sample":
+            summary = TelemetrySummary(
+                operation=event.data["operation"],
+                status=STATUS_RUNNING,
+                elapsed=event.elapsed,
+                phases=event.data["phases"],
+                peaks=event.data["peaks"],
+            )
+            self.details_view.setPlainText(summary.breakdown())
+        elif event.kind == "finish":
+            self.details_view.setPlainText(TelemetrySummary(**event.data).breakdown())
+
     def on_action_finished(self, message):
         """处理打包或解压成功完成"""
         self.progress_bar.setValue(100)
         self.status_label.setText(message or "操作完成！")
-        self.status_label.setStyleSheet("color: #90EE90;")  # 浅绿色
+        self.set_status_tone(TONE_OK)
         self.action_button.setEnabled(True)
+        self.set_job_controls_enabled(False)
+        self.update_cache_stats()
         QMessageBox.information(self, "成功", message or "操作已成功完成！")
         self.worker = None
 
     def on_action_error(self, error_message):
         """处理打包或解压过程中发生的错误"""
         self.progress_bar.setValue(100)  # 或保持0
-        self.progress_bar.setStyleSheet("""
-            QProgressBar::chunk {
-                background-color: #DC143C; /* 猩红色 */
-                border-radius: 5px;
-            }
-        """)
+        self.set_progress_failed(True)
         self.status_label.setText(f"错误: {error_message}")
-        self.status_label.setStyleSheet("color: #F08080;")  # 浅珊瑚色
+        self.set_status_tone(TONE_ERROR)
         self.action_button.setEnabled(True)
+        self.set_job_controls_enabled(False)
         QMessageBox.critical(self, "操作失败", error_message)
         self.worker = None
 
+    def on_action_cancelled(self, message):
+        """处理用户取消的任务"""
+        self.progress_bar.setValue(0)
+        self.status_label.setText(message)
+        self.set_status_tone(TONE_NORMAL)
+        self.action_button.setEnabled(True)
+        self.set_job_controls_enabled(False)
+        self.worker = None
+
+
+def split_paths(text):
+    """输入框中的多个路径以 ";" 分隔"""
+    return [path.strip() for path in text.split(";") if path.strip()]
+
+
+# 启动后在第一次绘制、图标和引擎加载完成时输出各阶段耗时并退出，用于比较启动速度
+STARTUP_TIME_FLAG = "--startup-time"
+
+
+def report_startup(marks):
+    """marks: [(阶段名称, perf_counter 时间), ...]，按顺序输出累计和单阶段耗时"""
+    print("启动耗时 (从导入 zip_gui.app 开始):")
+    previous = _IMPORT_START
+    for name, when in marks:
+        print(
+            f"  {name:<12} {(when - _IMPORT_START) * 1000:8.1f} ms"
+            f"  (+{(when - previous) * 1000:.1f} ms)"
+        )
+        previous = when
+
 
 def run():
+    measure_startup = STARTUP_TIME_FLAG in sys.argv
+    if measure_startup:
+        sys.argv.remove(STARTUP_TIME_FLAG)
+    marks = [("导入模块", time.perf_counter())]
     app = QApplication(sys.argv)
     style_sheet = load_stylesheet()
     if style_sheet:
         app.setStyleSheet(style_sheet)
+    marks.append(("创建应用", time.perf_counter()))
     ex = PackApp()
+    marks.append(("创建窗口", time.perf_counter()))
+    if measure_startup:
+
+        def on_first_painted():
+            marks.append(("首次绘制", ex.first_paint_time))
+            marks.append(("图标就绪", ex.icons_ready_time))
+            marks.append(("引擎就绪", time.perf_counter()))
+            report_startup(marks)
+            app.quit()
+
+        ex.first_painted.connect(on_first_painted)
     ex.show()
     sys.exit(app.exec())
 
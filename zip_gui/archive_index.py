@@ -0,0 +1,444 @@
+# 压缩包内容索引: 只读取 zip 中央目录或 tar 各条目的头部，构建目录树并逐级汇总大小，
+# 供界面浏览和选择性解压使用。解析结果按 (路径, 大小, 修改时间) 缓存，再次打开同一压缩包时直接返回。
+
+import os
+import shutil
+import struct
+import threading
+import time
+import zipfile
+from array import array
+from collections import OrderedDict
+
+from .fastcodecs import is_tar_archive, open_tar
+from .volumes import is_zip_archive, open_archive, open_zip
+
+_INDEX_CACHE_SIZE = 8
+_PROGRESS_INTERVAL = 10000  # 每读取这么多条目汇报一次进度并响应取消
+
+# zip 规范中的结构 (与 zipfile 模块内部使用的定义一致)
+_END_RECORD = struct.Struct("<4s4H2LH")
+_END_RECORD64 = struct.Struct("<4sQ2H2L4Q")
+_END_LOCATOR64 = struct.Struct("<4sLQL")
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+# 只解析浏览需要的字段: 签名、标志位、时间、日期、压缩后大小、大小、名称/扩展/注释长度
+_CENTRAL_DIR_FIELDS = struct.Struct("<4s4xH2x2H4x2L3H")
+# 只解析定位下一个条目所需的字段: 签名、标志位、名称/扩展/注释长度
+_CENTRAL_DIR_LENGTHS = struct.Struct("<4s4xH18x3H")
+_MAX_COMMENT = 0xFFFF
+_UTF8_FLAG = 0x800
+
+
+class DirNode:
+    """
+    目录树中的一个目录; size/compressed_size/files 包含其下所有文件。
+    文件不单独创建对象，只在 ArchiveIndex 的数组中占一个编号，目录节点只保存这些编号。
+    """
+
+    __slots__ = (
+        "name",
+        "parent",
+        "dirs",
+        "files",
+        "size",
+        "compressed_size",
+        "file_count",
+        "mtime",
+        "row",
+        "_sorted",
+    )
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.dirs = {}  # 名称 -> DirNode
+        self.files = []  # 直接位于该目录下的文件编号
+        self.size = 0
+        self.compressed_size = 0
+        self.file_count = 0
+        self.mtime = 0.0
+        self.row = 0  # 在父目录 sorted_children() 中的位置
+        self._sorted = None
+
+    @property
+    def path(self) -> str:
+        """压缩包内的路径，以 "/" 结尾; 根目录为空字符串"""
+        parts = []
+        node = self
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        return "".join(f"{part}/" for part in reversed(parts))
+
+    def sorted_children(self, index) -> list:
+        """
+        目录在前、按名称排序的子项列表: 子目录为 DirNode，文件为 int 编号。
+        首次调用时排序并缓存，界面只对展开过的目录调用，未展开的目录不需要排序。
+        """
+        if self._sorted is None:
+            dirs = sorted(self.dirs.values(), key=lambda n: n.name.casefold())
+            for row, node in enumerate(dirs):
+                node.row = row
+            names = index.names
+            files = sorted(self.files, key=lambda i: names[i].casefold())
+            self._sorted = dirs + files
+        return self._sorted
+
+
+class ArchiveIndex:
+    """
+    压缩包的目录树。文件的名称、大小和修改时间保存在紧凑的数组中 (按编号访问)，
+    百万级条目也只占用较少内存。add() 逐条加入条目并汇总目录大小: 压缩包中同一目录的条目
+    通常是连续的，所以文件大小先累加到所在目录，切换到另一个目录 (或调用 finish()) 时
+    再一次性累加到各级上级目录。
+    """
+
+    def __init__(self, archive_file, archive_format=""):
+        self.archive_file = archive_file
+        self.archive_format = archive_format
+        self.root = DirNode("", None)
+        self.dir_count = 0
+        self.elapsed = 0.0
+        self.names = []  # 文件名 (不含目录部分)
+        self.sizes = array("q")
+        self.compressed_sizes = array("q")
+        self.mtimes = array("d")
+        self._last_head = None
+        self._last_parent = self.root
+        self._pending = [0, 0, 0]  # 尚未累加到上级目录的 (大小, 压缩后大小, 文件数)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def total_size(self) -> int:
+        return self.root.size
+
+    def _dir_node(self, parts, node=None):
+        node = node or self.root
+        for part in parts:
+            child = node.dirs.get(part)
+            if child is None:
+                child = node.dirs[part] = DirNode(part, node)
+                self.dir_count += 1
+            node = child
+        return node
+
+    def _flush(self):
+        pending = self._pending
+        if pending[2]:
+            node = self._last_parent.parent
+            while node is not None:
+                node.size += pending[0]
+                node.compressed_size += pending[1]
+                node.file_count += pending[2]
+                node = node.parent
+            self._pending = [0, 0, 0]
+
+    def add(self, name, size, compressed_size, mtime, is_dir):
+        if "\\" in name:
+            name = name.replace("\\", "/")
+        name = name.strip("/")
+        if not name:
+            return
+        head, _, leaf = name.rpartition("/")
+        if head == self._last_head:
+            parent = self._last_parent
+        else:
+            parent = self._dir_node(part for part in head.split("/") if part)
+            self._flush()
+            self._last_head = head
+            self._last_parent = parent
+        if is_dir:
+            self._dir_node((leaf,), parent).mtime = mtime
+            return
+        parent.files.append(len(self.names))
+        self.names.append(leaf)
+        self.sizes.append(size)
+        self.compressed_sizes.append(compressed_size)
+        self.mtimes.append(mtime)
+        parent.size += size
+        parent.compressed_size += compressed_size
+        parent.file_count += 1
+        pending = self._pending
+        pending[0] += size
+        pending[1] += compressed_size
+        pending[2] += 1
+
+    def finish(self):
+        """把最后一个目录中尚未汇总的大小累加到上级目录"""
+        self._flush()
+
+    def find_dir(self, path):
+        """按压缩包内路径查找目录，不存在时返回 None"""
+        node = self.root
+        for part in path.split("/"):
+            if part:
+                node = node.dirs.get(part)
+                if node is None:
+                    return None
+        return node
+
+
+def _dos_mtime(dos_date, dos_time) -> float:
+    date_time = (
+        (dos_date >> 9) + 1980,
+        (dos_date >> 5) & 0xF,
+        dos_date & 0x1F,
+        dos_time >> 11,
+        (dos_time >> 5) & 0x3F,
+        (dos_time & 0x1F) * 2,
+    )
+    try:
+        return time.mktime(date_time + (0, 0, -1))
+    except (OverflowError, ValueError):
+        return 0.0
+
+
+def _read_central_directory(fp, with_concat=False):
+    """
+    返回 (中央目录的字节内容, 条目数)，with_concat=True 时再附加压缩包前面多出的字节数
+    (自解压文件等)；不是 zip 或结构异常时抛出 zipfile.BadZipFile。
+    """
+    fp.seek(0, os.SEEK_END)
+    file_size = fp.tell()
+    tail_size = min(file_size, _END_RECORD.size + _MAX_COMMENT)
+    fp.seek(file_size - tail_size)
+    tail = fp.read(tail_size)
+    pos = tail.rfind(zipfile.stringEndArchive)
+    if pos < 0 or pos + _END_RECORD.size > len(tail):
+        raise zipfile.BadZipFile("找不到中央目录结束记录")
+    end_pos = file_size - tail_size + pos
+    _sig, _disk, _disk_dir, _count_disk, count, cd_size, cd_offset, _comment = (
+        _END_RECORD.unpack_from(tail, pos)
+    )
+    concat = end_pos - cd_size - cd_offset
+    locator_pos = end_pos - _END_LOCATOR64.size
+    if locator_pos >= 0:
+        fp.seek(locator_pos)
+        locator = fp.read(_END_LOCATOR64.size)
+        if locator[:4] == zipfile.stringEndArchive64Locator:
+            fp.seek(locator_pos - _END_RECORD64.size)
+            record = _END_RECORD64.unpack(fp.read(_END_RECORD64.size))
+            if record[0] != zipfile.stringEndArchive64:
+                raise zipfile.BadZipFile("zip64 中央目录结束记录无效")
+            count, cd_size, cd_offset = record[7], record[8], record[9]
+            concat = locator_pos - _END_RECORD64.size - cd_size - cd_offset
+    fp.seek(cd_offset + concat)
+    data = fp.read(cd_size)
+    if len(data) != cd_size:
+        raise zipfile.BadZipFile("中央目录被截断")
+    if with_concat:
+        return data, count, concat
+    return data, count
+
+
+def _zip64_fields(extra, file_size, compress_size, header_offset=0):
+    # 字段为 0xFFFFFFFF 时，真实值按顺序保存在 zip64 扩展字段 (标识 0x0001) 中
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, length = struct.unpack_from("<HH", extra, pos)
+        if tag == 1:
+            values = list(struct.unpack_from(f"<{length // 8}Q", extra, pos + 4))
+            if file_size == 0xFFFFFFFF and values:
+                file_size = values.pop(0)
+            if compress_size == 0xFFFFFFFF and values:
+                compress_size = values.pop(0)
+            if header_offset == 0xFFFFFFFF and values:
+                header_offset = values.pop(0)
+            break
+        pos += 4 + length
+    return file_size, compress_size, header_offset
+
+
+def _parse_central_directory(data, count):
+    unpack = _CENTRAL_DIR_FIELDS.unpack_from
+    header_size = _CENTRAL_DIR.size
+    signature = zipfile.stringCentralDir
+    # 同一压缩包中大量条目的时间戳相同，缓存转换结果可以省去大部分 mktime 调用
+    mtimes = {}
+    pos = 0
+    for _ in range(count):
+        (
+            sig,
+            flags,
+            dos_time,
+            dos_date,
+            compress_size,
+            file_size,
+            name_len,
+            extra_len,
+            comment_len,
+        ) = unpack(data, pos)
+        if sig != signature:
+            raise zipfile.BadZipFile("中央目录条目签名无效")
+        name_end = pos + header_size + name_len
+        raw_name = data[pos + header_size : name_end]
+        name = raw_name.decode("utf-8" if flags & _UTF8_FLAG else "cp437")
+        if file_size == 0xFFFFFFFF or compress_size == 0xFFFFFFFF:
+            extra = data[name_end : name_end + extra_len]
+            file_size, compress_size, _ = _zip64_fields(extra, file_size, compress_size)
+        mtime = mtimes.get((dos_date, dos_time))
+        if mtime is None:
+            mtime = mtimes[dos_date, dos_time] = _dos_mtime(dos_date, dos_time)
+        yield name, file_size, compress_size, mtime, name.endswith("/")
+        pos = name_end + extra_len + comment_len
+
+
+def iter_zip_members(archive_file):
+    """
+    逐条产出 zip 条目 (名称, 大小, 压缩后大小, 修改时间, 是否目录)。
+    直接解析中央目录，不为每个条目创建 ZipInfo 对象，百万级条目也只需要很少的内存；
+    遇到本解析器不支持的结构时退回到 zipfile。
+    """
+    try:
+        with open_archive(archive_file) as fp:
+            data, count = _read_central_directory(fp)
+    except (zipfile.BadZipFile, struct.error):
+        data = None
+    if data is not None:
+        yield from _parse_central_directory(data, count)
+        return
+    with open_zip(archive_file) as zf:
+        for info in zf.infolist():
+            yield (
+                info.filename,
+                info.file_size,
+                info.compress_size,
+                time.mktime(info.date_time + (0, 0, -1)),
+                info.is_dir(),
+            )
+
+
+def select_zip_infos(archive_file, predicate) -> list:
+    """
+    返回名称满足 predicate(name, is_dir) 的条目的 ZipInfo 列表 (按在压缩包中的顺序)。
+    只为选中的条目创建 ZipInfo，百万级条目的压缩包中挑选少数文件时比 ZipFile 快得多。
+    """
+    try:
+        with open_archive(archive_file) as fp:
+            data, count, concat = _read_central_directory(fp, with_concat=True)
+    except (zipfile.BadZipFile, struct.error):
+        with open_zip(archive_file) as zf:
+            return [
+                info
+                for info in zf.infolist()
+                if predicate(info.filename, info.is_dir())
+            ]
+    unpack = _CENTRAL_DIR_LENGTHS.unpack_from
+    header_size = _CENTRAL_DIR.size
+    signature = zipfile.stringCentralDir
+    infos = []
+    pos = 0
+    for _ in range(count):
+        sig, flags, name_len, extra_len, comment_len = unpack(data, pos)
+        if sig != signature:
+            raise zipfile.BadZipFile("中央目录条目签名无效")
+        name_end = pos + header_size + name_len
+        extra_end = name_end + extra_len
+        name = data[pos + header_size : name_end].decode(
+            "utf-8" if flags & _UTF8_FLAG else "cp437"
+        )
+        if predicate(name, name.endswith("/")):
+            # 只有选中的条目才解析全部字段
+            fields = _CENTRAL_DIR.unpack_from(data, pos)
+            dos_time, dos_date = fields[7], fields[8]
+            info = zipfile.ZipInfo(
+                name,
+                (
+                    (dos_date >> 9) + 1980,
+                    (dos_date >> 5) & 0xF,
+                    dos_date & 0x1F,
+                    dos_time >> 11,
+                    (dos_time >> 5) & 0x3F,
+                    (dos_time & 0x1F) * 2,
+                ),
+            )
+            (
+                info.create_version,
+                info.create_system,
+                info.extract_version,
+                info.reserved,
+                info.flag_bits,
+                info.compress_type,
+            ) = fields[1:7]
+            info.CRC = fields[9]
+            info.volume, info.internal_attr, info.external_attr = fields[15:18]
+            info.extra = data[name_end:extra_end]
+            info.comment = data[extra_end : extra_end + fields[14]]
+            info.file_size, info.compress_size, header_offset = _zip64_fields(
+                info.extra, fields[11], fields[10], fields[18]
+            )
+            info.header_offset = header_offset + concat
+            infos.append(info)
+        pos = extra_end + comment_len
+    return infos
+
+
+def iter_tar_members(archive_file):
+    """逐条产出 tar 条目; 只读取头部，并且不在 TarFile.members 中保留已读过的条目"""
+    with open_archive(archive_file) as raw, open_tar(raw) as tf:
+        while True:
+            member = tf.next()
+            if member is None:
+                break
+            tf.members.clear()
+            yield member.name, member.size, 0, member.mtime, member.isdir()
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(archive_file):
+    st = os.stat(archive_file)
+    return (os.path.abspath(archive_file), st.st_size, st.st_mtime_ns)
+
+
+def cached_index(archive_file):
+    """已缓存的目录树 (压缩包未被修改过)，没有时返回 None，不读取压缩包"""
+    key = _cache_key(archive_file)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+        return index
+
+
+def load_index(archive_file, progress_callback=None, control=None) -> ArchiveIndex:
+    """
+    读取 archive_file 的目录树。progress_callback(已读取条目数) 定期被调用；
+    control (JobControl) 用于取消。结果按 (路径, 大小, 修改时间) 缓存在内存中。
+    """
+    key = _cache_key(archive_file)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    started = time.monotonic()
+    if is_zip_archive(archive_file):
+        index = ArchiveIndex(archive_file, "zip")
+        members = iter_zip_members(archive_file)
+    elif is_tar_archive(archive_file):
+        index = ArchiveIndex(archive_file, "tar")
+        members = iter_tar_members(archive_file)
+    else:
+        raise shutil.ReadError(f"不支持浏览的压缩格式: {archive_file}")
+    for count, member in enumerate(members, 1):
+        index.add(*member)
+        if count % _PROGRESS_INTERVAL == 0:
+            if control is not None:
+                control.checkpoint()
+            if progress_callback is not None:
+                progress_callback(count)
+    index.finish()
+    index.elapsed = time.monotonic() - started
+
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > _INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
@@ -0,0 +1,98 @@
+import bz2
+import gzip
+import lzma
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+# 每个数据块被压缩成一个完整的 gzip 成员 / bzip2 流 / xz 流。
+# 这些格式都允许多个成员 (流) 直接拼接，gzip、xz、bzip2 命令行工具和 tarfile 的随机访问模式
+# ("r:*"，内部使用 GzipFile 等) 都能正常读取；tarfile 的流模式 ("r|*") 只读取第一个成员，
+# 顺序读取时需要 fastcodecs.open_tar_stream。
+_CODECS = {
+    "gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    "bzip2": lambda data, level: bz2.compress(data, level),
+    "xz": lambda data, level: lzma.compress(data, format=lzma.FORMAT_XZ, preset=level),
+}
+
+# 与 tarfile 的 "w:gz" / "w:bz2" / "w:xz" 默认压缩级别保持一致
+DEFAULT_LEVELS = {"gzip": 9, "bzip2": 9, "xz": 6}
+
+
+def register_codec(name, compress, default_level):
+    """
+    注册额外的块压缩编码 (例如 fastcodecs 中的 lz4)。compress(data, level) 必须返回
+    一个完整、可与其他块直接拼接的压缩流，并且最好在压缩时释放 GIL。
+    """
+    _CODECS[name] = compress
+    DEFAULT_LEVELS[name] = default_level
+
+
+class ParallelBlockWriter:
+    """
+    pigz 式的块并行压缩写入器: 把写入的字节流切成固定大小的块，
+    在线程池中并发压缩 (zlib/bz2/lzma 压缩时释放 GIL)，再按顺序写入 fileobj。
+    """
+
+    def __init__(
+        self, fileobj, codec, level=None, block_size=DEFAULT_BLOCK_SIZE, workers=1
+    ):
+        if codec not in _CODECS:
+            raise ValueError(f"不支持的块压缩格式: {codec}")
+        self.fileobj = fileobj
+        self.block_size = block_size
+        self.workers = max(1, workers)
+        self._compress = _CODECS[codec]
+        self._level = DEFAULT_LEVELS[codec] if level is None else level
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._blocks = 0
+        self.closed = False
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[: self.block_size])
+            del self._buffer[: self.block_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block):
+        self._pending.append(self._pool.submit(self._compress, block, self._level))
+        self._blocks += 1
+        # 在途块数有上限，内存占用约为 2 * workers * block_size
+        self._drain(self.workers * 2)
+
+    def _drain(self, limit):
+        while len(self._pending) > limit:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or self._blocks == 0:
+                # 即使没有任何数据也要输出一个空成员，保证结果是合法的压缩流
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            self._drain(0)
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+    def abort(self):
+        """出错时丢弃尚未写出的块"""
+        self.closed = True
+        self._pending.clear()
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
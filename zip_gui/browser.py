@@ -0,0 +1,164 @@
+import time
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt, QThread, Signal
+
+from .archive_index import DirNode, load_index
+from .icons import icon
+from .progress import JobCancelled, JobControl, format_size
+
+
+class IndexWorker(QThread):
+    """在后台线程读取压缩包目录 (不解压数据)"""
+
+    loaded = Signal(object)
+    failed = Signal(str)
+    progress = Signal(int)
+
+    def __init__(self, archive_file, parent=None):
+        super().__init__(parent)
+        self.archive_file = archive_file
+        self.control = JobControl()
+        self.elapsed = 0.0  # 包括命中缓存时的实际用时
+
+    def run(self):
+        started = time.monotonic()
+        try:
+            index = load_index(
+                self.archive_file,
+                progress_callback=self.progress.emit,
+                control=self.control,
+            )
+            self.elapsed = time.monotonic() - started
+            self.loaded.emit(index)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class ArchiveTreeModel(QAbstractItemModel):
+    """
+    压缩包目录树的只读模型。每个目录的子项在首次展开时才排序，并按批次交给视图
+    (canFetchMore/fetchMore)，配合 QTreeView 的虚拟化绘制，百万级条目也不会卡住界面。
+    QModelIndex 的内部指针保存的是该行所在的父目录，文件本身不需要 Python 对象。
+    """
+
+    COLUMNS = ("名称", "大小", "压缩后", "修改时间")
+    FETCH_BATCH = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.archive_index = None
+        self._fetched = {}  # DirNode -> 已交给视图的行数
+        self._dir_icon = icon("fa5s.folder", color="#E0B84A", color_active=None)
+        self._file_icon = icon("fa5s.file", color_active=None)
+
+    def set_index(self, archive_index):
+        self.beginResetModel()
+        self.archive_index = archive_index
+        self._fetched = {}
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def _dir(self, index) -> DirNode:
+        """index 对应的目录; 无效 index 表示根目录，文件行返回 None"""
+        if not index.isValid():
+            return self.archive_index.root if self.archive_index else None
+        item = self.item(index)
+        return item if isinstance(item, DirNode) else None
+
+    def item(self, index):
+        """返回 index 对应的 DirNode (目录) 或 int (文件编号)"""
+        parent = index.internalPointer()
+        return parent.sorted_children(self.archive_index)[index.row()]
+
+    def item_path(self, index) -> str:
+        item = self.item(index)
+        if isinstance(item, DirNode):
+            return item.path
+        return index.internalPointer().path + self.archive_index.names[item]
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._dir(parent)
+        if node is None or row < 0 or row >= self._fetched.get(node, 0):
+            return QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        if node.parent is None:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node.parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._dir(parent)
+        return self._fetched.get(node, 0) if node is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._dir(parent)
+        return node is not None and bool(node.dirs or node.files)
+
+    def canFetchMore(self, parent):
+        node = self._dir(parent)
+        if node is None:
+            return False
+        return self._fetched.get(node, 0) < len(node.dirs) + len(node.files)
+
+    def fetchMore(self, parent):
+        node = self._dir(parent)
+        if node is None:
+            return
+        start = self._fetched.get(node, 0)
+        end = min(len(node.dirs) + len(node.files), start + self.FETCH_BATCH)
+        if end <= start:
+            return
+        node.sorted_children(self.archive_index)
+        self.beginInsertRows(parent, start, end - 1)
+        self._fetched[node] = end
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.item(index)
+        column = index.column()
+        is_dir = isinstance(item, DirNode)
+        if role == Qt.ItemDataRole.DisplayRole:
+            ix = self.archive_index
+            if column == 0:
+                return item.name if is_dir else ix.names[item]
+            if column == 1:
+                size = item.size if is_dir else ix.sizes[item]
+                return format_size(size)
+            if column == 2:
+                if ix.archive_format != "zip":
+                    return ""
+                size = item.compressed_size if is_dir else ix.compressed_sizes[item]
+                return format_size(size)
+            mtime = item.mtime if is_dir else ix.mtimes[item]
+            return (
+                time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime)) if mtime else ""
+            )
+        if role == Qt.ItemDataRole.DecorationRole and column == 0:
+            return self._dir_icon if is_dir else self._file_icon
+        if role == Qt.ItemDataRole.ToolTipRole and column == 0 and is_dir:
+            return f"{item.file_count} 个文件"
+        if role == Qt.ItemDataRole.TextAlignmentRole and column in (1, 2):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.COLUMNS[section]
+        return None
@@ -0,0 +1,207 @@
+# 压缩结果缓存: 以文件内容的 SHA-256、压缩方法和压缩级别为键，把 zip 条目的原始压缩数据
+# 和 CRC-32 保存在磁盘上。不同任务、不同源目录中的相同大文件只需压缩一次，之后直接拼接到新压缩包。
+# 同一进程内的任务通过 shared_cache() 共享一个实例 (内部加锁)；对象文件先写临时文件再原子重命名，
+# 多个进程同时使用同一目录也不会读到写了一半的数据。
+
+import hashlib
+import os
+import struct
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+
+from .fastio import copy_file, iter_chunks
+from .zipraw import CompressedEntry, set_compress_type
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+MIN_FILE_SIZE = 256 * 1024  # 小文件重新压缩很快，不值得计算哈希和占用缓存
+
+# 对象文件头: 魔数、未压缩大小、CRC-32，之后是原始压缩数据
+_HEADER = struct.Struct("<4sQI")
+_MAGIC = b"ZGC1"
+
+
+def default_cache_dir() -> str:
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "zip_gui", "compressed")
+
+
+def file_digest(path, chunk_size=1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter_chunks(path, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    hit_bytes: int = 0  # 命中时省去压缩的未压缩字节数
+    evictions: int = 0
+    size: int = 0  # 当前占用的磁盘空间
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CompressionCache:
+    """按最近使用时间淘汰 (LRU) 的压缩结果缓存，总大小不超过 max_bytes"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = CacheStats(max_bytes=max_bytes)
+        self._index = OrderedDict()  # 对象路径 -> 大小，按最近使用时间从旧到新排列
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        objects = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith(".part"):
+                    # 其他进程中断时留下的临时文件
+                    with suppress(OSError):
+                        os.remove(path)
+                    continue
+                with suppress(OSError):
+                    st = os.stat(path)
+                    objects.append((st.st_mtime, path, st.st_size))
+        for _mtime, path, size in sorted(objects):
+            self._index[path] = size
+            self._stats.size += size
+
+    def _object_path(self, digest, compress_type, level) -> str:
+        level = "d" if level is None else level
+        return os.path.join(
+            self.directory, digest[:2], f"{digest}-{compress_type}-{level}"
+        )
+
+    def get(self, digest, compress_type, level, zinfo, file_size):
+        """
+        命中时返回 CompressedEntry (payload 指向缓存文件中的压缩数据)，并填好 zinfo 的
+        CRC 和大小；未命中返回 None。
+        """
+        path = self._object_path(digest, compress_type, level)
+        try:
+            payload = open(path, "rb")
+        except FileNotFoundError:
+            self._record(path, hit=False)
+            return None
+        try:
+            magic, size, crc = _HEADER.unpack(payload.read(_HEADER.size))
+            if magic != _MAGIC or size != file_size:
+                raise ValueError(f"缓存对象无效: {path}")
+            payload.seek(0, os.SEEK_END)
+            compress_size = payload.tell() - _HEADER.size
+            payload.seek(_HEADER.size)
+        except (struct.error, ValueError):
+            payload.close()
+            self._discard(path)
+            self._record(path, hit=False)
+            return None
+        with suppress(OSError):
+            os.utime(path)  # 让其他进程加载索引时也能看到最近使用时间
+        set_compress_type(zinfo, compress_type)
+        zinfo.CRC = crc
+        zinfo.file_size = size
+        zinfo.compress_size = compress_size
+        self._record(path, hit=True, nbytes=size)
+        return CompressedEntry(zinfo, payload, from_cache=True)
+
+    def put(self, digest, compress_type, level, compressed: CompressedEntry):
+        """把刚压缩好的条目写入缓存; compressed.payload 读完后会回到开头"""
+        path = self._object_path(digest, compress_type, level)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        zinfo = compressed.zinfo
+        try:
+            with open(tmp_path, "wb") as dest:
+                dest.write(_HEADER.pack(_MAGIC, zinfo.file_size, zinfo.CRC))
+                copy_file(compressed.payload, dest, zinfo.compress_size)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 缓存只是加速手段，磁盘已满等错误不应让打包失败
+            with suppress(OSError):
+                os.remove(tmp_path)
+            return
+        finally:
+            compressed.payload.seek(0)
+        size = _HEADER.size + zinfo.compress_size
+        with self._lock:
+            self._stats.size += size - self._index.pop(path, 0)
+            self._index[path] = size
+            self._evict()
+
+    def _record(self, path, hit, nbytes=0):
+        with self._lock:
+            if hit:
+                self._stats.hits += 1
+                self._stats.hit_bytes += nbytes
+                if path in self._index:
+                    self._index.move_to_end(path)
+            else:
+                self._stats.misses += 1
+
+    def _discard(self, path):
+        with self._lock:
+            self._stats.size -= self._index.pop(path, 0)
+        with suppress(OSError):
+            os.remove(path)
+
+    def _evict(self):
+        # 调用方持有锁; 其他进程可能已删除或正在读取对象，删除失败时忽略
+        while self._stats.size > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._stats.size -= size
+            self._stats.evictions += 1
+            with suppress(OSError):
+                os.remove(path)
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._stats.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for path in self._index:
+                with suppress(OSError):
+                    os.remove(path)
+            self._index.clear()
+            self._stats.size = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**vars(self._stats))
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(directory=None, max_bytes=DEFAULT_MAX_BYTES) -> CompressionCache:
+    """同一目录在进程内只创建一个实例，供并发的多个任务共享"""
+    directory = os.path.abspath(directory or default_cache_dir())
+    with _shared_lock:
+        cache = _shared.get(directory)
+        if cache is None:
+            cache = _shared[directory] = CompressionCache(directory, max_bytes)
+    if cache.max_bytes != max_bytes:
+        cache.set_max_bytes(max_bytes)
+    return cache
@@ -0,0 +1,627 @@
+# 无界面的命令行入口: 与 PackWorker/UnpackWorker 共用同一套打包解压引擎，但完全不导入 PySide6，
+# 适合在 CI 和构建节点上批量使用。
+import argparse
+import json
+import os
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+
+from .blockcompress import DEFAULT_BLOCK_SIZE
+from .cache import DEFAULT_MAX_BYTES, shared_cache
+from .jobs import (
+    STATUS_CANCELLED,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_PENDING,
+    STATUS_RUNNING,
+    JobScheduler,
+    pack_job_for,
+    unpack_job_for,
+)
+from .estimate import estimate_source
+from .fastcodecs import DECODE_ERRORS
+from .fastio import DEFAULT_BUFFER_SIZE
+from .packer import ARCHIVE_EXTENSIONS, ZIP_METHODS, PackStats, pack_stream
+from .preflight import DEFAULT_MAX_RATIO, PreflightError, preflight_archive
+from .progress import JobCancelled, JobControl, format_progress, format_size
+from .streams import STDIO, is_stream_spec, open_stream
+from .unpacker import MemberSelector, list_archive, unpack_stream
+from .verify import test_archive
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+# JSON 输出使用稳定的英文状态名
+_STATUS_NAMES = {
+    STATUS_PENDING: "pending",
+    STATUS_RUNNING: "running",
+    STATUS_DONE: "done",
+    STATUS_FAILED: "failed",
+    STATUS_CANCELLED: "cancelled",
+}
+
+
+class _Reporter:
+    """把任务进度输出为 JSON 行 (stdout) 或人类可读的文本 (stderr)"""
+
+    def __init__(self, json_mode):
+        self.json_mode = json_mode
+        self.interactive = sys.stderr.isatty()
+        self._lock = threading.Lock()
+        self._last_status = {}
+
+    def emit(self, event, **fields):
+        with self._lock:
+            if self.json_mode:
+                print(json.dumps({"event": event, **fields}, ensure_ascii=False))
+                sys.stdout.flush()
+
+    def text(self, line):
+        with self._lock:
+            if not self.json_mode:
+                if self.interactive:
+                    sys.stderr.write("\r\033[K")
+                print(line, file=sys.stderr)
+
+    def progress_line(self, line):
+        with self._lock:
+            if not self.json_mode and self.interactive:
+                sys.stderr.write(f"\r\033[K{line}")
+                sys.stderr.flush()
+
+    def progress(self, info, **fields):
+        self.emit(
+            "progress",
+            percent=info.percent,
+            done_bytes=info.done_bytes,
+            total_bytes=info.total_bytes,
+            done_files=info.done_files,
+            total_files=info.total_files,
+            written_bytes=info.written_bytes,
+            speed=round(info.speed),
+            eta=None if info.eta is None else round(info.eta, 1),
+            **fields,
+        )
+        self.progress_line(format_progress(info))
+
+    def job_update(self, job):
+        if job.progress is not None and job.status == STATUS_RUNNING:
+            self.progress(job.progress, job=job.job_id)
+        if self._last_status.get(job.job_id) == job.status:
+            return
+        self._last_status[job.job_id] = job.status
+        self.emit(
+            "status",
+            job=job.job_id,
+            kind=job.kind,
+            source=job.source,
+            target=job.target,
+            status=_STATUS_NAMES[job.status],
+            message=job.message,
+        )
+        if job.status in (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED):
+            detail = f": {job.message}" if job.message else ""
+            self.text(f"[#{job.job_id}] {job.status} {job.source}{detail}")
+
+
+def _run_jobs(jobs, args, reporter) -> int:
+    scheduler = JobScheduler(
+        cpu_slots=args.jobs, io_slots=args.jobs, on_update=reporter.job_update
+    )
+    for job in jobs:
+        scheduler.submit(job)
+    try:
+        while not scheduler.wait(timeout=0.2):
+            pass
+    except KeyboardInterrupt:
+        scheduler.cancel_all()
+        scheduler.wait()
+        return EXIT_CANCELLED
+    if any(job.status == STATUS_FAILED for job in jobs):
+        return EXIT_FAILED
+    if any(job.status == STATUS_CANCELLED for job in jobs):
+        return EXIT_CANCELLED
+    return EXIT_OK
+
+
+def _pack_cache(args):
+    if args.cache or args.cache_dir:
+        return shared_cache(args.cache_dir, args.cache_size * 1024 * 1024)
+    return None
+
+
+def cmd_pack(args, reporter) -> int:
+    if args.output and is_stream_spec(args.output):
+        return cmd_pack_stream(args, reporter)
+    cache = _pack_cache(args)
+    jobs = []
+    for source in args.sources:
+        try:
+            jobs.append(
+                pack_job_for(
+                    source,
+                    args.format,
+                    dest=args.output or "",
+                    multiple=len(args.sources) > 1,
+                    workers=args.workers,
+                    block_size=args.block_size * 1024 * 1024,
+                    incremental=args.incremental,
+                    verify_hash=args.verify_hash,
+                    cache=cache,
+                    method=args.method,
+                    level=args.level,
+                    adaptive=not args.no_adaptive,
+                    buffer_size=args.buffer_size * 1024,
+                    excludes=args.excludes,
+                    verify=args.verify,
+                    volume_size=args.volume_size * 1024 * 1024 or None,
+                    dedup=args.dedup,
+                )
+            )
+        except ValueError as e:
+            reporter.text(f"错误: {e}")
+            return EXIT_USAGE
+    status = _run_jobs(jobs, args, reporter)
+    if cache is not None:
+        stats = cache.stats()
+        reporter.emit(
+            "cache",
+            hits=stats.hits,
+            misses=stats.misses,
+            hit_bytes=stats.hit_bytes,
+            evictions=stats.evictions,
+            size=stats.size,
+            max_bytes=stats.max_bytes,
+        )
+        reporter.text(
+            f"压缩缓存: 命中 {stats.hits} / 未命中 {stats.misses}, "
+            f"已用 {format_size(stats.size)} / {format_size(stats.max_bytes)}"
+        )
+    return status
+
+
+def cmd_pack_stream(args, reporter) -> int:
+    # -o 为 "-"、tcp://... 等流时不经过任务队列，压缩包直接写入流，不生成临时文件
+    if len(args.sources) > 1:
+        reporter.text("错误: 流式输出时只能打包一个源")
+        return EXIT_USAGE
+    if args.json and args.output == STDIO:
+        reporter.text("错误: 压缩包写到标准输出时不能使用 --json")
+        return EXIT_USAGE
+    unsupported = [
+        flag
+        for flag, used in (
+            ("--incremental", args.incremental),
+            ("--verify", args.verify),
+            ("--volume-size", args.volume_size),
+        )
+        if used
+    ]
+    if unsupported:
+        reporter.text(f"错误: 流式输出不支持 {', '.join(unsupported)}")
+        return EXIT_USAGE
+    source = os.path.normpath(args.sources[0])
+    if not os.path.exists(source):
+        reporter.text(f"错误: 无效的源路径: {source}")
+        return EXIT_USAGE
+    control = JobControl()
+    stats = PackStats()
+    try:
+        with open_stream(args.output, "wb", args.buffer_size * 1024) as out:
+            written = pack_stream(
+                out,
+                args.format,
+                os.path.dirname(source) or ".",
+                os.path.basename(source),
+                progress_callback=reporter.progress,
+                workers=args.workers,
+                block_size=args.block_size * 1024 * 1024,
+                control=control,
+                cache=_pack_cache(args),
+                stats=stats,
+                method=args.method,
+                level=args.level,
+                adaptive=not args.no_adaptive,
+                buffer_size=args.buffer_size * 1024,
+                excludes=args.excludes,
+                dedup=args.dedup,
+            )
+    except (KeyboardInterrupt, JobCancelled):
+        control.cancel()
+        return EXIT_CANCELLED
+    reporter.emit("streamed", source=source, target=args.output, bytes=written)
+    summary = " · ".join(filter(None, [format_size(written), stats.summary()]))
+    reporter.text(f"已写出 {args.output}: {summary}")
+    return EXIT_OK
+
+
+def cmd_unpack(args, reporter) -> int:
+    if any(is_stream_spec(archive_file) for archive_file in args.archives):
+        return cmd_unpack_stream(args, reporter)
+    jobs = []
+    for archive_file in args.archives:
+        try:
+            jobs.append(
+                unpack_job_for(
+                    archive_file,
+                    args.dest,
+                    multiple=len(args.archives) > 1,
+                    workers=args.workers,
+                    members=args.members,
+                    buffer_size=args.buffer_size * 1024,
+                    preflight=args.preflight,
+                    max_ratio=args.max_ratio,
+                )
+            )
+        except ValueError as e:
+            reporter.text(f"错误: {e}")
+            return EXIT_USAGE
+    return _run_jobs(jobs, args, reporter)
+
+
+def cmd_unpack_stream(args, reporter) -> int:
+    # 从 "-"、tcp://... 等流中读取 tar 流并边读边解压
+    if len(args.archives) > 1:
+        reporter.text("错误: 从流中解压时只能指定一个输入")
+        return EXIT_USAGE
+    source = args.archives[0]
+    control = JobControl()
+    try:
+        with open_stream(source, "rb", args.buffer_size * 1024) as inp:
+            report = unpack_stream(
+                inp,
+                args.dest,
+                progress_callback=reporter.progress,
+                control=control,
+                members=args.members,
+                buffer_size=args.buffer_size * 1024,
+                max_ratio=args.max_ratio,
+            )
+    except (KeyboardInterrupt, JobCancelled):
+        control.cancel()
+        return EXIT_CANCELLED
+    except DECODE_ERRORS as e:
+        # 截断或损坏的流等: 报告错误而不是输出解压库的调用栈
+        message = f"从 {source} 解压失败: {e or type(e).__name__}"
+        reporter.emit("error", message=message)
+        reporter.text(f"错误: {message}")
+        return EXIT_FAILED
+    reporter.emit(
+        "unpacked",
+        source=source,
+        target=args.dest,
+        files=len(report.members),
+        bytes=report.written_bytes,
+    )
+    reporter.text(
+        f"已解压 {len(report.members)} 项 ({format_size(report.written_bytes)})"
+        f" 到 {args.dest}"
+    )
+    return EXIT_OK
+
+
+def cmd_list(args, reporter) -> int:
+    for member in list_archive(args.archive):
+        if args.json:
+            reporter.emit(
+                "member",
+                name=member.name,
+                size=member.size,
+                compressed_size=member.compressed_size,
+                mtime=member.mtime,
+                is_dir=member.is_dir,
+            )
+        else:
+            print(f"{member.size:>14} {member.compressed_size:>14}  {member.name}")
+    return EXIT_OK
+
+
+def cmd_preflight(args, reporter) -> int:
+    status = EXIT_OK
+    for archive_file in args.archives:
+        selector = MemberSelector(args.members) if args.members else None
+        report = preflight_archive(
+            archive_file,
+            args.dest,
+            predicate=selector or None,
+            max_ratio=args.max_ratio,
+            check=False,
+        )
+        reporter.emit(
+            "preflight",
+            archive=archive_file,
+            files=report.file_count,
+            dirs=report.dir_count,
+            total_bytes=report.total_bytes,
+            required_bytes=report.required_bytes,
+            free_bytes=report.free_bytes,
+            ratio=round(report.ratio, 2),
+            largest=[{"name": name, "size": size} for name, size in report.largest],
+            fits=report.fits,
+            suspicious=report.suspicious,
+            elapsed=round(report.elapsed, 4),
+        )
+        verdict = "可以解压"
+        if not report.fits:
+            verdict = "空间不足"
+        elif report.suspicious:
+            verdict = "疑似解压炸弹"
+        reporter.text(
+            f"{archive_file}: {verdict} (用时 {report.elapsed * 1000:.1f} 毫秒)"
+        )
+        reporter.text(report.summary())
+        if not report.fits or report.suspicious:
+            status = EXIT_FAILED
+    return status
+
+
+def cmd_estimate(args, reporter) -> int:
+    for estimate in estimate_source(
+        args.source, args.format, workers=args.workers, excludes=args.excludes
+    ):
+        reporter.emit(
+            "estimate",
+            format=estimate.archive_format,
+            method=estimate.method,
+            level=estimate.level,
+            size=estimate.size,
+            ratio=round(estimate.ratio, 4),
+            seconds=round(estimate.seconds, 2),
+            source_bytes=estimate.source_bytes,
+        )
+        if not args.json:
+            print(
+                f"{estimate.label:<12} {format_size(estimate.size):>10} "
+                f"{estimate.ratio:>7.1%} {estimate.seconds:>8.1f}s"
+            )
+    return EXIT_OK
+
+
+def cmd_test(args, reporter) -> int:
+    control = JobControl()
+    status = EXIT_OK
+    for archive_file in args.archives:
+        try:
+            result = test_archive(
+                archive_file,
+                progress_callback=lambda info: reporter.progress(
+                    info, archive=archive_file
+                ),
+                control=control,
+                workers=args.workers,
+            )
+        except KeyboardInterrupt:
+            control.cancel()
+            return EXIT_CANCELLED
+        except JobCancelled:
+            return EXIT_CANCELLED
+        for name, message in result.bad:
+            reporter.emit(
+                "bad_member", archive=archive_file, name=name, message=message
+            )
+            reporter.text(f"损坏: {archive_file}: {name}: {message}")
+        reporter.emit(
+            "tested",
+            archive=archive_file,
+            ok=result.ok,
+            checked=result.checked,
+            bad=len(result.bad),
+            elapsed=round(result.elapsed, 3),
+        )
+        verdict = "正常" if result.ok else f"{len(result.bad)} 个条目损坏"
+        reporter.text(f"{archive_file}: 已校验 {result.checked} 项, {verdict}")
+        if not result.ok:
+            status = EXIT_FAILED
+    return status
+
+
+def _add_buffer_size_argument(parser):
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE // 1024,
+        help="每次读写的缓冲区大小 (KB)；大文件通过 mmap 读取，内存占用与文件大小无关",
+    )
+
+
+def _add_exclude_argument(parser):
+    parser.add_argument(
+        "-x",
+        "--exclude",
+        dest="excludes",
+        action="append",
+        help=".gitignore 风格的排除规则，如 .git、node_modules/、*.pyc (可多次指定)",
+    )
+
+
+def _add_max_ratio_argument(parser):
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=DEFAULT_MAX_RATIO,
+        help="解压后大小与压缩包大小之比的上限，超过时视为解压炸弹 (0 表示不检查)",
+    )
+
+
+def build_parser():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(
+        prog="zip-gui-cli", description="ZipGUI 的无界面命令行版本"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="以 JSON 行的形式在标准输出中报告进度和结果"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack = sub.add_parser("pack", help="打包一个或多个文件/文件夹")
+    pack.add_argument("sources", nargs="+", help="源文件或文件夹")
+    pack.add_argument(
+        "-o",
+        "--output",
+        help="单个源时为压缩包路径，多个源时为输出目录 (默认输出到源的父目录)；"
+        "也可以是 - (标准输出)、tcp://HOST:PORT、tcp-listen://HOST:PORT 或命名管道，"
+        "此时直接写入流，不生成临时文件",
+    )
+    pack.add_argument(
+        "-f", "--format", default="zip", choices=sorted(ARCHIVE_EXTENSIONS)
+    )
+    pack.add_argument(
+        "-m", "--method", choices=list(ZIP_METHODS), help="zip 条目的压缩方法"
+    )
+    pack.add_argument(
+        "-l", "--level", type=int, help="压缩级别 (默认使用各压缩方法的默认级别)"
+    )
+    pack.add_argument(
+        "--no-adaptive",
+        action="store_true",
+        help="zip 中已压缩的文件 (图片、视频、压缩包等) 也照常压缩，而不是直接存储",
+    )
+    pack.add_argument(
+        "-w", "--workers", type=int, default=cpu_count, help="每个任务的压缩线程数"
+    )
+    pack.add_argument(
+        "--block-size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE // (1024 * 1024),
+        help="gztar/bztar/xztar/lz4tar 块并行压缩的块大小 (MB)",
+    )
+    _add_buffer_size_argument(pack)
+    _add_exclude_argument(pack)
+    pack.add_argument(
+        "--incremental",
+        action="store_true",
+        help="目标 zip 已存在时只重新压缩新增或修改过的文件 (压缩级别改变时全部重新压缩)",
+    )
+    pack.add_argument(
+        "--verify-hash",
+        action="store_true",
+        help="增量更新时按 CRC-32 而不是修改时间判断文件是否变化",
+    )
+    pack.add_argument(
+        "--volume-size",
+        type=int,
+        default=0,
+        help="切分为指定大小 (MB) 的分卷 name.001、name.002 ...，0 表示不分卷",
+    )
+    pack.add_argument(
+        "--verify",
+        action="store_true",
+        help="打包完成后校验压缩包，发现损坏时保留原有文件并报错",
+    )
+    pack.add_argument(
+        "--dedup",
+        action="store_true",
+        help="内容相同的文件只压缩一次 (tar 中写为硬链接)",
+    )
+    pack.add_argument(
+        "--cache",
+        action="store_true",
+        help="按内容哈希缓存 zip 条目的压缩结果，跨任务复用",
+    )
+    pack.add_argument("--cache-dir", help="压缩缓存目录 (指定时自动启用缓存)")
+    pack.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="压缩缓存的大小上限 (MB)",
+    )
+    pack.add_argument("-j", "--jobs", type=int, default=1, help="同时运行的任务数")
+    pack.set_defaults(handler=cmd_pack)
+
+    unpack = sub.add_parser("unpack", help="解压一个或多个压缩包")
+    unpack.add_argument(
+        "archives",
+        nargs="+",
+        help="压缩包路径；- (标准输入)、tcp://HOST:PORT、tcp-listen://HOST:PORT "
+        "或命名管道表示从流中读取 tar 流",
+    )
+    unpack.add_argument(
+        "-d", "--dest", default=".", help="目标文件夹 (多个压缩包时各自解压到子文件夹)"
+    )
+    unpack.add_argument(
+        "-w", "--workers", type=int, default=cpu_count, help="zip 并发解压线程数"
+    )
+    unpack.add_argument(
+        "-m",
+        "--member",
+        dest="members",
+        action="append",
+        help="只解压指定的条目，可以是路径、文件夹或通配符 (可多次指定)",
+    )
+    unpack.add_argument(
+        "--no-preflight",
+        dest="preflight",
+        action="store_false",
+        help="解压前不检查目标磁盘的剩余空间和压缩比",
+    )
+    _add_max_ratio_argument(unpack)
+    _add_buffer_size_argument(unpack)
+    unpack.add_argument("-j", "--jobs", type=int, default=1, help="同时运行的任务数")
+    unpack.set_defaults(handler=cmd_unpack)
+
+    listing = sub.add_parser("list", help="列出压缩包内容")
+    listing.add_argument("archive")
+    listing.set_defaults(handler=cmd_list)
+
+    preflight = sub.add_parser(
+        "preflight", help="只读取目录或头部，检查解压所需空间和压缩比，不解压"
+    )
+    preflight.add_argument("archives", nargs="+")
+    preflight.add_argument("-d", "--dest", default=".", help="将要解压到的文件夹")
+    preflight.add_argument(
+        "-m",
+        "--member",
+        dest="members",
+        action="append",
+        help="只统计指定的条目 (与 unpack -m 相同)",
+    )
+    _add_max_ratio_argument(preflight)
+    preflight.set_defaults(handler=cmd_preflight)
+
+    estimate = sub.add_parser(
+        "estimate", help="抽样预估各压缩方法和级别的压缩包大小与耗时"
+    )
+    estimate.add_argument("source")
+    estimate.add_argument(
+        "-f", "--format", default="zip", choices=sorted(ARCHIVE_EXTENSIONS)
+    )
+    estimate.add_argument("-w", "--workers", type=int, default=cpu_count)
+    _add_exclude_argument(estimate)
+    estimate.set_defaults(handler=cmd_estimate)
+
+    test = sub.add_parser("test", help="校验压缩包完整性")
+    test.add_argument("archives", nargs="+")
+    test.add_argument(
+        "-w", "--workers", type=int, default=cpu_count, help="zip 并发校验线程数"
+    )
+    test.set_defaults(handler=cmd_test)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    reporter = _Reporter(args.json)
+    started = time.monotonic()
+    try:
+        status = args.handler(args, reporter)
+    except (
+        OSError,
+        ValueError,
+        zipfile.BadZipFile,
+        tarfile.TarError,
+        PreflightError,
+    ) as e:
+        reporter.emit("error", message=str(e))
+        reporter.text(f"错误: {e}")
+        status = EXIT_FAILED
+    reporter.text(f"用时 {time.monotonic() - started:.2f} 秒")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
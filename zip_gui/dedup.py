@@ -0,0 +1,77 @@
+# 打包时的重复文件检测: 先按大小分组，同样大小的文件出现第二个时才计算哈希，
+# 大小唯一的文件 (绝大多数) 完全不需要额外读取。
+# tar 中后出现的副本写为指向第一个副本的硬链接；zip 中每份内容只压缩一次，
+# 副本直接复制第一个条目已经压缩好的数据。
+
+import hashlib
+import os
+
+from . import fastio
+
+# 更小的文件即使重复也省不了多少 (tar 的硬链接条目本身就要占 512 字节)
+MIN_DEDUP_SIZE = 4096
+
+
+def content_digest(path, chunk_size=None) -> bytes:
+    """文件内容的 BLAKE2b 摘要 (比 SHA-256 快，对去重来说碰撞概率可以忽略)"""
+    digest = hashlib.blake2b()
+    for chunk in fastio.iter_chunks(path, chunk_size):
+        digest.update(chunk)
+    return digest.digest()
+
+
+class DuplicateFinder:
+    """
+    按条目顺序登记文件，返回与之内容相同的、更早登记的条目名称。
+    哈希之前会确认文件的大小和修改时间与扫描时一致，扫描之后被修改过的文件不参与去重。
+    只应在一个线程中使用 (打包的主线程按清单顺序调用)。
+    """
+
+    def __init__(self, min_size=MIN_DEDUP_SIZE, chunk_size=None):
+        self.min_size = min_size
+        self.chunk_size = chunk_size
+        self.duplicate_files = 0
+        self.duplicate_bytes = 0
+        self._by_size = {}  # 大小 -> 尚未计算哈希的第一个条目
+        self._by_digest = {}  # (大小, 摘要) -> 条目名称
+
+    def original(self, entry):
+        """entry 与之前某个文件内容相同时返回那个文件的 arcname，否则登记并返回 None"""
+        if entry.size < self.min_size:
+            return None
+        first = self._by_size.get(entry.size)
+        if first is None:
+            # 第一个这种大小的文件，等出现同样大小的文件时再计算哈希
+            self._by_size[entry.size] = entry
+            return None
+        if first is not _HASHED:
+            self._by_size[entry.size] = _HASHED
+            self._register(first)
+        digest = self._digest(entry)
+        if digest is None:
+            return None
+        key = (entry.size, digest)
+        original = self._by_digest.get(key)
+        if original is None:
+            self._by_digest[key] = entry.arcname
+            return None
+        self.duplicate_files += 1
+        self.duplicate_bytes += entry.size
+        return original
+
+    def _register(self, entry):
+        digest = self._digest(entry)
+        if digest is not None:
+            self._by_digest.setdefault((entry.size, digest), entry.arcname)
+
+    def _digest(self, entry):
+        try:
+            st = os.stat(entry.path)
+            if st.st_size != entry.size or st.st_mtime != entry.mtime:
+                return None
+            return content_digest(entry.path, self.chunk_size)
+        except OSError:
+            return None
+
+
+_HASHED = object()  # 该大小的文件已经计算过哈希
@@ -0,0 +1,257 @@
+# 压缩效果预估: 从源目录中抽取一小部分数据，用各个候选的压缩方法和级别实际压缩一遍，
+# 按抽样得到的压缩率和吞吐量推算完整打包后的大小和耗时。结果只是估计值，
+# 用于在开始一个很长的任务之前选择合适的速度 / 压缩率折中。
+
+import bz2
+import gzip
+import lzma
+import math
+import os
+import random
+import tarfile
+import time
+import zlib
+from dataclasses import dataclass
+
+from . import fastcodecs
+from .blockcompress import DEFAULT_BLOCK_SIZE
+from .packer import ZIP_METHODS, compression_levels
+from .scanner import KIND_FILE, scan_source
+
+SAMPLE_BYTES = 4 * 1024 * 1024  # 抽样的数据总量
+SAMPLE_CHUNK = 256 * 1024  # 每个文件最多抽取的字节数
+SAMPLE_RUN = 8  # 每次连续抽取的相邻文件数
+
+# zip 每个条目的固定开销: 本地文件头 30 字节 + 中央目录 46 字节 (文件名另计两次)
+_ZIP_ENTRY_OVERHEAD = 76
+_TAR_BLOCK = 512
+
+# 界面上一次列出的候选 (压缩方法, 级别)；tar 系列格式没有方法可选
+DEFAULT_CHOICES = {
+    "zip": [
+        ("stored", None),
+        ("deflate", 1),
+        ("deflate", 6),
+        ("deflate", 9),
+        ("bzip2", 9),
+        ("lzma", 6),
+    ],
+    "tar": [(None, None)],
+    "gztar": [(None, 1), (None, 6), (None, 9)],
+    "bztar": [(None, 1), (None, 9)],
+    "xztar": [(None, 0), (None, 6), (None, 9)],
+    "zstdtar": [(None, 1), (None, 3), (None, 9), (None, 19)],
+    "lz4tar": [(None, 0), (None, 9)],
+}
+if "zstd" in ZIP_METHODS:
+    DEFAULT_CHOICES["zip"].append(("zstd", 3))
+
+
+@dataclass
+class Estimate:
+    archive_format: str
+    method: str | None
+    level: int | None
+    size: int  # 预计的压缩包大小
+    seconds: float  # 预计的打包耗时
+    source_bytes: int
+
+    @property
+    def ratio(self) -> float:
+        return self.size / self.source_bytes if self.source_bytes else 1.0
+
+    @property
+    def label(self) -> str:
+        name = self.method or self.archive_format
+        return name if self.level is None else f"{name} -{self.level}"
+
+
+@dataclass
+class _Sample:
+    chunks: list
+    nbytes: int
+    read_seconds: float
+
+
+def _compressor(archive_format, method, level):
+    """返回把一段数据压缩为 bytes 的函数；不压缩时返回 None"""
+    if archive_format == "zip":
+        method = method or "deflate"
+        if method == "stored":
+            return None
+        level = compression_levels("zip", method)[2] if level is None else level
+        if method == "deflate":
+            return lambda data: zlib.compress(data, level)
+        if method == "bzip2":
+            return lambda data: bz2.compress(data, level)
+        if method == "zstd":
+            return fastcodecs.zstd_compressor(level).compress
+        return lambda data: lzma.compress(data, format=lzma.FORMAT_ALONE, preset=level)
+    levels = compression_levels(archive_format)
+    if levels is None:
+        return None
+    level = levels[2] if level is None else level
+    if archive_format == "gztar":
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    if archive_format == "bztar":
+        return lambda data: bz2.compress(data, level)
+    if archive_format == "zstdtar":
+        return fastcodecs.zstd_compressor(level, long_distance=True).compress
+    if archive_format == "lz4tar":
+        return lambda data: fastcodecs.lz4_compress(data, level)
+    return lambda data: lzma.compress(data, preset=level)
+
+
+def _sample_files(manifest, control=None) -> _Sample:
+    # 用固定种子随机抽取若干段相邻的文件: 随机保证覆盖整个目录树，而相邻文件在 tar 流中
+    # 也是相邻的，它们之间的重复内容对整体压缩率影响很大
+    files = [entry for entry in manifest.entries if entry.kind == KIND_FILE]
+    runs = [files[i : i + SAMPLE_RUN] for i in range(0, len(files), SAMPLE_RUN)]
+    random.Random(0).shuffle(runs)
+    chunks = []
+    nbytes = 0
+    started = time.perf_counter()
+    for entry in (entry for run in runs for entry in run):
+        if nbytes >= SAMPLE_BYTES:
+            break
+        if control is not None:
+            control.checkpoint()
+        try:
+            with open(entry.path, "rb") as src:
+                data = src.read(min(SAMPLE_CHUNK, SAMPLE_BYTES - nbytes))
+        except OSError:
+            continue
+        if data:
+            chunks.append(data)
+            nbytes += len(data)
+    return _Sample(chunks, nbytes, time.perf_counter() - started)
+
+
+def _sample_headers(manifest, count=256) -> bytes:
+    # tar 头几乎全是零和相似的字段，压缩率与文件内容差别很大，单独抽样
+    entries = manifest.entries[:: max(1, len(manifest.entries) // count)]
+    headers = bytearray()
+    for entry in entries:
+        info = tarfile.TarInfo(entry.arcname)
+        info.size = entry.size if entry.kind == KIND_FILE else 0
+        info.mtime = int(entry.mtime)
+        headers += info.tobuf(tarfile.PAX_FORMAT)
+    return bytes(headers)
+
+
+def _container_bytes(archive_format, manifest) -> int:
+    """除文件内容以外的固定开销 (条目头、目录、对齐填充)"""
+    names = sum(len(entry.arcname.encode()) for entry in manifest.entries)
+    if archive_format == "zip":
+        return len(manifest.entries) * _ZIP_ENTRY_OVERHEAD + 2 * names + 22
+    padding = sum(
+        -entry.size % _TAR_BLOCK
+        for entry in manifest.entries
+        if entry.kind == KIND_FILE
+    )
+    size = len(manifest.entries) * _TAR_BLOCK + padding + 2 * _TAR_BLOCK
+    return size + -size % tarfile.RECORDSIZE
+
+
+def _parallelism(archive_format, manifest, workers, block_size) -> int:
+    # 线程数超过 CPU 核心数时不会更快
+    workers = min(workers, os.cpu_count() or 1)
+    if archive_format == "zip":
+        return max(1, min(workers, manifest.file_count))
+    if (
+        archive_format in ("gztar", "bztar", "xztar", "zstdtar", "lz4tar")
+        and workers > 1
+    ):
+        return max(1, min(workers, math.ceil(manifest.total_bytes / block_size)))
+    return 1
+
+
+def estimate_manifest(
+    manifest,
+    archive_format,
+    choices=None,
+    workers=1,
+    block_size=DEFAULT_BLOCK_SIZE,
+    control=None,
+) -> list:
+    """
+    对已扫描的 manifest 预估 choices 中每个 (方法, 级别) 的压缩包大小和耗时，返回 Estimate 列表。
+    choices 默认使用 DEFAULT_CHOICES[archive_format]。
+    """
+    if choices is None:
+        choices = DEFAULT_CHOICES.get(archive_format, [(None, None)])
+    sample = _sample_files(manifest, control)
+    total = manifest.total_bytes
+    # 读取耗时按抽样时的实际读盘速度推算 (命中页缓存时会偏乐观)；
+    # 小文件很多时打开文件本身的开销占主导，按文件数推算
+    read_seconds = 0.0
+    if sample.chunks:
+        read_seconds = sample.read_seconds * max(
+            total / sample.nbytes, manifest.file_count / len(sample.chunks)
+        )
+    if archive_format != "zip":
+        # tar 先拼接再整体压缩，文件之间的重复内容也能被利用
+        sample = _Sample([b"".join(sample.chunks)], sample.nbytes, 0.0)
+    headers = _sample_headers(manifest) if archive_format != "zip" else b""
+    parallel = _parallelism(archive_format, manifest, workers, block_size)
+    overhead = _container_bytes(archive_format, manifest)
+    estimates = []
+    for method, level in choices:
+        if method is not None and method not in ZIP_METHODS:
+            raise ValueError(f"不支持的压缩方法: {method}")
+        compress = _compressor(archive_format, method, level)
+        ratio = header_ratio = 1.0
+        compress_seconds = 0.0
+        if compress is not None and sample.nbytes:
+            started = time.perf_counter()
+            compressed = 0
+            for chunk in sample.chunks:
+                if control is not None:
+                    control.checkpoint()
+                compressed += len(compress(chunk))
+            elapsed = time.perf_counter() - started
+            ratio = compressed / sample.nbytes
+            compress_seconds = total * elapsed / sample.nbytes
+            if headers:
+                header_ratio = len(compress(headers)) / len(headers)
+        if archive_format == "zip":
+            # 每个工作线程自己读取并压缩文件
+            size = overhead + round(total * ratio)
+            seconds = (read_seconds + compress_seconds) / parallel
+        else:
+            # tar 流由主线程顺序读取，只有压缩可以并行
+            size = round(total * ratio + overhead * header_ratio)
+            if parallel > 1:
+                seconds = max(read_seconds, compress_seconds / parallel)
+            else:
+                seconds = read_seconds + compress_seconds
+        estimates.append(Estimate(archive_format, method, level, size, seconds, total))
+    return estimates
+
+
+def estimate_archive(
+    root_dir,
+    base_dir,
+    archive_format,
+    choices=None,
+    workers=1,
+    block_size=DEFAULT_BLOCK_SIZE,
+    control=None,
+    excludes=None,
+) -> list:
+    """扫描 root_dir 下的 base_dir 并预估各个压缩选项的结果，参数含义与 pack_archive 相同"""
+    manifest = scan_source(root_dir, base_dir, control=control, excludes=excludes)
+    return estimate_manifest(
+        manifest, archive_format, choices, workers, block_size, control
+    )
+
+
+def estimate_source(source, archive_format, **options) -> list:
+    """按源路径预估 (与 pack_job_for 一样把源拆分为父目录和名称)"""
+    source = os.path.normpath(source)
+    return estimate_archive(
+        os.path.dirname(source) or ".",
+        os.path.basename(source),
+        archive_format,
+        **options,
+    )
@@ -0,0 +1,283 @@
+# 可选的高速压缩格式: tar.zst (Zstandard) 和 tar.lz4。
+# 依赖第三方包 zstandard / lz4 (pip install "zip_gui[fast]")，未安装时这些格式不会出现在格式列表中。
+# zstd 使用库自带的多线程压缩和长距离匹配 (long distance matching)；lz4 没有内置多线程，
+# 由 blockcompress.ParallelBlockWriter 分块并发压缩 (多个 lz4 帧可以直接拼接)。
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tarfile
+import zlib
+from contextlib import contextmanager, suppress
+
+from .blockcompress import DEFAULT_BLOCK_SIZE, ParallelBlockWriter, register_codec
+from .volumes import is_volume, open_archive
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4frame
+except ImportError:
+    lz4frame = None
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+LZ4_MAGIC = b"\x04\x22\x4d\x18"
+_MAGICS = {ZSTD_MAGIC: "zstd", LZ4_MAGIC: "lz4"}
+# 标准库格式的文件头。并行写出的 gz/bz2/xz 由多个独立的 gzip 成员或 bz2/xz 流拼接而成，
+# tarfile 的流模式 ("r|*") 只读取第一个，顺序读取时改用能跨越成员的 GzipFile 等读取
+_STDLIB_MAGICS = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+_MAGIC_SIZE = 6
+
+# 长距离匹配的窗口: 128 MB，与 zstd --long=27 相同，也是解压端默认允许的最大窗口
+ZSTD_WINDOW_LOG = 27
+
+_FORMATS = {
+    # 格式名: (编码, 扩展名, 其他可识别的扩展名, 说明)
+    "zstdtar": ("zstd", ".tar.zst", [".tzst"], "zstd'ed tar-file"),
+    "lz4tar": ("lz4", ".tar.lz4", [], "lz4'ed tar-file"),
+}
+
+_MODULES = {"zstd": zstandard, "lz4": lz4frame}
+
+# 读取损坏或截断的压缩流时各解压库抛出的异常
+DECODE_ERRORS = (EOFError, OSError, zlib.error, lzma.LZMAError, tarfile.TarError)
+if zstandard is not None:
+    DECODE_ERRORS += (zstandard.ZstdError,)
+if lz4frame is not None:
+    DECODE_ERRORS += (RuntimeError,)  # lz4.frame 解压失败时抛出 RuntimeError
+
+
+def codec_available(codec) -> bool:
+    return _MODULES.get(codec) is not None
+
+
+def _require(codec):
+    if not codec_available(codec):
+        package = "zstandard" if codec == "zstd" else "lz4"
+        raise shutil.ReadError(f"需要安装 {package} 才能处理 {codec} 压缩的文件")
+
+
+# 已安装依赖的格式 -> 扩展名 / 编码
+ARCHIVE_EXTENSIONS = {
+    name: extension
+    for name, (codec, extension, _aliases, _description) in _FORMATS.items()
+    if codec_available(codec)
+}
+TAR_CODECS = {
+    name: codec
+    for name, (codec, _extension, _aliases, _description) in _FORMATS.items()
+    if codec_available(codec)
+}
+
+
+def detect_codec(path):
+    """按文件头判断是否为 zstd 或 lz4 压缩的文件，返回编码名，否则返回 None"""
+    try:
+        with open_archive(path) as f:
+            return _MAGICS.get(f.read(4))
+    except OSError:
+        return None
+
+
+def is_tar_archive(path) -> bool:
+    """tarfile.is_tarfile 的扩展版本，同时识别 tar.zst / tar.lz4 以及分卷"""
+    if not is_volume(path):
+        return tarfile.is_tarfile(path) or detect_codec(path) is not None
+    try:
+        with open_archive(path) as f:
+            if tarfile.is_tarfile(f):
+                return True
+    except OSError:
+        return False
+    return detect_codec(path) is not None
+
+
+def zstd_compressor(level=None, workers=1, long_distance=False):
+    """
+    创建 ZstdCompressor。workers > 1 时由 zstd 自己的线程池压缩；
+    long_distance=True 时启用长距离匹配，适合包含大量相似文件的大型 tar。
+    """
+    _require("zstd")
+    params = zstandard.ZstdCompressionParameters.from_level(
+        3 if level is None else level,
+        threads=workers if workers > 1 else 0,
+        enable_ldm=long_distance,
+        window_log=ZSTD_WINDOW_LOG if long_distance else 0,
+        write_checksum=True,
+    )
+    return zstandard.ZstdCompressor(compression_params=params)
+
+
+def zstd_reader(fileobj):
+    """读取 (可能由多个帧组成的) zstd 流的文件对象"""
+    _require("zstd")
+    return zstandard.ZstdDecompressor(
+        max_window_size=1 << ZSTD_WINDOW_LOG
+    ).stream_reader(fileobj, read_across_frames=True, closefd=False)
+
+
+def lz4_compress(data, level=0):
+    return lz4frame.compress(data, compression_level=level, content_checksum=True)
+
+
+if lz4frame is not None:
+    register_codec("lz4", lz4_compress, 0)
+
+
+@contextmanager
+def open_writer(raw, codec, level=None, workers=1, block_size=None):
+    """返回把写入的数据压缩后写到 raw 的文件对象; 退出时结束压缩流，但不关闭 raw"""
+    _require(codec)
+    if codec == "zstd":
+        writer = zstd_compressor(level, workers, long_distance=True).stream_writer(
+            raw, closefd=False
+        )
+        with writer:
+            yield writer
+        return
+    with ParallelBlockWriter(
+        raw,
+        "lz4",
+        level=level,
+        block_size=block_size or DEFAULT_BLOCK_SIZE,
+        workers=workers,
+    ) as writer:
+        yield writer
+
+
+def open_reader(raw, codec):
+    """返回从 raw 读取并解压的文件对象 (只能顺序读取)"""
+    _require(codec)
+    if codec == "zstd":
+        return zstd_reader(raw)
+    return lz4frame.LZ4FrameFile(raw, "rb")
+
+
+@contextmanager
+def open_tar(raw):
+    """
+    打开二进制文件对象 raw 中的 tar 包，返回 TarFile。gz/bz2/xz 由 tarfile 自动识别；
+    zstd/lz4 压缩的 tar 只能以流模式 ("r|") 顺序读取，调用方不能回头访问已读过的条目。
+    """
+    codec = _MAGICS.get(raw.read(4))
+    raw.seek(0)
+    if codec is None:
+        with tarfile.open(fileobj=raw, mode="r:*") as tf:
+            yield tf
+        return
+    stream = open_reader(raw, codec)
+    try:
+        with tarfile.open(fileobj=stream, mode="r|") as tf:
+            yield tf
+    finally:
+        stream.close()
+
+
+class _PrefixedReader(io.RawIOBase):
+    # 先返回已经读出的文件头，再继续从 raw 读取: 只能顺序读取的流也可以先判断压缩格式
+    def __init__(self, prefix, raw):
+        self._prefix = prefix
+        self._raw = raw
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._prefix:
+            nbytes = min(len(buffer), len(self._prefix))
+            buffer[:nbytes] = self._prefix[:nbytes]
+            self._prefix = self._prefix[nbytes:]
+            return nbytes
+        return self._raw.readinto(buffer)
+
+
+@contextmanager
+def open_tar_stream(raw):
+    """
+    与 open_tar 相同，但 raw 只需要支持顺序读取 (标准输入、管道、套接字)。
+    压缩格式按文件头识别，由多个成员 / 流拼接而成的 gz/bz2/xz (并行写出的结果) 也能完整读取；
+    返回的 TarFile 只能按顺序访问条目。
+    """
+    magic = b""
+    while len(magic) < _MAGIC_SIZE:
+        # 管道和套接字的一次 read() 可能返回不足所需的字节数
+        chunk = raw.read(_MAGIC_SIZE - len(magic))
+        if not chunk:
+            break
+        magic += chunk
+    stream = io.BufferedReader(_PrefixedReader(magic, raw))
+    codec = _MAGICS.get(magic[:4])
+    if codec is not None:
+        stream = open_reader(stream, codec)
+    else:
+        for prefix, reader in _STDLIB_MAGICS:
+            if magic.startswith(prefix):
+                stream = reader(stream)
+                break
+    try:
+        with tarfile.open(fileobj=stream, mode="r|") as tf:
+            yield tf
+    finally:
+        stream.close()
+
+
+def _make_tarball(
+    base_name, base_dir, archive_format, owner=None, group=None, dry_run=0, logger=None
+):
+    # shutil.make_archive 的打包函数: 已切换到 root_dir，把 base_dir 打包为 tar 流再压缩
+    codec, extension, _aliases, _description = _FORMATS[archive_format]
+    archive_name = base_name + extension
+    archive_dir = os.path.dirname(archive_name)
+    if archive_dir and not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+    if logger is not None:
+        logger.info("Creating %s archive", codec)
+    if dry_run:
+        return archive_name
+    with (
+        open(archive_name, "wb") as raw,
+        open_writer(raw, codec, workers=os.cpu_count() or 1) as writer,
+        tarfile.open(fileobj=writer, mode="w|") as tf,
+    ):
+        tf.add(base_dir)
+    return archive_name
+
+
+def _unpack_tarball(filename, extract_dir, filter=None):
+    # shutil.unpack_archive 的解压函数
+    with open(filename, "rb") as raw, open_tar(raw) as tf:
+        if hasattr(tarfile, "data_filter"):
+            tf.extractall(extract_dir, filter=filter or "data")
+        else:
+            tf.extractall(extract_dir)
+
+
+def register_formats():
+    """把已安装依赖的格式注册到 shutil，使 make_archive / unpack_archive 和格式列表都能使用"""
+    registered = {name for name, _description in shutil.get_archive_formats()}
+    unpack_registered = {name for name, *_rest in shutil.get_unpack_formats()}
+    for name in TAR_CODECS:
+        _codec, extension, aliases, description = _FORMATS[name]
+        if name not in registered:
+            shutil.register_archive_format(
+                name, _make_tarball, [("archive_format", name)], description
+            )
+        if name not in unpack_registered:
+            with suppress(shutil.RegistryError):
+                shutil.register_unpack_format(
+                    name,
+                    [extension, *aliases],
+                    _unpack_tarball,
+                    [],
+                    description,
+                )
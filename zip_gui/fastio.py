@@ -0,0 +1,264 @@
+# 大文件的低拷贝 I/O: 打包时用 mmap 把源文件映射进内存，直接以 memoryview 切片交给压缩器；
+# 其他读取使用预先分配的缓冲区 (readinto)，不为每一块数据新建 bytes 对象；
+# 不需要处理数据的复制 (存储方式的 zip 条目、tar 中的文件内容、复用的旧条目) 由内核直接完成
+# (copy_file_range / sendfile)，数据不经过 Python。无论文件多大，内存占用都只有一个缓冲区。
+
+import errno
+import io
+import mmap
+import os
+import sys
+import threading
+from contextlib import suppress
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+MIN_BUFFER_SIZE = 64 * 1024
+# 不小于该大小的文件使用 mmap 读取；设为 None 可禁用 mmap。
+# 映射期间文件被其他程序截断时访问映射会触发 SIGBUS，只对大文件使用以减少这种风险
+MMAP_THRESHOLD = 32 * 1024 * 1024
+
+# 可以直接取文件描述符做内核复制的类型 (底层必须是 FileIO)。GzipFile 等包装对象虽然也有
+# fileno()，但它返回的是底层压缩文件的描述符，绕过它写入会破坏压缩流，因此不能按 fileno() 判断
+_BUFFERED_TYPES = (io.BufferedReader, io.BufferedWriter, io.BufferedRandom)
+
+# copy_file_range / 写入普通文件的 sendfile 只有 Linux 提供，其他系统使用缓冲区复制
+_ZERO_COPY = sys.platform.startswith("linux")
+
+# 内核不支持 (或不支持在这两个文件之间) 零拷贝时返回的错误
+_UNSUPPORTED = {
+    errno.ENOSYS,
+    errno.EXDEV,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.EOPNOTSUPP,
+    getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+
+def buffer_size(size=None) -> int:
+    """把缓冲区大小规整为 mmap 分配粒度的整数倍 (至少 MIN_BUFFER_SIZE)"""
+    size = max(size or DEFAULT_BUFFER_SIZE, MIN_BUFFER_SIZE)
+    granularity = mmap.ALLOCATIONGRANULARITY
+    return -(-size // granularity) * granularity
+
+
+class FileRange:
+    """只读取 fp 当前位置起 size 字节的文件对象；copy_file 可以对它使用零拷贝"""
+
+    def __init__(self, fp, size):
+        self.fp = fp
+        self.remaining = size
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fp.read(size)
+        if len(data) < size:
+            self.truncated()
+        self.remaining -= size
+        return data
+
+    def truncated(self):
+        raise EOFError("数据被截断")
+
+
+def iter_chunks(path, size=None):
+    """
+    逐块读取 path，产出 memoryview。大文件通过 mmap 读取，已处理的页面会被及时释放；
+    其他文件读入同一个预先分配的缓冲区。产出的 memoryview 只在下一次迭代之前有效，
+    调用方需要保留数据时必须自行复制。
+    """
+    size = buffer_size(size)
+    with open(path, "rb") as src:
+        file_size = os.fstat(src.fileno()).st_size
+        if MMAP_THRESHOLD is not None and file_size >= MMAP_THRESHOLD:
+            yield from _mmap_chunks(src, file_size, size)
+            # 文件在映射之后变大时，继续按普通方式读取多出的部分
+            src.seek(file_size)
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        while True:
+            nbytes = src.readinto(buffer)
+            if not nbytes:
+                break
+            yield view[:nbytes]
+
+
+def _mmap_chunks(src, file_size, size):
+    mapped = mmap.mmap(src.fileno(), file_size, access=mmap.ACCESS_READ)
+    can_advise = hasattr(mapped, "madvise")
+    if can_advise:
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    view = memoryview(mapped)
+    try:
+        for start in range(0, file_size, size):
+            yield view[start : start + size]
+            if can_advise and hasattr(mmap, "MADV_DONTNEED"):
+                # 调用方已处理完这一块: 解除映射中的页面，常驻内存不随文件大小增长
+                # (只读的共享映射，页面仍保留在系统的页缓存中)
+                mapped.madvise(mmap.MADV_DONTNEED, start, min(size, file_size - start))
+    finally:
+        view.release()
+        # 调用方可能仍持有最后一块的切片，此时无法关闭，映射在切片释放后自动解除
+        with suppress(BufferError):
+            mapped.close()
+
+
+def _fd_and_offset(f):
+    # 返回 (可用于内核复制的文件描述符, 当前位置)；不支持时返回 None
+    if isinstance(f, FileRange):
+        f = f.fp
+    raw = f.raw if isinstance(f, _BUFFERED_TYPES) else f
+    if not _ZERO_COPY or not isinstance(raw, io.FileIO):
+        return None
+    try:
+        return f.fileno(), f.tell()
+    except (OSError, ValueError):
+        return None
+
+
+def can_zero_copy(src, dst) -> bool:
+    """copy_file(src, dst) 是否会由内核直接复制 (两者都是普通文件或 FileRange)"""
+    return _fd_and_offset(src) is not None and _fd_and_offset(dst) is not None
+
+
+def _kernel_copy(src_fd, dst_fd, src_offset, dst_offset, count) -> int:
+    """复制一段数据，返回实际复制的字节数 (0 表示源已到末尾)"""
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is not None:
+        try:
+            return copy_range(src_fd, dst_fd, count, src_offset, dst_offset)
+        except OSError as e:
+            # 旧内核不支持跨文件系统复制等情况，改用 sendfile
+            if e.errno not in _UNSUPPORTED:
+                raise
+    os.lseek(dst_fd, dst_offset, os.SEEK_SET)
+    return os.sendfile(dst_fd, src_fd, src_offset, count)
+
+
+def copy_file(src, dst, count=None, size=None, on_chunk=None) -> int:
+    """
+    从 src 当前位置复制 count 字节 (None 表示直到末尾) 到 dst 当前位置，返回复制的字节数。
+    src 和 dst 都是普通文件 (或 FileRange) 时由内核直接复制，否则通过一个预先分配的缓冲区
+    读写 (src 支持 readinto 时使用 readinto)。复制结束后两者的位置都在复制的数据之后。
+    on_chunk(nbytes) 在每复制一块后调用，可用于汇报进度和响应取消。
+    """
+    size = buffer_size(size)
+    if isinstance(src, FileRange):
+        count = src.remaining if count is None else min(count, src.remaining)
+    src_pos = _fd_and_offset(src)
+    dst_pos = _fd_and_offset(dst)
+    if src_pos is None or dst_pos is None or count == 0:
+        return _copy_buffered(src, dst, count, size, on_chunk)
+
+    (src_fd, src_offset), (dst_fd, dst_offset) = src_pos, dst_pos
+    raw_src = src.fp if isinstance(src, FileRange) else src
+    dst.flush()
+    copied = 0
+    try:
+        while count is None or copied < count:
+            step = size if count is None else min(size, count - copied)
+            nbytes = _kernel_copy(
+                src_fd, dst_fd, src_offset + copied, dst_offset + copied, step
+            )
+            if not nbytes:
+                break
+            copied += nbytes
+            # 逐块移动源文件的位置，调用方可以按读取位置计算进度
+            raw_src.seek(src_offset + copied)
+            if on_chunk is not None:
+                on_chunk(nbytes)
+    except OSError as e:
+        # 第一块就失败说明这两个文件之间不支持零拷贝，改为普通复制；中途失败是真正的 I/O 错误
+        if copied or e.errno not in _UNSUPPORTED:
+            raise
+    raw_src.seek(src_offset + copied)
+    dst.seek(dst_offset + copied)
+    if isinstance(src, FileRange):
+        src.remaining -= copied
+    if count is None and copied:
+        return copied
+    # 不支持零拷贝，或源数据比预期短: 剩余部分按普通方式读取 (FileRange 会报告截断)
+    remaining = None if count is None else count - copied
+    return copied + _copy_buffered(src, dst, remaining, size, on_chunk)
+
+
+def _copy_buffered(src, dst, count, size, on_chunk):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    readinto = getattr(src, "readinto", None)
+    copied = 0
+    while count is None or copied < count:
+        want = size if count is None else min(size, count - copied)
+        if readinto is not None:
+            nbytes = readinto(view[:want])
+            chunk = view[:nbytes]
+        else:
+            chunk = src.read(want)
+            nbytes = len(chunk)
+        if not nbytes:
+            break
+        dst.write(chunk)
+        copied += nbytes
+        if on_chunk is not None:
+            on_chunk(nbytes)
+    return copied
+
+
+def peak_rss():
+    """
+    进程的峰值常驻内存 (字节)，无法获取时返回 None。
+    Linux 上读取可被 reset_peak_rss() 重置的 VmHWM，其他 Unix 使用 getrusage。
+    """
+    with suppress(OSError), open("/proc/self/status", "rb") as status:
+        for line in status:
+            if line.startswith(b"VmHWM:"):
+                return int(line.split()[1]) * 1024
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux/BSD 以 KB 为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def reset_peak_rss():
+    """
+    把峰值常驻内存重置为当前值 (仅 Linux)。重置作用于整个进程，
+    会清掉同时运行的其他任务的峰值，测量单个任务请使用 PeakRssMeter。
+    """
+    with suppress(OSError), open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+class PeakRssMeter:
+    """
+    测量一个任务期间的峰值常驻内存，退出后结果在 peak 中 (字节)。
+    峰值属于整个进程，只在没有其他任务运行时重置；期间与其他任务重叠过的测量
+    无法区分各自的占用，peak 为 None，无法获取时同样为 None。
+    """
+
+    _lock = threading.Lock()
+    _active = set()
+
+    def __init__(self):
+        self.shared = False
+        self.peak = None
+
+    def __enter__(self):
+        with self._lock:
+            if self._active:
+                self.shared = True
+                for meter in self._active:
+                    meter.shared = True
+            else:
+                reset_peak_rss()
+            self._active.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self._active.discard(self)
+            if not self.shared:
+                self.peak = peak_rss()
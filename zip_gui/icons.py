@@ -0,0 +1,29 @@
+# 图标注册表: qtawesome 导入时会经由 qtpy 加载多个 Qt 模块，第一次生成图标还要加载字体，
+# 是窗口启动时最慢的一步。这里推迟到第一次需要图标时才导入 qtawesome，并按名称和颜色
+# 缓存生成的 QIcon，切换模式、暂停/继续等重复设置图标时直接复用同一个对象。
+import functools
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QIcon
+
+ICON_SIZE = QSize(20, 20)
+ICON_COLOR = "#A9A9A9"
+ICON_COLOR_ACTIVE = "#E0E0E0"
+
+
+@functools.lru_cache(maxsize=None)
+def icon(name, color=ICON_COLOR, color_active=ICON_COLOR_ACTIVE) -> QIcon:
+    """
+    qtawesome 图标 (如 "fa5s.save")，同样的参数总是返回同一个 QIcon。
+    color_active 为 None 时使用 qtawesome 的默认值；qtawesome 不可用时返回空图标。
+    需要在创建 QApplication 之后调用。
+    """
+    options = {"color": color}
+    if color_active is not None:
+        options["color_active"] = color_active
+    try:
+        import qtawesome as qta
+
+        return qta.icon(name, **options)
+    except Exception:
+        return QIcon()
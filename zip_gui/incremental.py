@@ -0,0 +1,168 @@
+# 增量打包: 读取上一次生成的 zip 的中央目录，源文件未变化的条目直接复制旧的压缩数据，
+# 只有新增或修改过的文件才需要重新压缩。源目录中已删除的文件不会出现在新的清单里，自然被丢弃。
+
+import os
+import time
+import zipfile
+import zlib
+
+from .fastio import iter_chunks
+from .scanner import KIND_LINK
+from .zipraw import open_raw_entry, set_compress_type, write_raw_entry
+
+_ENCRYPTED_FLAG = 0x01
+
+# 压缩包注释中记录本次使用的压缩级别，下次增量打包时据此判断压缩过的条目能否复用
+_LEVEL_COMMENT = b"zip-gui level="
+
+
+def level_comment(level) -> bytes:
+    """记录压缩级别的压缩包注释；level 为 None (存储方式) 时不写注释"""
+    return b"" if level is None else _LEVEL_COMMENT + str(level).encode()
+
+
+def comment_level(comment):
+    """从压缩包注释中读出 level_comment() 记录的级别，没有记录时返回 None"""
+    if comment.startswith(_LEVEL_COMMENT):
+        try:
+            return int(comment[len(_LEVEL_COMMENT) :])
+        except ValueError:
+            return None
+    return None
+
+
+def _dos_date_time(mtime):
+    # zip 只保存到偶数秒，与 ZipInfo.from_file 一样使用本地时间
+    date_time = time.localtime(mtime)[:6]
+    return date_time[:5] + (date_time[5] // 2 * 2,)
+
+
+def entry_zipinfo(entry) -> zipfile.ZipInfo:
+    """
+    entry 在 zip 中的 ZipInfo。符号链接保存的是目标文件的内容，时间使用扫描时记录的
+    修改时间 (链接和目标中较新的一个)，下次增量打包时按它判断链接是否变化
+    """
+    zinfo = zipfile.ZipInfo.from_file(entry.path, entry.arcname)
+    if entry.kind == KIND_LINK:
+        zinfo.date_time = _dos_date_time(entry.mtime)
+    return zinfo
+
+
+def _file_crc(path, chunk_size):
+    crc = 0
+    for chunk in iter_chunks(path, chunk_size):
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class ReuseIndex:
+    """
+    旧压缩包中可以原样复用的条目。默认按大小和修改时间判断文件是否变化；
+    verify_hash=True 时改为比较大小和 CRC-32 (需要读一遍源文件，但不必重新压缩，
+    适用于 git checkout 等只改变修改时间的场景)。
+    level 为本次使用的压缩级别，与旧压缩包记录的级别 (old_level) 不同时
+    压缩过的条目都要重新压缩，只复用以存储方式写入的条目。
+    """
+
+    def __init__(
+        self,
+        archive_path,
+        infos,
+        compress_type,
+        verify_hash=False,
+        accept_stored=False,
+        level=None,
+        old_level=None,
+    ):
+        self.archive_path = archive_path
+        self.infos = infos
+        self.compress_type = compress_type
+        self.verify_hash = verify_hash
+        # 自适应压缩时旧包中以存储方式写入的条目 (已压缩的文件) 同样可以复用
+        self.compress_types = {compress_type}
+        if accept_stored:
+            self.compress_types.add(zipfile.ZIP_STORED)
+        if compress_type != zipfile.ZIP_STORED and level != old_level:
+            self.compress_types.discard(compress_type)
+        self._fp = open(archive_path, "rb")
+
+    @classmethod
+    def open(
+        cls,
+        archive_path,
+        compress_type=zipfile.ZIP_DEFLATED,
+        verify_hash=False,
+        accept_stored=False,
+        level=None,
+    ):
+        """
+        archive_path 不存在或不是有效的 zip 时返回 None，此时应完整打包。
+        旧压缩包的级别从注释中读取，没有记录 (之前的版本生成) 时视为级别不同
+        """
+        try:
+            with zipfile.ZipFile(archive_path) as zf:
+                infos = {
+                    info.filename: info for info in zf.infolist() if not info.is_dir()
+                }
+                old_level = comment_level(zf.comment)
+        except (FileNotFoundError, zipfile.BadZipFile):
+            return None
+        return cls(
+            archive_path,
+            infos,
+            compress_type,
+            verify_hash,
+            accept_stored,
+            level,
+            old_level,
+        )
+
+    def match(self, entry, chunk_size=1024 * 1024):
+        """返回 entry 对应的未变化的旧条目，没有则返回 None; 可在工作线程中调用"""
+        old = self.infos.get(entry.arcname)
+        size = entry.size
+        if old is not None and entry.kind == KIND_LINK:
+            # 链接在 zip 中保存的是目标的内容，按目标的大小比较
+            try:
+                size = os.stat(entry.path).st_size
+            except OSError:
+                return None
+        if (
+            old is None
+            or old.file_size != size
+            or old.compress_type not in self.compress_types
+            or old.flag_bits & _ENCRYPTED_FLAG
+        ):
+            return None
+        if self.verify_hash:
+            if _file_crc(entry.path, chunk_size) != old.CRC:
+                return None
+        elif old.date_time != _dos_date_time(entry.mtime):
+            return None
+        return old
+
+    def copy(self, zf, entry, old, chunk_size=1024 * 1024):
+        """把 old 的压缩数据原样追加到 zf; 文件名、时间和权限取自当前的源文件"""
+        zinfo = entry_zipinfo(entry)
+        set_compress_type(zinfo, old.compress_type)
+        # 版本号也沿用旧条目 (例如 zip64 或 zstd 条目要求的更高版本)
+        zinfo.create_version = max(zinfo.create_version, old.create_version)
+        zinfo.extract_version = max(zinfo.extract_version, old.extract_version)
+        zinfo.CRC = old.CRC
+        zinfo.compress_size = old.compress_size
+        zinfo.file_size = old.file_size
+        write_raw_entry(zf, zinfo, open_raw_entry(self._fp, old), chunk_size)
+
+    def removed(self, manifest) -> int:
+        """旧压缩包中有、但源目录中已不存在的文件数"""
+        names = {entry.arcname for entry in manifest.entries}
+        return sum(1 for name in self.infos if name not in names)
+
+    def close(self):
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,241 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from .packer import ARCHIVE_EXTENSIONS, PackStats, pack_archive
+from .progress import JobCancelled, JobControl, format_size
+from .unpacker import unpack_archive
+from .volumes import is_volume, volume_base
+
+JOB_PACK = "pack"
+JOB_UNPACK = "unpack"
+
+STATUS_PENDING = "等待中"
+STATUS_RUNNING = "运行中"
+STATUS_DONE = "已完成"
+STATUS_FAILED = "失败"
+STATUS_CANCELLED = "已取消"
+
+RESOURCE_CPU = "cpu"
+RESOURCE_IO = "io"
+
+# 除不压缩的 tar 外，所有格式打包时都主要消耗 CPU (压缩，zstd/lz4 还会用满所有核心)；
+# 由格式列表推导，新增的格式不会被误当作 IO 密集型。tar 打包和解压主要受磁盘 IO 限制
+_CPU_BOUND_FORMATS = frozenset(ARCHIVE_EXTENSIONS) - {"tar"}
+
+_job_ids = itertools.count(1)
+
+
+@dataclass
+class Job:
+    """队列中的一个打包或解压任务; params 会原样传给 pack_archive / unpack_archive"""
+
+    kind: str
+    source: str
+    target: str
+    params: dict
+    job_id: int = field(default_factory=lambda: next(_job_ids))
+    status: str = STATUS_PENDING
+    progress: object = None  # 最近一次的 ProgressInfo
+    message: str = ""
+    result: object = None  # 打包返回的压缩包路径或解压报告
+    started: float = 0.0
+    finished: float = 0.0
+    control: JobControl = field(default_factory=JobControl)
+
+    @property
+    def resource(self) -> str:
+        if self.kind == JOB_PACK and self.params.get("archive_format") in (
+            _CPU_BOUND_FORMATS
+        ):
+            return RESOURCE_CPU
+        return RESOURCE_IO
+
+    @property
+    def active(self) -> bool:
+        return self.status in (STATUS_PENDING, STATUS_RUNNING)
+
+
+def pack_job(base_name, archive_format, root_dir, base_dir, **options) -> Job:
+    source = os.path.join(root_dir, base_dir)
+    params = dict(
+        base_name=base_name,
+        archive_format=archive_format,
+        root_dir=root_dir,
+        base_dir=base_dir,
+        **options,
+    )
+    return Job(JOB_PACK, source, base_name, params)
+
+
+def unpack_job(archive_file, extract_dir, **options) -> Job:
+    params = dict(archive_file=archive_file, extract_dir=extract_dir, **options)
+    return Job(JOB_UNPACK, archive_file, extract_dir, params)
+
+
+def archive_stem(path) -> str:
+    """去掉压缩包扩展名 (包括 .tar.gz 这类双扩展名和分卷编号) 后的文件名"""
+    if is_volume(path):
+        path = volume_base(path)
+    name = os.path.basename(path)
+    for extension in sorted(ARCHIVE_EXTENSIONS.values(), key=len, reverse=True):
+        if name.lower().endswith(extension):
+            return name[: -len(extension)]
+    return os.path.splitext(name)[0]
+
+
+def pack_job_for(source, archive_format, dest="", multiple=False, **options) -> Job:
+    """
+    按界面和命令行共用的约定创建打包任务:
+    单个源时 dest 是压缩包路径 (可带扩展名)；多个源时 dest 是输出目录；
+    dest 为空时输出到源的父目录。
+    """
+    source = os.path.normpath(source)
+    parent_dir = os.path.dirname(source) or "."
+    item_to_archive = os.path.basename(source)
+    if not os.path.exists(source) or not item_to_archive:
+        raise ValueError(f"无效的源路径: {source}")
+    extension = ARCHIVE_EXTENSIONS.get(archive_format, "")
+    if dest and not multiple and not os.path.isdir(dest):
+        base_name = dest
+        if extension and base_name.lower().endswith(extension):
+            base_name = base_name[: -len(extension)]
+    else:
+        out_dir = parent_dir
+        if dest:
+            out_dir = dest if os.path.isdir(dest) else os.path.dirname(dest) or "."
+        base_name = os.path.join(out_dir, item_to_archive)
+    return pack_job(base_name, archive_format, parent_dir, item_to_archive, **options)
+
+
+def unpack_job_for(archive_file, extract_dir, multiple=False, **options) -> Job:
+    """多个压缩包分别解压到以压缩包命名的子文件夹，避免互相覆盖"""
+    if not os.path.isfile(archive_file):
+        raise ValueError(f"无效的压缩文件: {archive_file}")
+    if multiple:
+        extract_dir = os.path.join(extract_dir, archive_stem(archive_file))
+    return unpack_job(archive_file, extract_dir, **options)
+
+
+class JobScheduler:
+    """
+    批量任务调度器: CPU 密集型和 IO 密集型任务分别限制同时运行的数量，
+    同类任务按提交顺序执行。on_update(job) 在任务状态或进度变化时被调用 (可能来自工作线程)。
+    """
+
+    def __init__(self, cpu_slots=1, io_slots=4, on_update=None):
+        self.limits = {RESOURCE_CPU: max(1, cpu_slots), RESOURCE_IO: max(1, io_slots)}
+        self.on_update = on_update
+        self.jobs = []
+        self._pending = deque()
+        self._running = {RESOURCE_CPU: 0, RESOURCE_IO: 0}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def set_limits(self, cpu_slots=None, io_slots=None):
+        with self._lock:
+            if cpu_slots is not None:
+                self.limits[RESOURCE_CPU] = max(1, cpu_slots)
+            if io_slots is not None:
+                self.limits[RESOURCE_IO] = max(1, io_slots)
+        self._dispatch()
+
+    def submit(self, job) -> Job:
+        with self._lock:
+            self.jobs.append(job)
+            self._pending.append(job)
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job):
+        job.control.cancel()
+        with self._lock:
+            if job in self._pending:
+                self._pending.remove(job)
+                job.status = STATUS_CANCELLED
+            else:
+                job = None
+        if job is not None:
+            self._notify(job)
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            if job.active:
+                self.cancel(job)
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.active]
+
+    def wait(self, timeout=None) -> bool:
+        """阻塞直到没有等待或运行中的任务; 超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending or any(self._running.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def _dispatch(self):
+        started = []
+        with self._lock:
+            for job in list(self._pending):
+                resource = job.resource
+                if self._running[resource] < self.limits[resource]:
+                    self._pending.remove(job)
+                    self._running[resource] += 1
+                    job.status = STATUS_RUNNING
+                    started.append(job)
+        for job in started:
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _notify(self, job):
+        if self.on_update is not None:
+            self.on_update(job)
+
+    def _run(self, job):
+        job.started = time.monotonic()
+        self._notify(job)
+
+        def on_progress(info):
+            job.progress = info
+            self._notify(job)
+
+        try:
+            if job.kind == JOB_PACK:
+                dest_dir = os.path.dirname(job.params["base_name"])
+                if dest_dir:
+                    os.makedirs(dest_dir, exist_ok=True)
+                stats = PackStats()
+                job.result = pack_archive(
+                    progress_callback=on_progress,
+                    control=job.control,
+                    stats=stats,
+                    **job.params,
+                )
+                job.message = " · ".join(filter(None, [job.result, stats.summary()]))
+            else:
+                job.result = unpack_archive(
+                    progress_callback=on_progress, control=job.control, **job.params
+                )
+                job.message = job.params["extract_dir"]
+                if job.result.peak_rss:
+                    job.message += f" · 峰值内存 {format_size(job.result.peak_rss)}"
+            job.status = STATUS_DONE
+        except JobCancelled:
+            job.status = STATUS_CANCELLED
+        except Exception as e:
+            job.status = STATUS_FAILED
+            job.message = str(e)
+        job.finished = time.monotonic()
+        with self._lock:
+            self._running[job.resource] -= 1
+            self._idle.notify_all()
+        self._notify(job)
+        self._dispatch()
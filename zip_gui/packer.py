@@ -0,0 +1,1037 @@
+import hashlib
+import os
+import shutil
+import tarfile
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext, suppress
+from dataclasses import dataclass, replace
+
+from . import fastcodecs, fastio
+from .adaptive import AdaptivePolicy
+from .blockcompress import DEFAULT_BLOCK_SIZE, ParallelBlockWriter
+from .cache import MIN_FILE_SIZE, file_digest
+from .dedup import DuplicateFinder
+from .incremental import ReuseIndex, entry_zipinfo, level_comment
+from .progress import ProgressTracker, format_size
+from .scanner import DEFAULT_SCAN_WORKERS, KIND_DIR, KIND_FILE, KIND_LINK, SourceScanner
+from .telemetry import (
+    NULL_TELEMETRY,
+    PHASE_COMPRESS,
+    PHASE_FSYNC,
+    PHASE_READ,
+    PHASE_SCAN,
+    PHASE_VERIFY,
+    PHASE_WRITE,
+)
+from .verify import ArchiveCorrupted, test_archive
+from .volumes import VolumeWriter, archive_size, remove_volumes, volume_path
+from .zipraw import ZIP_ZSTD, compress_file, copy_written_entry, write_raw_entry
+
+CHUNK_SIZE = fastio.DEFAULT_BUFFER_SIZE  # 默认每次读写 1 MB，可用 buffer_size 调整
+
+ARCHIVE_EXTENSIONS = {
+    "zip": ".zip",
+    "tar": ".tar",
+    "gztar": ".tar.gz",
+    "bztar": ".tar.bz2",
+    "xztar": ".tar.xz",
+    # 已安装 zstandard / lz4 时还有 zstdtar (.tar.zst) 和 lz4tar (.tar.lz4)
+    **fastcodecs.ARCHIVE_EXTENSIONS,
+}
+
+# 注册到 shutil 后，界面上来自 shutil.get_archive_formats() 的格式列表也会包含它们
+fastcodecs.register_formats()
+
+_TAR_MODES = {
+    "tar": "w",
+    "gztar": "w:gz",
+    "bztar": "w:bz2",
+    "xztar": "w:xz",
+}
+
+# 可以使用块并行压缩的 tar 格式
+_BLOCK_CODECS = {
+    "gztar": "gzip",
+    "bztar": "bzip2",
+    "xztar": "xz",
+}
+
+# zip 条目可选的压缩方法
+ZIP_METHODS = {
+    "deflate": zipfile.ZIP_DEFLATED,
+    "stored": zipfile.ZIP_STORED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+if fastcodecs.codec_available("zstd"):
+    # 需要 7-Zip 21+、WinZip 24+ 或 Python 3.14+ 等较新的工具才能解压
+    ZIP_METHODS["zstd"] = ZIP_ZSTD
+DEFAULT_ZIP_METHOD = "deflate"
+
+# 各压缩方法的级别范围 (最低, 最高, 默认)；默认值与 zipfile / tarfile 保持一致
+_LEVEL_RANGES = {
+    "deflate": (0, 9, 6),
+    "bzip2": (1, 9, 9),
+    "lzma": (0, 9, 6),
+    "gztar": (1, 9, 9),
+    "bztar": (1, 9, 9),
+    "xztar": (0, 9, 6),
+    "zstd": (1, 22, 3),
+    "zstdtar": (1, 22, 3),
+    "lz4tar": (0, 16, 0),
+}
+
+
+def compression_levels(archive_format, method=None):
+    """返回 (最低, 最高, 默认) 压缩级别；不支持设置级别时返回 None"""
+    if archive_format == "zip":
+        return _LEVEL_RANGES.get(method or DEFAULT_ZIP_METHOD)
+    return _LEVEL_RANGES.get(archive_format)
+
+
+def check_level(archive_format, method, level):
+    """level 超出 compression_levels() 的范围时抛出 ValueError; 不支持设置级别的格式忽略 level"""
+    levels = compression_levels(archive_format, method)
+    if level is None or levels is None:
+        return
+    low, high, _default = levels
+    if not low <= level <= high:
+        name = (
+            (method or DEFAULT_ZIP_METHOD)
+            if archive_format == "zip"
+            else archive_format
+        )
+        raise ValueError(
+            f"{name} 的压缩级别必须在 {low} 到 {high} 之间，不能为 {level}"
+        )
+
+
+def _zip_level(compress_type, level):
+    # zip 条目实际使用的压缩级别: 未指定时为该方法的默认级别，存储方式没有级别
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    if level is not None:
+        return level
+    for method, value in ZIP_METHODS.items():
+        if value == compress_type:
+            return _LEVEL_RANGES[method][2]
+    return None
+
+
+def _tar_open_options(mode, level):
+    # tarfile.open 只在对应的压缩模式下接受级别参数
+    if level is None or mode in ("w", "w|"):
+        return {}
+    if mode == "w:xz":
+        return {"preset": level}
+    return {"compresslevel": level}
+
+
+@dataclass
+class PackStats:
+    """
+    打包统计: 增量打包复用、重新压缩和删除的条目数，压缩缓存的命中情况，
+    以及自适应压缩时存储 (未压缩) 和压缩的字节数，去重时跳过的重复文件
+    """
+
+    incremental: bool = False  # 是否找到了可复用的旧压缩包
+    reused_files: int = 0
+    reused_bytes: int = 0
+    compressed_files: int = 0
+    compressed_bytes: int = 0
+    removed_files: int = 0
+    cache_hits: int = 0
+    cache_hit_bytes: int = 0
+    stored_files: int = 0  # 因为已经压缩过而直接存储的文件
+    stored_bytes: int = 0
+    cpu_saved: float = 0.0  # 这些文件如果压缩估计要花的 CPU 秒数
+    # 打包期间的峰值常驻内存 (字节)，0 表示无法获取或期间有其他任务同时运行
+    peak_rss: int = 0
+    verified_files: int = 0  # 打包后校验通过的条目数
+    duplicate_files: int = 0  # 与之前的文件内容相同、没有再次读取和压缩的文件
+    duplicate_bytes: int = 0
+    duplicate_saved: int = 0  # 去重使 tar 流 (压缩之前) 减小的字节数，zip 不会减小
+
+    def summary(self) -> str:
+        parts = []
+        if self.incremental:
+            parts.append(
+                f"增量更新: 复用 {self.reused_files} 项 ({format_size(self.reused_bytes)}), "
+                f"重新压缩 {self.compressed_files} 项, 删除 {self.removed_files} 项"
+            )
+        if self.cache_hits:
+            parts.append(
+                f"缓存命中 {self.cache_hits} 项 ({format_size(self.cache_hit_bytes)})"
+            )
+        if self.stored_files:
+            parts.append(
+                f"直接存储 {self.stored_files} 项 ({format_size(self.stored_bytes)}), "
+                f"压缩 {format_size(self.compressed_bytes)}, "
+                f"节省 CPU 约 {self.cpu_saved:.1f} 秒"
+            )
+        if self.duplicate_files:
+            text = (
+                f"重复文件 {self.duplicate_files} 项 "
+                f"({format_size(self.duplicate_bytes)}) 只压缩一次"
+            )
+            if self.duplicate_saved:
+                text += f", tar 数据减小 {format_size(self.duplicate_saved)}"
+            parts.append(text)
+        if self.verified_files:
+            parts.append(f"校验通过 {self.verified_files} 项")
+        if self.peak_rss:
+            parts.append(f"峰值内存 {format_size(self.peak_rss)}")
+        return "; ".join(parts)
+
+
+def _verify_output(tmp_path, archive_path, progress_callback, control, stats):
+    callback = None
+    if progress_callback is not None:
+
+        def callback(info):
+            progress_callback(replace(info, verifying=True))
+
+    result = test_archive(
+        tmp_path,
+        progress_callback=callback,
+        control=control,
+        workers=os.cpu_count() or 1,
+    )
+    if not result.ok:
+        raise ArchiveCorrupted(archive_path, result.bad)
+    stats.verified_files = result.checked
+
+
+def _temp_path(path) -> str:
+    # 与目标在同一目录，保证最终可以原子重命名；正常打开文件，权限遵循 umask
+    return f"{path}.{uuid.uuid4().hex[:8]}.part"
+
+
+@contextmanager
+def _atomic_output(archive_path, volume_size=None):
+    """
+    先写入临时文件，成功后再原子地重命名为 archive_path；失败或取消时删除临时文件。
+    volume_size 不为空时临时文件和最终文件都是分卷 (.001、.002 ...)，逐个重命名，
+    并删除上一次打包留下的多余分卷。
+    """
+    tmp_path = _temp_path(archive_path)
+    try:
+        yield tmp_path
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        remove_volumes(tmp_path)
+        raise
+    if not volume_size:
+        os.replace(tmp_path, archive_path)
+        return
+    index = 1
+    while os.path.exists(volume_path(tmp_path, index)):
+        os.replace(volume_path(tmp_path, index), volume_path(archive_path, index))
+        index += 1
+    remove_volumes(archive_path, index)
+
+
+def _fsync_output(path, volume_size=None):
+    # 重命名之前把数据刷到磁盘，避免系统崩溃后留下名称正确但内容不完整的压缩包
+    paths = [path]
+    if volume_size:
+        paths = []
+        while os.path.exists(volume_path(path, len(paths) + 1)):
+            paths.append(volume_path(path, len(paths) + 1))
+    for part in paths:
+        with open(part, "r+b") as fp:
+            os.fsync(fp.fileno())
+
+
+def _open_output(path, volume_size=None):
+    # 以可读写方式打开: zip 去重时要读回已经写入的条目数据
+    if volume_size:
+        return VolumeWriter(path, volume_size)
+    return open(path, "w+b")
+
+
+def _write_zip(
+    out,
+    entries,
+    tracker,
+    reuse,
+    stats,
+    compress_type,
+    level,
+    policy=None,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+):
+    with zipfile.ZipFile(
+        out,
+        "w",
+        compression=compress_type,
+        compresslevel=level,
+        allowZip64=True,
+    ) as zf:
+        zf.comment = level_comment(_zip_level(compress_type, level))
+        for entry in entries:
+            if entry.kind == KIND_DIR:
+                with telemetry.timer(PHASE_WRITE):
+                    zf.write(entry.path, entry.arcname)
+                tracker.advance(files=1)
+                continue
+            if entry.kind == KIND_LINK and not os.path.isfile(entry.path):
+                # 与 shutil 一致: zip 中只保存链接指向的文件内容
+                tracker.advance(files=1)
+                continue
+            original = _find_original(finder, entry)
+            if original is not None:
+                with telemetry.timer(PHASE_WRITE):
+                    _copy_duplicate(zf, entry, original, chunk_size)
+                tracker.advance(entry.size, files=1)
+                continue
+            old = reuse.match(entry, chunk_size) if reuse is not None else None
+            if old is not None:
+                with telemetry.timer(PHASE_WRITE):
+                    reuse.copy(zf, entry, old, chunk_size)
+                stats.reused_files += 1
+                stats.reused_bytes += old.file_size
+                tracker.advance(entry.size, files=1)
+                continue
+            zinfo = entry_zipinfo(entry)
+            size = _expect_link_content(tracker, entry, zinfo)
+            store = policy is not None and policy.should_store(entry.path, size)
+            if store or compress_type == zipfile.ZIP_STORED:
+                # 只计算 CRC-32，数据由内核从源文件直接复制到压缩包
+                stored = compress_file(
+                    entry.path,
+                    zinfo,
+                    zipfile.ZIP_STORED,
+                    chunk_size=chunk_size,
+                    on_read=tracker.advance,
+                    telemetry=telemetry,
+                )
+                with stored.payload, telemetry.timer(PHASE_WRITE):
+                    write_raw_entry(zf, zinfo, stored.payload, chunk_size)
+                _count_written(stats, policy, zinfo, compress_type)
+                tracker.advance(files=1)
+                continue
+            zinfo.compress_type = compress_type
+            zinfo._compresslevel = level
+            force_zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT
+            started = time.thread_time()
+            with zf.open(zinfo, "w", force_zip64=force_zip64) as dest:
+                chunks = fastio.iter_chunks(entry.path, chunk_size)
+                for chunk in telemetry.timed(PHASE_READ, chunks):
+                    # zipfile 在同一次调用中压缩并写出，整体计入压缩
+                    with telemetry.timer(PHASE_COMPRESS):
+                        dest.write(chunk)
+                    tracker.advance(len(chunk))
+            _count_written(stats, policy, zinfo, compress_type, started)
+            tracker.advance(files=1)
+
+
+def _count_written(stats, policy, zinfo, compress_type, started=None):
+    # 记录新写入的条目是被压缩还是 (自适应地) 直接存储
+    if (
+        zinfo.compress_type == zipfile.ZIP_STORED
+        and compress_type != zinfo.compress_type
+    ):
+        stats.stored_files += 1
+        stats.stored_bytes += zinfo.file_size
+        return
+    stats.compressed_files += 1
+    stats.compressed_bytes += zinfo.file_size
+    if policy is not None and started is not None:
+        policy.record(zinfo.file_size, time.thread_time() - started)
+
+
+def _find_original(finder, entry):
+    # 内容与之前某个文件相同时返回那个文件的条目名称 (在主线程中按清单顺序调用)
+    if finder is None or entry.kind != KIND_FILE:
+        return None
+    return finder.original(entry)
+
+
+def _copy_duplicate(zf, entry, original, chunk_size):
+    # zip 的条目不能共享数据，复制第一个副本已经压缩好的数据，不再读取和压缩源文件
+    zinfo = zipfile.ZipInfo.from_file(entry.path, entry.arcname)
+    copy_written_entry(zf, zf.NameToInfo[original], zinfo, chunk_size)
+
+
+def _expect_link_content(tracker, entry, zinfo) -> int:
+    # 链接指向的内容不在扫描的总量中 (复用时不必读取)，确定要读取时再计入进度总量
+    if entry.kind != KIND_LINK:
+        return entry.size
+    tracker.expect(zinfo.file_size)
+    return zinfo.file_size
+
+
+def _compress_or_reuse(
+    entry,
+    reuse,
+    cache,
+    tracker,
+    spool_dir,
+    compress_type,
+    level,
+    policy=None,
+    chunk_size=CHUNK_SIZE,
+    telemetry=NULL_TELEMETRY,
+):
+    # 在工作线程中执行: 未变化的文件返回旧条目的 ZipInfo，否则返回 (缓存中的或新的) 压缩结果
+    old = reuse.match(entry, chunk_size) if reuse is not None else None
+    if old is not None:
+        return old
+    zinfo = entry_zipinfo(entry)
+    size = _expect_link_content(tracker, entry, zinfo)
+    if policy is not None and policy.should_store(entry.path, size):
+        # 存储的数据不值得缓存
+        compress_type, level, cache = zipfile.ZIP_STORED, None, None
+    digest = None
+    if cache is not None and size >= MIN_FILE_SIZE:
+        digest = file_digest(entry.path, chunk_size)
+        cached = cache.get(digest, compress_type, level, zinfo, size)
+        if cached is not None:
+            tracker.advance(size)
+            return cached
+    check = hashlib.sha256() if digest is not None else None
+    started = time.thread_time()
+    compressed = compress_file(
+        entry.path,
+        zinfo,
+        compress_type,
+        level,
+        chunk_size=chunk_size,
+        on_read=tracker.advance,
+        spool_dir=spool_dir,
+        digest=check,
+        telemetry=telemetry,
+    )
+    if policy is not None and compress_type != zipfile.ZIP_STORED:
+        policy.record(size, time.thread_time() - started)
+    # 文件在计算哈希之后被修改时不写入缓存，避免缓存内容与键不符
+    if check is not None and check.hexdigest() == digest:
+        cache.put(digest, compress_type, level, compressed)
+    return compressed
+
+
+def _write_zip_parallel(
+    out,
+    entries,
+    tracker,
+    workers,
+    reuse,
+    stats,
+    cache=None,
+    compress_type=zipfile.ZIP_DEFLATED,
+    level=None,
+    policy=None,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+):
+    # 各条目在线程池中并发压缩，主线程按清单顺序依次追加，保证输出确定。
+    # 压缩结果暂存在输出所在的目录；流式输出没有文件名，使用系统临时目录
+    name = getattr(out, "name", None)
+    spool_dir = (
+        os.path.dirname(os.path.abspath(name)) if isinstance(name, str) else None
+    )
+    pending = deque()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # 文件条目都已预先压缩，ZipFile 的默认压缩方法只用于目录条目
+        with zipfile.ZipFile(
+            out, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+        ) as zf:
+            zf.comment = level_comment(_zip_level(compress_type, level))
+
+            def drain(limit):
+                while len(pending) > limit:
+                    entry, future = pending.popleft()
+                    if isinstance(future, str):
+                        # 重复文件: future 是第一个副本的条目名称，它已经先写入
+                        with telemetry.timer(PHASE_WRITE):
+                            _copy_duplicate(zf, entry, future, chunk_size)
+                        tracker.advance(entry.size, files=1)
+                        continue
+                    result = None if future is None else future.result()
+                    if result is None:
+                        with telemetry.timer(PHASE_WRITE):
+                            zf.write(entry.path, entry.arcname)
+                        tracker.advance(files=1)
+                    elif isinstance(result, zipfile.ZipInfo):
+                        with telemetry.timer(PHASE_WRITE):
+                            reuse.copy(zf, entry, result, chunk_size)
+                        stats.reused_files += 1
+                        stats.reused_bytes += result.file_size
+                        tracker.advance(entry.size, files=1)
+                    else:
+                        with result.payload, telemetry.timer(PHASE_WRITE):
+                            write_raw_entry(
+                                zf, result.zinfo, result.payload, chunk_size
+                            )
+                        if result.from_cache:
+                            stats.cache_hits += 1
+                            stats.cache_hit_bytes += result.zinfo.file_size
+                        else:
+                            _count_written(stats, None, result.zinfo, compress_type)
+                        tracker.advance(files=1)
+
+            for entry in entries:
+                if entry.kind == KIND_LINK and not os.path.isfile(entry.path):
+                    tracker.advance(files=1)
+                    continue
+                original = _find_original(finder, entry)
+                if entry.kind == KIND_DIR:
+                    pending.append((entry, None))
+                elif original is not None:
+                    pending.append((entry, original))
+                else:
+                    future = pool.submit(
+                        _compress_or_reuse,
+                        entry,
+                        reuse,
+                        cache,
+                        tracker,
+                        spool_dir,
+                        compress_type,
+                        level,
+                        policy,
+                        chunk_size,
+                        telemetry,
+                    )
+                    pending.append((entry, future))
+                telemetry.gauge("queue", len(pending))
+                # 限制同时在途的条目数，使内存和临时文件占用保持有界
+                drain(workers * 2)
+            drain(0)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _add_tar_file(
+    tf, tarinfo, path, tracker, chunk_size, telemetry=NULL_TELEMETRY, phase=PHASE_WRITE
+):
+    # 与 TarFile.addfile 相同，但文件内容经 fastio.copy_file 写入: 不压缩的 tar
+    # 由内核直接复制，压缩的 tar 也只使用一个预先分配的缓冲区。
+    # 写入 tar 流的耗时计入 phase (压缩的 tar 为 compress)
+    buf = tarinfo.tobuf(tf.format, tf.encoding, tf.errors)
+    tf.fileobj.write(buf)
+    tf.offset += len(buf)
+    with open(path, "rb") as src:
+        copied = telemetry.copy(
+            src,
+            tf.fileobj,
+            PHASE_READ,
+            phase,
+            count=tarinfo.size,
+            size=chunk_size,
+            on_chunk=tracker.advance,
+        )
+    if copied != tarinfo.size:
+        raise OSError(f"文件 {path} 在打包过程中被截断")
+    blocks, remainder = divmod(tarinfo.size, tarfile.BLOCKSIZE)
+    if remainder:
+        tf.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+        blocks += 1
+    tf.offset += blocks * tarfile.BLOCKSIZE
+    tf.members.append(tarinfo)
+
+
+def _add_tar_entries(
+    tf,
+    entries,
+    tracker,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+    phase=PHASE_COMPRESS,
+):
+    for entry in entries:
+        tarinfo = tf.gettarinfo(entry.path, entry.arcname)
+        original = None
+        if tarinfo.isreg():
+            original = _find_original(finder, entry)
+        if original is not None:
+            # 内容相同的文件写为指向第一个副本的硬链接，解压后两者共享数据
+            tarinfo.type = tarfile.LNKTYPE
+            tarinfo.linkname = original
+            tarinfo.size = 0
+            tf.addfile(tarinfo)
+            tracker.advance(entry.size)
+        elif entry.kind == KIND_FILE:
+            _add_tar_file(
+                tf, tarinfo, entry.path, tracker, chunk_size, telemetry, phase
+            )
+        else:
+            tf.addfile(tarinfo)
+        tracker.advance(files=1)
+
+
+def _write_tar(
+    out,
+    mode,
+    entries,
+    tracker,
+    level=None,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+):
+    # mode 为 "w|" 时按流模式顺序写出，out 不需要支持 tell/seek
+    with tarfile.open(
+        fileobj=out,
+        mode=mode,
+        bufsize=chunk_size,
+        copybufsize=chunk_size,
+        **_tar_open_options(mode, level),
+    ) as tf:
+        phase = PHASE_WRITE if mode in ("w", "w|") else PHASE_COMPRESS
+        _add_tar_entries(tf, entries, tracker, chunk_size, finder, telemetry, phase)
+
+
+def _write_tar_stream(
+    out,
+    codec,
+    entries,
+    tracker,
+    workers,
+    block_size,
+    level=None,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+):
+    # zstd 由库自己的线程池压缩并启用长距离匹配，lz4 按 block_size 分块并行压缩
+    with (
+        fastcodecs.open_writer(
+            out, codec, level=level, workers=workers, block_size=block_size
+        ) as writer,
+        tarfile.open(
+            fileobj=writer, mode="w|", bufsize=chunk_size, copybufsize=chunk_size
+        ) as tf,
+    ):
+        _add_tar_entries(tf, entries, tracker, chunk_size, finder, telemetry)
+
+
+def _write_tar_parallel(
+    out,
+    codec,
+    entries,
+    tracker,
+    workers,
+    block_size,
+    level=None,
+    chunk_size=CHUNK_SIZE,
+    finder=None,
+    telemetry=NULL_TELEMETRY,
+):
+    # tar 流本身仍按顺序生成，只把压缩这一步分块交给多个线程
+    with (
+        ParallelBlockWriter(
+            out, codec, level=level, block_size=block_size, workers=workers
+        ) as writer,
+        tarfile.open(
+            fileobj=writer, mode="w|", bufsize=chunk_size, copybufsize=chunk_size
+        ) as tf,
+    ):
+        _add_tar_entries(tf, entries, tracker, chunk_size, finder, telemetry)
+
+
+def _scan_tracker(progress_callback, control, telemetry):
+    # 边扫描边打包的进度: 总量随扫描增加，扫描结束时调用返回的 scanned()
+    tracker = ProgressTracker(
+        0, callback=telemetry.observe(progress_callback), control=control
+    )
+    tracker.scanning = True
+    scan_started = time.monotonic()
+
+    def scanned():
+        tracker.scanning = False
+        # 扫描在后台线程中与压缩同时进行，这里记录的是扫描完成所用的时间
+        telemetry.phase_done(PHASE_SCAN, time.monotonic() - scan_started)
+
+    return tracker, scanned
+
+
+def _adaptive_policy(adaptive, archive_format, compress_type, level):
+    if adaptive and archive_format == "zip" and compress_type != zipfile.ZIP_STORED:
+        return AdaptivePolicy(compress_type, level)
+    return None
+
+
+def _finish_stats(stats, archive_format, policy, finder, scanner, tracker, telemetry):
+    # 打包结束后汇总自适应压缩、去重和计数器，并发送最终进度
+    if policy is not None:
+        stats.cpu_saved = policy.saved_seconds()
+    if finder is not None:
+        stats.duplicate_files = finder.duplicate_files
+        stats.duplicate_bytes = finder.duplicate_bytes
+        if archive_format != "zip":
+            stats.duplicate_saved = finder.duplicate_bytes
+    telemetry.count("files", scanner.manifest.file_count)
+    telemetry.count("dirs", scanner.manifest.dir_count)
+    telemetry.count("bytes_read", tracker.done_bytes)
+    tracker.finish()
+
+
+def _write_archive(
+    out,
+    archive_format,
+    entries,
+    tracker,
+    stats,
+    workers,
+    block_size,
+    reuse,
+    cache,
+    compress_type,
+    level,
+    policy,
+    chunk_size,
+    finder,
+    telemetry,
+    streaming=False,
+):
+    # 按格式选择写入方式；streaming=True 时 out 不能 seek，tar 使用流模式
+    # zipfile 自身不支持 LZMA 的压缩级别和 zstd，这两种情况由 zipraw 压缩
+    zipfile_unsupported = compress_type == ZIP_ZSTD or (
+        compress_type == zipfile.ZIP_LZMA and level is not None
+    )
+    if archive_format == "zip" and (
+        workers > 1 or cache is not None or zipfile_unsupported
+    ):
+        # 缓存需要先压缩到临时数据再拼接，单线程时也走这条路径
+        _write_zip_parallel(
+            out,
+            entries,
+            tracker,
+            workers,
+            reuse,
+            stats,
+            cache,
+            compress_type,
+            level,
+            policy,
+            chunk_size,
+            finder,
+            telemetry,
+        )
+    elif archive_format == "zip":
+        _write_zip(
+            out,
+            entries,
+            tracker,
+            reuse,
+            stats,
+            compress_type,
+            level,
+            policy,
+            chunk_size,
+            finder,
+            telemetry,
+        )
+    elif archive_format in fastcodecs.TAR_CODECS:
+        _write_tar_stream(
+            out,
+            fastcodecs.TAR_CODECS[archive_format],
+            entries,
+            tracker,
+            workers,
+            block_size,
+            level,
+            chunk_size,
+            finder,
+            telemetry,
+        )
+    elif archive_format in _BLOCK_CODECS and (workers > 1 or streaming):
+        # tarfile 的流模式 ("w|gz" 等) 在 Python 3.12 之前不接受压缩级别，
+        # 流式输出时单线程也使用分块压缩 (结果同样是标准的 gzip/bzip2/xz 流)
+        _write_tar_parallel(
+            out,
+            _BLOCK_CODECS[archive_format],
+            entries,
+            tracker,
+            max(1, workers),
+            block_size,
+            level,
+            chunk_size,
+            finder,
+            telemetry,
+        )
+    else:
+        _write_tar(
+            out,
+            "w|" if streaming else _TAR_MODES[archive_format],
+            entries,
+            tracker,
+            level,
+            chunk_size,
+            finder,
+            telemetry,
+        )
+
+
+def pack_archive(
+    base_name,
+    archive_format,
+    root_dir,
+    base_dir,
+    progress_callback=None,
+    workers=1,
+    block_size=DEFAULT_BLOCK_SIZE,
+    control=None,
+    incremental=False,
+    verify_hash=False,
+    cache=None,
+    stats=None,
+    method=None,
+    level=None,
+    adaptive=True,
+    buffer_size=None,
+    excludes=None,
+    scan_workers=DEFAULT_SCAN_WORKERS,
+    verify=False,
+    volume_size=None,
+    dedup=False,
+    telemetry=None,
+) -> str:
+    """
+    把 root_dir 下的 base_dir 打包为 base_name + 扩展名，参数含义与 shutil.make_archive 相同。
+    源目录由 scan_workers 个线程并行扫描，扫描的同时就开始逐条目分块写入，
+    通过 progress_callback 汇报进度 (扫描完成前总量会逐渐增加)。
+    excludes 为 .gitignore 风格的排除规则列表，例如 [".git", "node_modules/", "*.pyc"]。
+    workers > 1 时 zip 条目在多个线程中并发压缩；gztar/bztar/xztar/lz4tar 则把 tar 流
+    按 block_size 切块后并发压缩，zstdtar 使用 zstd 自带的多线程压缩。
+    输出先写到同目录的临时文件，只有成功时才重命名为最终文件名；
+    control (JobControl) 用于在各缓冲区之间响应取消和暂停。
+    incremental=True 且目标 zip 已存在时，未变化的条目直接复制旧的压缩数据
+    (verify_hash=True 时按 CRC-32 而不是修改时间判断)；tar 系列格式仍会完整重建。
+    压缩级别记录在 zip 的注释中，与上次不同时所有条目都按新的级别重新压缩。
+    cache (CompressionCache) 如提供，zip 中较大的文件按内容哈希查找已缓存的压缩数据。
+    stats (PackStats) 如提供，会记录复用、重新压缩和缓存命中的条目数。
+    method 为 zip 条目的压缩方法 (ZIP_METHODS 的键，默认 deflate)；level 为压缩级别，
+    范围见 compression_levels()，None 表示使用该方法的默认级别。
+    adaptive=True 时 zip 中已经压缩过的文件 (按扩展名和试压缩判断) 直接存储，
+    tar 系列格式整体压缩，不受影响。
+    buffer_size 为每次读写的字节数 (默认 1 MB)；大文件通过 mmap 读取，不压缩的数据
+    (存储的 zip 条目、tar 的文件内容) 由内核直接复制，内存占用与文件大小无关。
+    stats.peak_rss 记录打包期间的峰值常驻内存；同时有其他任务运行时无法区分，记为 0。
+    verify=True 时在替换目标文件之前用所有 CPU 核心校验生成的压缩包
+    (见 verify.test_archive)，发现损坏的条目时抛出 ArchiveCorrupted，旧文件保持不变。
+    volume_size (字节) 不为空时边写边切分为 name.001、name.002 ... 的分卷，
+    返回第一个分卷的路径；分卷时不做增量更新。
+    dedup=True 时检测内容相同的文件 (先比较大小，大小相同时再比较哈希):
+    tar 系列格式中后出现的副本写为指向第一个副本的硬链接；zip 中每份内容只压缩一次，
+    副本复制第一个条目已经压缩好的数据。stats 记录重复文件数和节省的字节数。
+    telemetry (Telemetry) 如提供，记录扫描、读取、压缩、写出、fsync 和校验各阶段的耗时，
+    以及字节数、文件数和压缩队列深度。输出在重命名之前总会 fsync 到磁盘。
+    """
+    if stats is None:
+        stats = PackStats()
+    if method is not None and archive_format != "zip":
+        raise ValueError(f"{archive_format} 格式不支持选择压缩方法")
+    check_level(archive_format, method, level)
+    compress_type = ZIP_METHODS[method or DEFAULT_ZIP_METHOD]
+    if compress_type == zipfile.ZIP_STORED:
+        level = None
+    if (
+        archive_format != "zip"
+        and archive_format not in _TAR_MODES
+        and archive_format not in fastcodecs.TAR_CODECS
+    ):
+        # 通过 shutil.register_archive_format 注册的其他格式无法细粒度汇报进度，也不能排除条目
+        if excludes:
+            raise ValueError(f"{archive_format} 格式不支持排除规则")
+        if verify:
+            raise ValueError(f"{archive_format} 格式不支持校验")
+        if volume_size:
+            raise ValueError(f"{archive_format} 格式不支持分卷")
+        if dedup:
+            raise ValueError(f"{archive_format} 格式不支持去重")
+        tmp_base = _temp_path(base_name)
+        tmp_path = shutil.make_archive(
+            tmp_base, archive_format, root_dir=root_dir, base_dir=base_dir
+        )
+        archive_path = base_name + tmp_path[len(tmp_base) :]
+        os.replace(tmp_path, archive_path)
+        return archive_path
+
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY
+    chunk_size = fastio.buffer_size(buffer_size)
+    tracker, scanned = _scan_tracker(progress_callback, control, telemetry)
+    archive_path = base_name + ARCHIVE_EXTENSIONS[archive_format]
+    policy = _adaptive_policy(adaptive, archive_format, compress_type, level)
+    finder = DuplicateFinder(chunk_size=chunk_size) if dedup else None
+    telemetry.gauge("workers", workers)
+    reuse = None
+    if incremental and archive_format == "zip" and not volume_size:
+        reuse = ReuseIndex.open(
+            archive_path,
+            compress_type=compress_type,
+            verify_hash=verify_hash,
+            accept_stored=policy is not None,
+            level=_zip_level(compress_type, level),
+        )
+    # 旧压缩包必须在重命名覆盖它之前关闭 (Windows 上打开的文件不能被替换)
+    with (
+        fastio.PeakRssMeter() as meter,
+        _atomic_output(archive_path, volume_size) as tmp_path,
+        reuse or nullcontext(),
+        SourceScanner(
+            root_dir,
+            base_dir,
+            excludes,
+            scan_workers,
+            control,
+            on_found=tracker.expect,
+            on_done=scanned,
+            # 输出位于源目录中时，扫描期间已经存在的临时文件和旧压缩包不能被打包进去
+            skip_paths=(tmp_path, archive_path),
+        ) as scanner,
+    ):
+        with _open_output(tmp_path, volume_size) as out:
+            _write_archive(
+                out,
+                archive_format,
+                scanner,
+                tracker,
+                stats,
+                workers,
+                block_size,
+                reuse,
+                cache,
+                compress_type,
+                level,
+                policy,
+                chunk_size,
+                finder,
+                telemetry,
+            )
+        with telemetry.timer(PHASE_FSYNC):
+            _fsync_output(tmp_path, volume_size)
+        written = volume_path(tmp_path, 1) if volume_size else tmp_path
+        telemetry.count("bytes_written", archive_size(written))
+        if verify:
+            with telemetry.timer(PHASE_VERIFY):
+                _verify_output(written, archive_path, progress_callback, control, stats)
+    if reuse is not None:
+        stats.incremental = True
+        stats.removed_files = reuse.removed(scanner.manifest)
+    stats.peak_rss = meter.peak or 0
+    _finish_stats(stats, archive_format, policy, finder, scanner, tracker, telemetry)
+    if volume_size:
+        return volume_path(archive_path, 1)
+    return archive_path
+
+
+class _StreamOutput:
+    """
+    流式输出的包装: 统计写出的字节数，并且不提供 tell/seek，
+    使 zipfile 即使在输出是普通文件时也按不可定位的流写入 (条目使用数据描述符)
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.written = 0
+
+    def write(self, data):
+        self.fileobj.write(data)
+        nbytes = memoryview(data).nbytes
+        self.written += nbytes
+        return nbytes
+
+    def flush(self):
+        self.fileobj.flush()
+
+
+def pack_stream(
+    out,
+    archive_format,
+    root_dir,
+    base_dir,
+    progress_callback=None,
+    workers=1,
+    block_size=DEFAULT_BLOCK_SIZE,
+    control=None,
+    cache=None,
+    stats=None,
+    method=None,
+    level=None,
+    adaptive=True,
+    buffer_size=None,
+    excludes=None,
+    scan_workers=DEFAULT_SCAN_WORKERS,
+    dedup=False,
+    telemetry=None,
+) -> int:
+    """
+    把 root_dir 下的 base_dir 打包后直接写入二进制文件对象 out (标准输出、管道、套接字等，
+    见 streams.open_stream)，不在磁盘上生成压缩包或临时文件，返回写出的字节数。
+    out 只需要支持 write()，不要求可以 seek: tar 系列格式按流模式顺序写出，
+    zip 条目的 CRC 和大小记录在数据之后的数据描述符中。对方读得慢时 out.write() 阻塞，
+    压缩线程和块压缩的在途数据都有上限，内存占用与压缩包大小无关。
+    其余参数与 pack_archive 相同；增量更新、校验和分卷需要目标文件，zip 去重需要读回
+    已写出的数据，流式输出时都不支持。取消或出错时 out 中只有不完整的压缩包，
+    接收方读取时会报错。
+    """
+    if stats is None:
+        stats = PackStats()
+    if archive_format not in ARCHIVE_EXTENSIONS:
+        raise ValueError(f"{archive_format} 格式不支持流式输出")
+    if method is not None and archive_format != "zip":
+        raise ValueError(f"{archive_format} 格式不支持选择压缩方法")
+    if dedup and archive_format == "zip":
+        raise ValueError("流式输出的 zip 不支持去重 (需要读回已写出的条目)")
+    check_level(archive_format, method, level)
+    compress_type = ZIP_METHODS[method or DEFAULT_ZIP_METHOD]
+    if compress_type == zipfile.ZIP_STORED:
+        level = None
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY
+    chunk_size = fastio.buffer_size(buffer_size)
+    tracker, scanned = _scan_tracker(progress_callback, control, telemetry)
+    policy = _adaptive_policy(adaptive, archive_format, compress_type, level)
+    finder = DuplicateFinder(chunk_size=chunk_size) if dedup else None
+    telemetry.gauge("workers", workers)
+    sink = _StreamOutput(out)
+    with (
+        fastio.PeakRssMeter() as meter,
+        SourceScanner(
+            root_dir,
+            base_dir,
+            excludes,
+            scan_workers,
+            control,
+            on_found=tracker.expect,
+            on_done=scanned,
+        ) as scanner,
+    ):
+        _write_archive(
+            sink,
+            archive_format,
+            scanner,
+            tracker,
+            stats,
+            workers,
+            block_size,
+            None,
+            cache,
+            compress_type,
+            level,
+            policy,
+            chunk_size,
+            finder,
+            telemetry,
+            streaming=True,
+        )
+        with telemetry.timer(PHASE_WRITE):
+            sink.flush()
+    telemetry.count("bytes_written", sink.written)
+    stats.peak_rss = meter.peak or 0
+    _finish_stats(stats, archive_format, policy, finder, scanner, tracker, telemetry)
+    return sink.written
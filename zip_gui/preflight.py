@@ -0,0 +1,184 @@
+# 解压前的预检: 只读取 zip 中央目录或 tar 头部，汇总解压后的总大小、条目数和最大的条目，
+# 与目标磁盘的剩余空间比较，并按压缩比拦截疑似解压炸弹。zip 和已浏览过的压缩包只需几毫秒，
+# 不必等解压到一半才发现磁盘写满。
+import heapq
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+
+from .archive_index import cached_index, iter_tar_members, iter_zip_members
+from .fastcodecs import is_tar_archive
+from .progress import format_size
+from .volumes import archive_size, is_zip_archive
+
+DEFAULT_MAX_RATIO = 200  # 解压后大小 / 压缩包大小 的上限，0 或 None 表示不检查
+# 解压后小于这个大小时不检查压缩比，避免误报全零的小文件
+RATIO_MIN_BYTES = 256 * 1024 * 1024
+BLOCK_SIZE = 4096  # 估算占用空间时每个文件按整块计算
+_LARGEST_COUNT = 5
+
+
+@dataclass
+class PreflightReport:
+    """预检结果: 解压后的大小和条目数、最大的几个条目以及目标磁盘的剩余空间"""
+
+    archive_format: str = ""
+    archive_bytes: int = 0
+    total_bytes: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+    largest: list = field(default_factory=list)  # [(名称, 大小), ...] 从大到小
+    required_bytes: int = 0  # 按整块估算的磁盘占用
+    free_bytes: int = 0
+    elapsed: float = 0.0
+    max_ratio: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.total_bytes / max(self.archive_bytes, 1)
+
+    @property
+    def fits(self) -> bool:
+        return self.required_bytes <= self.free_bytes
+
+    @property
+    def suspicious(self) -> bool:
+        return exceeds_ratio(self.total_bytes, self.archive_bytes, self.max_ratio)
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.file_count} 个文件, {self.dir_count} 个文件夹, "
+            f"解压后 {format_size(self.total_bytes)} "
+            f"(压缩包 {format_size(self.archive_bytes)}, 约 {self.ratio:.1f} 倍)",
+            f"需要 {format_size(self.required_bytes)}, "
+            f"可用 {format_size(self.free_bytes)}",
+        ]
+        if self.largest:
+            lines.append(
+                "最大的条目: "
+                + ", ".join(
+                    f"{name} ({format_size(size)})" for name, size in self.largest
+                )
+            )
+        return "\n".join(lines)
+
+
+class PreflightError(Exception):
+    """预检未通过; report 为预检结果 (解压过程中才发现时可能为 None)"""
+
+    def __init__(self, message, report=None):
+        self.report = report
+        if report is not None:
+            message = f"{message}\n{report.summary()}"
+        super().__init__(message)
+
+
+class InsufficientSpace(PreflightError):
+    pass
+
+
+class SuspiciousRatio(PreflightError):
+    pass
+
+
+def exceeds_ratio(total_bytes, archive_bytes, max_ratio) -> bool:
+    """解压后的大小是否超过压缩包大小的 max_ratio 倍 (小于 RATIO_MIN_BYTES 时不算)"""
+    if not max_ratio or total_bytes < RATIO_MIN_BYTES:
+        return False
+    return total_bytes > max(archive_bytes, 1) * max_ratio
+
+
+def free_space(path) -> int:
+    """path 所在磁盘的剩余空间；path 尚不存在时检查最近的已存在的上级目录"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path).free
+
+
+def _iter_index(index):
+    # 按目录树还原完整路径，产出与 iter_zip_members 相同的元组
+    stack = [(index.root, "")]
+    while stack:
+        node, prefix = stack.pop()
+        for name, child in node.dirs.items():
+            path = f"{prefix}{name}/"
+            yield path, 0, 0, child.mtime, True
+            stack.append((child, path))
+        for i in node.files:
+            yield prefix + index.names[i], index.sizes[i], 0, 0.0, False
+
+
+def preflight_archive(
+    archive_file,
+    extract_dir,
+    predicate=None,
+    max_ratio=DEFAULT_MAX_RATIO,
+    largest=_LARGEST_COUNT,
+    control=None,
+    check=True,
+) -> PreflightReport:
+    """
+    在解压前估算 archive_file 解压到 extract_dir 需要的空间。
+    zip 只解析中央目录，tar 优先使用 archive_index 缓存的目录树，否则只读取头部
+    (压缩的 tar 仍需解压一遍，但不写出任何数据)。
+    predicate(name, is_dir) 如提供，只统计被选中的条目 (与选择性解压一致)。
+    check 为 True 时空间不足抛出 InsufficientSpace，解压后大小超过压缩包 max_ratio 倍
+    抛出 SuspiciousRatio；否则只返回报告。control (JobControl) 用于取消。
+    """
+    started = time.monotonic()
+    if is_zip_archive(archive_file):
+        archive_format = "zip"
+        members = iter_zip_members(archive_file)
+    elif is_tar_archive(archive_file):
+        archive_format = "tar"
+        # 浏览过的压缩包直接使用内存中的目录树，压缩的 tar 不必再解压一遍
+        index = cached_index(archive_file)
+        if index is not None:
+            members = _iter_index(index)
+        else:
+            members = iter_tar_members(archive_file)
+    else:
+        raise shutil.ReadError(f"不支持预检的压缩格式: {archive_file}")
+
+    report = PreflightReport(
+        archive_format=archive_format,
+        archive_bytes=archive_size(archive_file),
+        max_ratio=max_ratio or 0,
+    )
+    heap = []
+    required = 0
+    for count, (name, size, _compressed, _mtime, is_dir) in enumerate(members, 1):
+        if control is not None and count % 10000 == 0:
+            control.checkpoint()
+        if predicate is not None and not predicate(name, is_dir):
+            continue
+        if is_dir:
+            report.dir_count += 1
+            required += BLOCK_SIZE
+            continue
+        report.file_count += 1
+        report.total_bytes += size
+        required += -(-size // BLOCK_SIZE) * BLOCK_SIZE
+        # 按 (大小, 名称) 比较，结果与条目的读取顺序无关
+        if len(heap) < largest:
+            heapq.heappush(heap, (size, name))
+        elif (size, name) > heap[0]:
+            heapq.heapreplace(heap, (size, name))
+    report.largest = [(name, size) for size, name in sorted(heap, reverse=True)]
+    report.required_bytes = required
+    report.free_bytes = free_space(extract_dir)
+    report.elapsed = time.monotonic() - started
+
+    if check:
+        if not report.fits:
+            raise InsufficientSpace("目标磁盘空间不足", report)
+        if report.suspicious:
+            raise SuspiciousRatio(
+                f"疑似解压炸弹: 解压后大小超过压缩包的 {report.max_ratio:g} 倍", report
+            )
+    return report
@@ -0,0 +1,203 @@
+import threading
+import time
+from dataclasses import dataclass
+
+
+class JobCancelled(Exception):
+    """任务被用户取消"""
+
+
+class JobControl:
+    """协作式的取消/暂停控制: 工作线程在处理每个缓冲区之间调用 checkpoint()"""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._lock = threading.Lock()
+        self._paused_since = None
+        self._paused_total = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # 唤醒处于暂停状态的线程，让它们尽快退出
+
+    def pause(self):
+        with self._lock:
+            if self._running.is_set() and not self.cancelled:
+                self._paused_since = time.monotonic()
+                self._running.clear()
+
+    def resume(self):
+        with self._lock:
+            if not self._running.is_set():
+                self._paused_total += time.monotonic() - self._paused_since
+                self._paused_since = None
+                self._running.set()
+
+    def paused_seconds(self, now=None) -> float:
+        """累计暂停时长，用于从吞吐量计算中扣除"""
+        with self._lock:
+            total = self._paused_total
+            if self._paused_since is not None:
+                total += (now or time.monotonic()) - self._paused_since
+            return total
+
+    def checkpoint(self):
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled.is_set():
+            raise JobCancelled("任务已取消")
+
+
+@dataclass
+class ProgressInfo:
+    """某一时刻的任务进度快照"""
+
+    done_bytes: int
+    total_bytes: int
+    done_files: int
+    total_files: int
+    elapsed: float
+    written_bytes: int = 0  # 解压时已写出的未压缩字节数
+    current: str = ""  # 正在处理的条目名称
+    scanning: bool = False  # 源目录仍在扫描，总量还会增加
+    verifying: bool = False  # 打包已完成，正在校验生成的压缩包
+
+    @property
+    def percent(self) -> int:
+        if self.total_bytes > 0:
+            return min(100, int(self.done_bytes * 100 / self.total_bytes))
+        if self.total_files > 0:
+            return min(100, int(self.done_files * 100 / self.total_files))
+        return 0
+
+    @property
+    def speed(self) -> float:
+        """平均吞吐量 (字节/秒)"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.done_bytes / self.elapsed
+
+    @property
+    def eta(self):
+        """预计剩余秒数，无法估算时返回 None"""
+        speed = self.speed
+        if speed <= 0 or self.total_bytes <= 0 or self.scanning:
+            return None
+        return max(0.0, (self.total_bytes - self.done_bytes) / speed)
+
+
+class ProgressTracker:
+    """按字节累计进度，并把回调频率限制在 max_rate 次/秒以内；可被多个线程同时调用"""
+
+    def __init__(
+        self, total_bytes, total_files=0, callback=None, max_rate=20.0, control=None
+    ):
+        self.total_bytes = total_bytes
+        self.total_files = total_files
+        self.done_bytes = 0
+        self.done_files = 0
+        self.written_bytes = 0
+        self.current = ""
+        self.scanning = False
+        self.callback = callback
+        self.control = control
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.start_time = time.monotonic()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, nbytes=0, files=0, written=0):
+        if self.control is not None:
+            self.control.checkpoint()
+        with self._lock:
+            self.done_bytes += nbytes
+            self.done_files += files
+            self.written_bytes += written
+            if self.callback is None:
+                return
+            now = time.monotonic()
+            if now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+            info = self.snapshot(now)
+        self.callback(info)
+
+    def expect(self, nbytes=0, files=0):
+        """边扫描边处理时，把新发现的字节数和条目数计入总量"""
+        with self._lock:
+            self.total_bytes += nbytes
+            self.total_files += files
+
+    def finish(self):
+        """无视频率限制，发送最终进度"""
+        if self.callback is not None:
+            self.callback(self.snapshot())
+
+    def snapshot(self, now=None) -> ProgressInfo:
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self.start_time
+        if self.control is not None:
+            elapsed -= self.control.paused_seconds(now)
+        return ProgressInfo(
+            done_bytes=self.done_bytes,
+            total_bytes=self.total_bytes,
+            done_files=self.done_files,
+            total_files=self.total_files,
+            elapsed=elapsed,
+            written_bytes=self.written_bytes,
+            current=self.current,
+            scanning=self.scanning,
+        )
+
+
+def format_size(num_bytes) -> str:
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def format_progress(info: ProgressInfo) -> str:
+    """生成状态栏文本: 已处理条目与字节、吞吐量 (MB/s) 与剩余时间"""
+    if info.total_files:
+        text = f"{info.done_files}/{info.total_files} 项"
+    else:
+        # 流式读取 tar 时事先不知道条目总数
+        text = f"{info.done_files} 项"
+    text += f" · {format_size(info.done_bytes)}"
+    if info.total_bytes:
+        # 从流中解压时事先不知道总大小
+        text += f" / {format_size(info.total_bytes)}"
+    text += f" · {info.speed / (1024 * 1024):.1f} MB/s"
+    if info.written_bytes:
+        text += f" · 已写出 {format_size(info.written_bytes)}"
+    if info.scanning:
+        text += " · 仍在扫描源文件"
+    if info.verifying:
+        text += " · 正在校验压缩包"
+    eta = info.eta
+    if eta is not None:
+        text += f" · 剩余 {format_duration(eta)}"
+    return text
@@ -0,0 +1,303 @@
+import os
+import re
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+KIND_FILE = "file"
+KIND_DIR = "dir"
+KIND_LINK = "link"
+
+# 列目录和 lstat 主要在等待文件系统 (调用期间释放 GIL)，线程数可以多于 CPU 核心数
+DEFAULT_SCAN_WORKERS = 8
+
+
+@dataclass(slots=True)
+class ScanEntry:
+    root: str  # 源的父目录 (所有条目共享同一个字符串对象)
+    arcname: str  # 压缩包内的名称 (统一使用 "/" 分隔)
+    kind: str
+    size: int
+    mtime: float
+
+    @property
+    def path(self) -> str:
+        """文件系统中的实际路径; 不逐条保存，两百万个条目可以少占几百 MB 内存"""
+        return os.path.join(self.root, self.arcname)
+
+
+@dataclass
+class Manifest:
+    """源目录的预扫描结果: 条目清单、文件数和总字节数"""
+
+    entries: list = field(default_factory=list)
+    total_bytes: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+
+    def add(self, entry: ScanEntry):
+        self.entries.append(entry)
+        if entry.kind == KIND_DIR:
+            self.dir_count += 1
+        else:
+            self.file_count += 1
+            self.total_bytes += entry.size
+
+
+def _translate(pattern) -> str:
+    # gitignore 通配符 -> 正则: "*" 和 "?" 不匹配 "/"，"**" 可以跨越多级目录
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+class ExcludeRules:
+    """
+    .gitignore 风格的排除规则，路径相对于被打包的文件夹:
+    "node_modules" 匹配任意层级的同名文件或目录，"/build" 或 "docs/*.tmp" (含 "/") 从源文件夹
+    开始匹配，以 "/" 结尾的规则只匹配目录，"!" 开头的规则重新包含之前排除的条目，后面的规则优先。
+    与 git 相同，目录被排除后不再进入，其中的条目无法被重新包含。
+    """
+
+    def __init__(self, patterns=()):
+        self.rules = []  # [(正则, 是否为重新包含, 是否只匹配目录), ...]
+        for line in patterns:
+            pattern = line.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negate = pattern.startswith("!")
+            if negate:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                regex = "^" + _translate(pattern.lstrip("/")) + "$"
+            else:
+                regex = "(?:^|/)" + _translate(pattern) + "$"
+            self.rules.append((re.compile(regex, re.DOTALL), negate, dir_only))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def excluded(self, relpath, is_dir=False) -> bool:
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if result == negate and regex.search(relpath):
+                result = not negate
+        return result
+
+
+def _split_abs(path):
+    path = os.path.normcase(os.path.abspath(path))
+    return os.path.dirname(path), os.path.basename(path)
+
+
+def _make_entry(root, arcname, st) -> ScanEntry:
+    mtime = st.st_mtime
+    if stat.S_ISLNK(st.st_mode):
+        # 链接本身没有数据，不计入总字节数 (tar 只保存链接，zip 确定要读取目标时再计入)。
+        # 修改时间取链接本身和目标中较新的一个: 链接被重新指向 (重建链接) 或目标被修改时都会变化，
+        # 增量打包据此判断旧条目能否复用
+        kind = KIND_LINK
+        size = 0
+        try:
+            mtime = max(mtime, os.stat(os.path.join(root, arcname)).st_mtime)
+        except OSError:
+            pass  # 目标不存在
+    elif stat.S_ISDIR(st.st_mode):
+        kind = KIND_DIR
+        size = 0
+    else:
+        kind = KIND_FILE
+        size = st.st_size
+    return ScanEntry(root, arcname, kind, size, mtime)
+
+
+class SourceScanner:
+    """
+    并行扫描 root_dir 下的 base_dir: 线程池中的多个线程同时列目录 (os.scandir) 并读取属性，
+    迭代时仍按名称排序的深度优先顺序产出条目，保证每次结果一致。
+    扫描与迭代同时进行，调用方可以边扫描边压缩；on_found(nbytes, count) 在每个目录列出后
+    (从工作线程中) 调用，传入新发现的字节数和条目数，用于尽早得到总量；整个目录树都列出后
+    调用 on_done()。excludes 为 .gitignore 风格的规则列表 (见 ExcludeRules)，
+    skip_paths 中的文件 (例如正在写入的压缩包) 及其分卷 (.001、.002 ...) 总是被跳过。迭代产出的条目同时保存在 manifest 中。
+    """
+
+    def __init__(
+        self,
+        root_dir,
+        base_dir,
+        excludes=None,
+        workers=DEFAULT_SCAN_WORKERS,
+        control=None,
+        on_found=None,
+        on_done=None,
+        skip_paths=(),
+    ):
+        self.root_dir = root_dir
+        self.arcname = os.path.normpath(base_dir).replace(os.sep, "/")
+        self.rules = ExcludeRules(excludes or ())
+        self.workers = max(1, workers)
+        self.control = control
+        self.on_found = on_found
+        self.on_done = on_done
+        self.manifest = Manifest()
+        self.complete = False
+        self._skip = {_split_abs(path) for path in skip_paths}
+        self._skip_dirs = {parent for parent, _name in self._skip}
+        self._pool = None
+        self._listings = {}  # 目录的 arcname -> 列目录的 Future
+        self._outstanding = 0  # 已提交但尚未列完的目录数
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def _submit(self, arcname):
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self._listings[arcname] = self._pool.submit(self._list_dir, arcname)
+        except RuntimeError:
+            # 扫描已被停止，线程池不再接受新任务
+            with self._lock:
+                self._outstanding -= 1
+            raise
+
+    def _list_dir(self, arcname):
+        # 在工作线程中执行: 列出一个目录，并立即提交其子目录，使线程池始终有活可做
+        try:
+            if self._closed.is_set():
+                return []
+            return self._list_children(arcname)
+        finally:
+            with self._lock:
+                self._outstanding -= 1
+                done = self._outstanding == 0
+            if done and self.on_done is not None and not self._closed.is_set():
+                self.on_done()
+
+    def _list_children(self, arcname):
+        prefix = self.arcname + "/"
+        path = os.path.join(self.root_dir, arcname)
+        with os.scandir(path) as it:
+            children = sorted(it, key=lambda e: e.name)
+        skip = ()
+        if self._skip and os.path.normcase(os.path.abspath(path)) in self._skip_dirs:
+            skip = {name for _parent, name in self._skip}
+        entries = []
+        nbytes = 0
+        for child in children:
+            if skip and self._skipped(child, skip):
+                continue
+            child_arc = f"{arcname}/{child.name}"
+            entry = _make_entry(
+                self.root_dir, child_arc, child.stat(follow_symlinks=False)
+            )
+            if self.rules and self.rules.excluded(
+                child_arc[len(prefix) :], entry.kind == KIND_DIR
+            ):
+                continue
+            entries.append(entry)
+            nbytes += entry.size
+        for entry in entries:
+            if entry.kind == KIND_DIR:
+                try:
+                    self._submit(entry.arcname)
+                except RuntimeError:
+                    break
+        if self.on_found is not None:
+            self.on_found(nbytes, len(entries))
+        return entries
+
+    def _skipped(self, child, names) -> bool:
+        name = child.name
+        base, _, suffix = name.rpartition(".")
+        if name not in names and not (suffix.isdigit() and base in names):
+            return False
+        parent, name = _split_abs(child.path)
+        return (parent, name) in self._skip or (
+            suffix.isdigit() and (parent, base) in self._skip
+        )
+
+    def __iter__(self):
+        top = os.path.join(self.root_dir, self.arcname)
+        top_entry = _make_entry(self.root_dir, self.arcname, os.lstat(top))
+        self.manifest.add(top_entry)
+        if self.on_found is not None:
+            self.on_found(top_entry.size, 1)
+        yield top_entry
+        if top_entry.kind != KIND_DIR:
+            if self.on_done is not None:
+                self.on_done()
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            try:
+                self._submit(self.arcname)
+                yield from self._walk(self._listings.pop(self.arcname))
+            finally:
+                self.close()
+        self.complete = True
+
+    def _walk(self, listing):
+        # 使用显式栈做深度优先遍历，避免目录层级过深时递归溢出
+        stack = [iter(listing.result())]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            self.manifest.add(entry)
+            yield entry
+            if entry.kind == KIND_DIR:
+                if self.control is not None:
+                    self.control.checkpoint()
+                stack.append(iter(self._listings.pop(entry.arcname).result()))
+
+    def close(self):
+        """停止扫描 (提前结束迭代、出错或取消时)"""
+        self._closed.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def scan_source(
+    root_dir, base_dir, control=None, excludes=None, workers=DEFAULT_SCAN_WORKERS
+) -> Manifest:
+    """扫描 root_dir 下的 base_dir，按名称排序，保证每次结果顺序一致"""
+    with SourceScanner(root_dir, base_dir, excludes, workers, control) as scanner:
+        for _entry in scanner:
+            pass
+    return scanner.manifest
@@ -0,0 +1,76 @@
+# 流式输入输出: 打包结果直接写到标准输出、管道或 TCP 套接字，解压时从中读取 tar 流，
+# 数据一次流过，不在磁盘上生成临时的压缩包。例如:
+#   zip-gui-cli pack src -f zstdtar -o - | ssh host zip-gui-cli unpack - -d dest
+#   接收方: zip-gui-cli unpack tcp-listen://0.0.0.0:9000 -d dest
+#   发送方: zip-gui-cli pack src -f gztar -o tcp://receiver:9000
+import os
+import socket
+import stat
+import sys
+from contextlib import contextmanager
+
+from . import fastio
+
+STDIO = "-"
+TCP_SCHEME = "tcp://"  # 连接到 HOST:PORT
+LISTEN_SCHEME = "tcp-listen://"  # 在 HOST:PORT 上等待一个连接
+
+
+def is_stream_spec(spec) -> bool:
+    """spec 是否表示流 ("-"、tcp://、tcp-listen://，或已存在的命名管道 / Unix 套接字)"""
+    if spec == STDIO or spec.startswith((TCP_SCHEME, LISTEN_SCHEME)):
+        return True
+    try:
+        mode = os.stat(spec).st_mode
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+def parse_address(spec):
+    """tcp://HOST:PORT 或 tcp-listen://HOST:PORT -> (HOST, PORT)；监听时 HOST 可以为空"""
+    address = spec.split("://", 1)[1]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"无效的地址: {spec} (应为 HOST:PORT)")
+    return host.strip("[]"), int(port)
+
+
+def _connect(spec):
+    if spec.startswith(TCP_SCHEME):
+        return socket.create_connection(parse_address(spec))
+    host, port = parse_address(spec)
+    with socket.create_server((host, port)) as server:
+        conn, _peer = server.accept()
+    return conn
+
+
+@contextmanager
+def open_stream(spec, mode, buffer_size=None):
+    """
+    打开流式输出 (mode="wb") 或输入 (mode="rb")，返回带固定大小缓冲区的二进制文件对象:
+    "-" 为标准输出 / 标准输入，tcp://HOST:PORT 连接到对方，tcp-listen://HOST:PORT
+    等待对方连接 (只接受一个连接)，其他值按路径打开 (例如命名管道)。
+    缓冲区写满后 write() 阻塞到对方读取为止，数据不会在内存中堆积。
+    退出时刷新输出；套接字会关闭写方向，使对方读到流的末尾。
+    """
+    if mode not in ("rb", "wb"):
+        raise ValueError(f"不支持的模式: {mode}")
+    size = fastio.buffer_size(buffer_size)
+    if spec == STDIO:
+        stdio = sys.stdout if mode == "wb" else sys.stdin
+        with open(stdio.fileno(), mode, buffering=size, closefd=False) as f:
+            if mode == "wb":
+                # 之前通过 sys.stdout 输出的文本先写出，避免与压缩包数据交错
+                stdio.flush()
+            yield f
+        return
+    if not spec.startswith((TCP_SCHEME, LISTEN_SCHEME)):
+        with open(spec, mode, buffering=size) as f:
+            yield f
+        return
+    with _connect(spec) as conn, conn.makefile(mode, buffering=size) as f:
+        yield f
+        if mode == "wb":
+            f.flush()
+            conn.shutdown(socket.SHUT_WR)
@@ -140,6 +140,18 @@ QLabel#StatusLabel {
     font-size: 10pt;
     padding: 5px;
 }
+/* 状态颜色通过动态属性切换 (见 set_style_property)，不必为单个控件重新设置样式表 */
+QLabel#StatusLabel[tone="busy"] { color: #FFD700; }
+QLabel#StatusLabel[tone="ok"] { color: #90EE90; }
+QLabel#StatusLabel[tone="error"] { color: #F08080; }
+
+QProgressBar[failed="true"]::chunk {
+    background-color: #DC143C; /* 猩红色 */
+    border-radius: 5px;
+}
+
+/* 次要的说明文字 */
+QLabel#HintLabel { color: #A9A9A9; }
 
 QRadioButton {
     color: #C0C0C0;
@@ -190,5 +202,25 @@ QFrame[frameShape="5"] { /* HLine specific style */
 """
 
 
+# QLabel#StatusLabel 的 tone 属性
+TONE_NORMAL = ""
+TONE_BUSY = "busy"
+TONE_OK = "ok"
+TONE_ERROR = "error"
+
+
 def load_stylesheet() -> str:
     return theme_style
+
+
+def set_style_property(widget, name, value):
+    """
+    修改控件的动态属性并重新应用样式。整个程序只在启动时设置一次应用级样式表，
+    运行中的颜色变化都由属性选择器完成；对单个控件调用 setStyleSheet 每次都要重新解析样式。
+    """
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
@@ -0,0 +1,381 @@
+# 任务遥测: 按阶段 (扫描、读取、压缩、写出、fsync ...) 累计耗时，记录字节数、文件数和队列深度，
+# 以事件流的形式交给回调 (界面通过 Qt 信号转发) 并可写入 JSON Lines 日志。
+# 阶段耗时是各线程在该阶段花费的时间之和 (并行时可能超过任务的总时长)，用于判断任务受哪一步限制。
+# 几个步骤在一次调用中完成时 (例如 tar 的文件内容在一次复制中读取、压缩并写出) 计入其中主要的阶段。
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+
+from . import fastio
+from .progress import JobCancelled, format_size
+
+PHASE_PREFLIGHT = "preflight"  # 解压前检查磁盘空间和压缩比
+PHASE_SCAN = "scan"  # 扫描源目录 (打包)；读取中央目录 (解压 zip)
+PHASE_READ = "read"  # 读取源文件
+PHASE_COMPRESS = "compress"  # 压缩并计算校验和
+PHASE_DECOMPRESS = "decompress"  # 读取并解压压缩包中的数据
+PHASE_WRITE = "write"  # 写出压缩包或解压后的文件
+PHASE_FSYNC = "fsync"  # 把输出刷到磁盘
+PHASE_VERIFY = "verify"  # 打包后校验
+
+_PHASE_NAMES = {
+    PHASE_PREFLIGHT: "预检",
+    PHASE_SCAN: "扫描",
+    PHASE_READ: "读取",
+    PHASE_COMPRESS: "压缩",
+    PHASE_DECOMPRESS: "解压",
+    PHASE_WRITE: "写出",
+    PHASE_FSYNC: "fsync",
+    PHASE_VERIFY: "校验",
+}
+
+# 计数器: 字节数用 format_size 显示
+_BYTE_COUNTERS = {"bytes_read", "bytes_written"}
+_COUNTER_NAMES = {
+    "files": "文件",
+    "dirs": "目录",
+    "bytes_read": "读取",
+    "bytes_written": "写出",
+}
+_GAUGE_NAMES = {"queue": "压缩队列", "workers": "线程"}
+_OPERATION_NAMES = {"pack": "打包", "unpack": "解压"}
+
+STATUS_RUNNING = "running"
+STATUS_OK = "ok"
+STATUS_CANCELLED = "cancelled"
+STATUS_FAILED = "failed"
+_STATUS_NAMES = {
+    STATUS_RUNNING: "运行中",
+    STATUS_OK: "完成",
+    STATUS_CANCELLED: "已取消",
+    STATUS_FAILED: "失败",
+}
+
+
+def default_log_path() -> str:
+    """默认的 JSON Lines 日志位置 (与压缩缓存在同一个用户缓存目录下)"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "zip_gui", "telemetry.jsonl")
+
+
+@dataclass
+class TelemetryEvent:
+    """
+    遥测事件: kind 为 "start" (任务开始)、"phase" (一个整体阶段结束，例如扫描完成)、
+    "sample" (运行中的周期快照) 或 "finish" (任务结束，data 中包含完整的分解)
+    """
+
+    kind: str
+    job: str
+    elapsed: float  # 距任务开始的秒数
+    data: dict = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        record = {"time": time.time(), **asdict(self)}
+        return json.dumps(record, ensure_ascii=False)
+
+
+@dataclass
+class TelemetrySummary:
+    """任务结束时的分解: 各阶段耗时、计数器和计量值的峰值"""
+
+    operation: str = ""
+    status: str = ""
+    elapsed: float = 0.0
+    phases: dict = field(default_factory=dict)  # 阶段 -> 秒数
+    counters: dict = field(default_factory=dict)
+    peaks: dict = field(default_factory=dict)  # 计量值 (如队列深度) -> 峰值
+    error: str = ""
+
+    def breakdown(self) -> str:
+        """多行文本，供界面的任务详情面板和日志阅读"""
+        operation = _OPERATION_NAMES.get(self.operation, self.operation)
+        status = _STATUS_NAMES.get(self.status, self.status)
+        lines = [f"{operation} · {status} · 用时 {self.elapsed:.2f} 秒"]
+        busy = sum(self.phases.values())
+        for phase, seconds in sorted(self.phases.items(), key=lambda item: -item[1]):
+            share = seconds * 100 / busy if busy else 0
+            lines.append(
+                f"  {_PHASE_NAMES.get(phase, phase):<6} {seconds:8.3f} 秒  {share:5.1f}%"
+            )
+        if self.phases:
+            lines.append("  (各线程耗时之和，并行时可能超过总用时)")
+        counters = []
+        order = list(_COUNTER_NAMES)
+        for name, value in sorted(
+            self.counters.items(),
+            key=lambda item: order.index(item[0]) if item[0] in order else len(order),
+        ):
+            text = format_size(value) if name in _BYTE_COUNTERS else str(value)
+            counters.append(f"{_COUNTER_NAMES.get(name, name)} {text}")
+        if self.elapsed > 0 and self.counters.get("bytes_read"):
+            speed = self.counters["bytes_read"] / self.elapsed / (1024 * 1024)
+            counters.append(f"{speed:.1f} MB/s")
+        if counters:
+            lines.append("  " + " · ".join(counters))
+        peaks = [
+            f"{_GAUGE_NAMES.get(name, name)}峰值 {value}"
+            for name, value in self.peaks.items()
+        ]
+        if peaks:
+            lines.append("  " + " · ".join(peaks))
+        if self.error:
+            lines.append(f"  错误: {self.error}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    # 计入一个阶段的上下文管理器；比 contextmanager 生成器开销小，适合每块数据调用一次
+    __slots__ = ("telemetry", "phase", "started")
+
+    def __init__(self, telemetry, phase):
+        self.telemetry = telemetry
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.telemetry.add(self.phase, time.perf_counter() - self.started)
+
+
+class _TimedWriter:
+    # 在 seconds 中累计 write() 耗时的文件包装；其余属性原样转发
+    def __init__(self, fp):
+        self._fp = fp
+        self.seconds = 0.0
+
+    def write(self, data):
+        started = time.perf_counter()
+        try:
+            return self._fp.write(data)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+    def __getattr__(self, name):
+        return getattr(self._fp, name)
+
+
+class Telemetry:
+    """
+    一个任务的遥测记录，可被多个线程同时调用。on_event(event) 在产生事件时调用 (可能来自
+    工作线程)；log_path 不为空时每个事件追加一行 JSON 到该文件。运行中的快照事件最多每
+    sample_interval 秒一次。
+    """
+
+    enabled = True
+
+    def __init__(self, job="", on_event=None, log_path=None, sample_interval=0.5):
+        self.job = job
+        self.on_event = on_event
+        self.log_path = log_path
+        self.sample_interval = sample_interval
+        self.operation = ""
+        self.phases = {}
+        self.counters = {}
+        self.gauges = {}
+        self.peaks = {}
+        self.started = time.monotonic()
+        self._last_sample = 0.0
+        self._lock = threading.Lock()
+        self._log = None
+
+    def timer(self, phase):
+        """with telemetry.timer(PHASE_WRITE): ... 把代码块的耗时计入该阶段"""
+        return _Timer(self, phase)
+
+    def timed(self, phase, iterable):
+        """迭代 iterable，把每次取下一项的耗时计入该阶段 (用于逐块读取)"""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(phase, time.perf_counter() - started)
+                return
+            self.add(phase, time.perf_counter() - started)
+            yield item
+
+    def copy(self, src, dst, read_phase, write_phase=PHASE_WRITE, **kwargs) -> int:
+        """
+        计时的 fastio.copy_file: 写入 dst 的耗时计入 write_phase，其余 (读取、解压) 计入
+        read_phase；由内核直接复制时整体计入 write_phase
+        """
+        if fastio.can_zero_copy(src, dst):
+            with self.timer(write_phase):
+                return fastio.copy_file(src, dst, **kwargs)
+        timed = _TimedWriter(dst)
+        started = time.perf_counter()
+        try:
+            return fastio.copy_file(src, timed, **kwargs)
+        finally:
+            total = time.perf_counter() - started
+            self.add(write_phase, timed.seconds)
+            self.add(read_phase, total - timed.seconds)
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, value):
+        """记录当前值 (例如队列深度) 并保留峰值"""
+        with self._lock:
+            self.gauges[name] = value
+            if value > self.peaks.get(name, value - 1):
+                self.peaks[name] = value
+
+    def phase_done(self, phase, seconds, **data):
+        """整体计时的阶段结束 (例如扫描完成)，计入耗时并发出 "phase" 事件"""
+        self.add(phase, seconds)
+        self._emit("phase", phase=phase, seconds=round(seconds, 6), **data)
+
+    def observe(self, callback):
+        """包装进度回调: 每次进度更新时顺便发出 (限频的) 快照事件"""
+
+        def on_progress(info):
+            self.sample(info)
+            if callback is not None:
+                callback(info)
+
+        return on_progress
+
+    def sample(self, info):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sample < self.sample_interval:
+                return
+            self._last_sample = now
+            data = dict(
+                operation=self.operation,
+                done_bytes=info.done_bytes,
+                total_bytes=info.total_bytes,
+                done_files=info.done_files,
+                total_files=info.total_files,
+                phases=_rounded(self.phases),
+                gauges=dict(self.gauges),
+                peaks=dict(self.peaks),
+            )
+        self._emit("sample", **data)
+
+    @contextmanager
+    def job_scope(self, operation, **fields):
+        """
+        包住一个任务: 开始时发出 "start" 事件，结束时 (包括取消和出错) 发出带完整分解的
+        "finish" 事件并关闭日志文件
+        """
+        self.operation = operation
+        self.started = time.monotonic()
+        self._emit("start", operation=operation, **fields)
+        status, error = STATUS_OK, ""
+        try:
+            yield self
+        except JobCancelled:
+            status = STATUS_CANCELLED
+            raise
+        except BaseException as e:
+            status, error = STATUS_FAILED, str(e)
+            raise
+        finally:
+            summary = self.summary(status, error)
+            self._emit("finish", **asdict(summary))
+            self._close_log()
+
+    def summary(self, status=STATUS_OK, error="") -> TelemetrySummary:
+        with self._lock:
+            return TelemetrySummary(
+                operation=self.operation,
+                status=status,
+                elapsed=time.monotonic() - self.started,
+                phases=_rounded(self.phases),
+                counters=dict(self.counters),
+                peaks=dict(self.peaks),
+                error=error,
+            )
+
+    def _emit(self, kind, **data):
+        event = TelemetryEvent(kind, self.job, time.monotonic() - self.started, data)
+        if self.log_path:
+            self._write_log(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _write_log(self, event):
+        line = event.to_json() + "\n"
+        with self._lock:
+            try:
+                if self._log is None:
+                    os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                    self._log = open(self.log_path, "a", encoding="utf-8")
+                self._log.write(line)
+                self._log.flush()
+            except OSError:
+                # 日志写不进去不应影响任务本身
+                self.log_path = None
+
+    def _close_log(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class _NullTelemetry(Telemetry):
+    """不记录任何内容的遥测，作为各函数的默认值，避免在热路径上判断是否为 None"""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+
+    def timer(self, phase):
+        return nullcontext()
+
+    def timed(self, phase, iterable):
+        return iterable
+
+    def copy(self, src, dst, read_phase, write_phase=PHASE_WRITE, **kwargs) -> int:
+        return fastio.copy_file(src, dst, **kwargs)
+
+    def add(self, phase, seconds):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def gauge(self, name, value):
+        pass
+
+    def phase_done(self, phase, seconds, **data):
+        pass
+
+    def observe(self, callback):
+        return callback
+
+    def sample(self, info):
+        pass
+
+    def _emit(self, kind, **data):
+        pass
+
+
+NULL_TELEMETRY = _NullTelemetry()
+
+
+def _rounded(phases) -> dict:
+    return {phase: round(seconds, 6) for phase, seconds in phases.items()}
@@ -0,0 +1,580 @@
+import fnmatch
+import io
+import os
+import shutil
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+from . import fastio
+from .archive_index import iter_tar_members, iter_zip_members, select_zip_infos
+from .fastcodecs import is_tar_archive, open_tar, open_tar_stream
+from .packer import CHUNK_SIZE
+from .preflight import SuspiciousRatio, exceeds_ratio, preflight_archive
+from .progress import JobCancelled, ProgressTracker, format_size
+from .telemetry import NULL_TELEMETRY, PHASE_DECOMPRESS, PHASE_PREFLIGHT, PHASE_SCAN
+from .volumes import archive_size, is_zip_archive, open_archive, open_zip
+from .zipraw import MemberReader, open_member
+
+# Python 3.10.12+ / 3.11.4+ 提供了 tar 解压过滤器，可阻止路径穿越和危险链接
+_TAR_DATA_FILTER = getattr(tarfile, "data_filter", None)
+
+
+@dataclass(slots=True)
+class MemberTiming:
+    name: str
+    size: int
+    compressed_size: int
+    seconds: float
+
+
+@dataclass(slots=True)
+class ArchiveMember:
+    name: str
+    size: int
+    compressed_size: int
+    mtime: float
+    is_dir: bool
+
+
+@dataclass
+class UnpackReport:
+    """解压结果: 每个条目的耗时统计"""
+
+    archive_format: str = ""
+    members: list = field(default_factory=list)
+    written_bytes: int = 0
+    elapsed: float = 0.0
+    # 解压期间的峰值常驻内存 (字节)，0 表示无法获取或期间有其他任务同时运行
+    peak_rss: int = 0
+    preflight: object = None  # 解压前预检的 PreflightReport，未预检时为 None
+
+    def slowest(self, count=5) -> list:
+        return sorted(self.members, key=lambda m: m.seconds, reverse=True)[:count]
+
+
+class ExtractionError(Exception):
+    """并行解压时部分条目失败；failures 按条目在压缩包中的顺序排列"""
+
+    def __init__(self, failures):
+        self.failures = failures  # [(条目名称, 错误信息), ...]
+        lines = [f"{name}: {message}" for name, message in failures[:5]]
+        if len(failures) > 5:
+            lines.append(f"... 另有 {len(failures) - 5} 个条目失败")
+        super().__init__(f"{len(failures)} 个条目解压失败\n" + "\n".join(lines))
+
+
+def _normalize_name(name) -> str:
+    name = name.replace("\\", "/")
+    while name.startswith("./"):
+        name = name[2:]
+    return name.lstrip("/")
+
+
+class MemberSelector:
+    """
+    按名称或通配符选择要解压的条目: "docs/" 或 "docs" (目录) 选中整个目录，
+    "*.cfg" 这类模式用 fnmatch 匹配完整路径 ("*" 也匹配 "/")。
+    """
+
+    def __init__(self, patterns):
+        self.names = set()  # 尚未确定是文件还是目录的精确名称
+        self.prefixes = []
+        self.globs = []
+        for pattern in patterns:
+            pattern = _normalize_name(pattern.strip())
+            if not pattern:
+                continue
+            if any(char in pattern for char in "*?["):
+                self.globs.append(pattern)
+            elif pattern.endswith("/"):
+                self.prefixes.append(pattern)
+            else:
+                self.names.add(pattern)
+        self._pending = set(self.names)
+
+    def __bool__(self):
+        return bool(self.names or self.prefixes or self.globs)
+
+    def __call__(self, name, is_dir=False) -> bool:
+        name = _normalize_name(name)
+        bare = name.rstrip("/")
+        if bare in self.names:
+            if is_dir:
+                # 精确名称指向目录时，其下所有条目都要解压
+                self.prefixes.append(bare + "/")
+            self._pending.discard(bare)
+            return True
+        if self.prefixes and name.startswith(tuple(self.prefixes)):
+            return True
+        if self.names:
+            # 没有以 "/" 结尾的目录名: 检查各级上级目录是否被选中
+            slash = bare.find("/")
+            while slash > 0:
+                if bare[:slash] in self.names:
+                    return True
+                slash = bare.find("/", slash + 1)
+        return any(fnmatch.fnmatchcase(bare, pattern) for pattern in self.globs)
+
+    @property
+    def complete(self) -> bool:
+        """所有选择都是文件名且都已找到，顺序读取的 tar 可以提前结束"""
+        return not self.prefixes and not self.globs and not self._pending
+
+
+class _StreamInput(io.RawIOBase):
+    """只能顺序读取的输入: tell() 返回已读取的字节数，用于计算解压进度"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        nbytes = self.fileobj.readinto(buffer)
+        self.consumed += nbytes or 0
+        return nbytes
+
+    def tell(self):
+        return self.consumed
+
+
+class _Extractor:
+    """逐条目解压，每个条目使用固定大小的缓冲区复制"""
+
+    def __init__(
+        self,
+        archive_file,
+        extract_dir,
+        progress_callback,
+        control=None,
+        selector=None,
+        buffer_size=CHUNK_SIZE,
+        telemetry=NULL_TELEMETRY,
+        max_ratio=None,
+    ):
+        self.archive_file = archive_file
+        self.selector = selector
+        self.buffer_size = buffer_size
+        self.telemetry = telemetry
+        self.max_ratio = max_ratio
+        self.extract_dir = os.path.abspath(extract_dir)
+        # 从流中解压时事先不知道压缩包的大小
+        self.tracker = ProgressTracker(
+            archive_size(archive_file) if archive_file is not None else 0,
+            callback=telemetry.observe(progress_callback),
+            control=control,
+        )
+        self.report = UnpackReport()
+        self._raw = None
+        self._consumed = 0
+
+    def _sync_consumed(self, written=0):
+        # tar: 已消耗的压缩字节数 = 原始压缩包文件的读取位置
+        pos = self._raw.tell()
+        self.tracker.advance(max(0, pos - self._consumed), written=written)
+        self._consumed = max(self._consumed, pos)
+        # 流无法事先预检，只能边解压边比较已写出和已读取的字节数
+        if exceeds_ratio(self.tracker.written_bytes, self._consumed, self.max_ratio):
+            raise SuspiciousRatio(
+                f"疑似解压炸弹: 已写出 {format_size(self.tracker.written_bytes)}，"
+                f"超过已读取数据的 {self.max_ratio:g} 倍"
+            )
+
+    def _target_path(self, name) -> str:
+        # 与 zipfile 的处理一致: 去掉盘符、绝对路径前缀以及 "." / ".." 组成部分
+        name = name.replace("\\", "/")
+        parts = [p for p in name.split("/") if p not in ("", ".", "..")]
+        if parts:
+            parts[0] = os.path.splitdrive(parts[0])[1] or parts[0]
+        target = os.path.join(self.extract_dir, *parts)
+        if os.path.commonpath([self.extract_dir, os.path.abspath(target)]) != (
+            self.extract_dir
+        ):
+            raise ValueError(f"条目 '{name}' 试图写到目标文件夹之外")
+        return target
+
+    def _copy(self, src, target, on_chunk):
+        # 解压后的数据 readinto 到预先分配的缓冲区；src 为 FileRange 时由内核直接复制
+        try:
+            with open(target, "wb") as dst:
+                self.telemetry.copy(
+                    src,
+                    dst,
+                    PHASE_DECOMPRESS,
+                    size=self.buffer_size,
+                    on_chunk=on_chunk,
+                )
+        except BaseException:
+            # 取消或出错时删除写了一半的文件，不留下截断的内容
+            with suppress(OSError):
+                os.remove(target)
+            raise
+
+    def _record(self, name, size, compressed_size, started):
+        self.report.members.append(
+            MemberTiming(name, size, compressed_size, time.monotonic() - started)
+        )
+
+    def _extract_zip_member(self, zf, info, target, make_parents=True):
+        started = time.monotonic()
+        self.tracker.current = info.filename
+        consumed = 0
+        if info.is_dir():
+            if make_parents:
+                os.makedirs(target, exist_ok=True)
+        else:
+            ratio = info.compress_size / info.file_size if info.file_size else 0
+
+            def on_chunk(nbytes):
+                # 按压缩率把写出的字节折算为消耗的压缩字节
+                nonlocal consumed
+                step = min(int(nbytes * ratio), info.compress_size - consumed)
+                consumed += step
+                self.tracker.advance(step, written=nbytes)
+
+            if make_parents:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open_member(zf, info) as src:
+                self._copy(src, target, on_chunk)
+            _apply_zip_attrs(info, target)
+        self.tracker.advance(info.compress_size - consumed, files=1)
+        return MemberTiming(
+            info.filename,
+            info.file_size,
+            info.compress_size,
+            time.monotonic() - started,
+        )
+
+    def _open_zip(self):
+        # 选择性解压时不构建完整的 ZipFile，只按选中条目的偏移直接读取
+        if self.selector is not None:
+            return MemberReader(self.archive_file)
+        return open_zip(self.archive_file)
+
+    def extract_zip(self, workers=1):
+        self.report.archive_format = "zip"
+        started = time.monotonic()
+        with self._open_zip() as zf:
+            if self.selector is not None:
+                infos = select_zip_infos(self.archive_file, self.selector)
+            else:
+                infos = zf.infolist()
+            self.telemetry.phase_done(
+                PHASE_SCAN, time.monotonic() - started, members=len(infos)
+            )
+            # zip 的中央目录记录了每个条目的压缩大小，进度按其累计值计算
+            self.tracker.total_bytes = sum(info.compress_size for info in infos)
+            self.tracker.total_files = len(infos)
+            if workers > 1 and len(infos) > 1:
+                self._extract_zip_parallel(infos, workers)
+                return
+            for info in infos:
+                target = self._target_path(info.filename)
+                self.report.members.append(self._extract_zip_member(zf, info, target))
+
+    def _extract_zip_parallel(self, infos, workers):
+        # 同名条目在串行解压时后者覆盖前者，这里只保留最后一个以得到相同结果
+        latest = {}
+        for index, info in enumerate(infos):
+            latest[self._target_path(info.filename)] = index
+
+        # 先一次性创建全部目录，各线程只负责写文件，不会在 makedirs 上竞争
+        dirs = set()
+        files = []
+        for target, index in latest.items():
+            if infos[index].is_dir():
+                dirs.add(target)
+            else:
+                dirs.add(os.path.dirname(target))
+                files.append((index, target))
+        for path in sorted(dirs):
+            os.makedirs(path, exist_ok=True)
+        self.tracker.advance(files=len(infos) - len(files))
+        timings = [
+            (index, MemberTiming(infos[index].filename, 0, 0, 0.0))
+            for index in latest.values()
+            if infos[index].is_dir()
+        ]
+
+        # 按压缩大小贪心分配给负载最小的线程；每个文件额外计 4 KB 代表打开/关闭的开销
+        buckets = [[] for _ in range(workers)]
+        loads = [0] * workers
+        for index, target in sorted(
+            files, key=lambda item: (-infos[item[0]].compress_size, item[0])
+        ):
+            slot = loads.index(min(loads))
+            buckets[slot].append((index, target))
+            loads[slot] += infos[index].compress_size + 4096
+
+        def run_bucket(bucket):
+            timings = []
+            failures = []
+            # 每个线程使用独立的文件句柄，避免共享读取位置
+            with self._open_zip() as zf:
+                for index, target in sorted(bucket):
+                    try:
+                        timing = self._extract_zip_member(
+                            zf, infos[index], target, make_parents=False
+                        )
+                        timings.append((index, timing))
+                    except JobCancelled:
+                        raise
+                    except Exception as e:
+                        failures.append((index, infos[index].filename, str(e)))
+            return timings, failures
+
+        failures = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for bucket_timings, bucket_failures in pool.map(run_bucket, buckets):
+                timings.extend(bucket_timings)
+                failures.extend(bucket_failures)
+        timings.sort(key=lambda item: item[0])
+        self.report.members.extend(timing for _, timing in timings)
+        if failures:
+            failures.sort(key=lambda item: item[0])
+            raise ExtractionError([(name, message) for _, name, message in failures])
+
+    def extract_tar(self):
+        self.report.archive_format = "tar"
+        with open_archive(self.archive_file) as raw, open_tar(raw) as tf:
+            self._extract_tar_members(tf, raw)
+
+    def extract_tar_stream(self, fileobj):
+        """从只能顺序读取的 fileobj (标准输入、管道、套接字) 中解压 tar 流"""
+        self.report.archive_format = "tar"
+        raw = _StreamInput(fileobj)
+        with open_tar_stream(raw) as tf:
+            self._extract_tar_members(tf, raw, stream=True)
+
+    def _extract_tar_members(self, tf, raw, stream=False):
+        # raw 为压缩包本身的读取对象，按它的读取位置计算已消耗的压缩字节。
+        # stream 为 True 时输入不能回退: 选择性解压时也读完整个流 (发送方不会因为管道或连接
+        # 提前关闭而报错)，硬链接只能指向本次已经写出的文件
+        self._raw = raw
+        dir_members = []
+        written = set()  # 流式选择性解压时已写出的普通文件名称
+        for member in tf:
+            if self.selector is not None:
+                if not self.selector(member.name, member.isdir()):
+                    continue
+            started = time.monotonic()
+            start_pos = raw.tell()
+            self.tracker.current = member.name
+            if _TAR_DATA_FILTER is not None:
+                member = _TAR_DATA_FILTER(member, self.extract_dir)
+            target = self._target_path(member.name)
+            if member.isreg():
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if tf.fileobj is raw and not member.issparse():
+                    # 不压缩的 tar: 文件内容原样存放在压缩包中，由内核直接复制
+                    raw.seek(member.offset_data)
+                    self._copy(
+                        fastio.FileRange(raw, member.size),
+                        target,
+                        self._sync_consumed,
+                    )
+                else:
+                    with tf.extractfile(member) as src:
+                        self._copy(src, target, self._sync_consumed)
+                _apply_attrs(target, member.mode, member.mtime)
+                if stream and self.selector is not None:
+                    written.add(member.name)
+            elif member.isdir():
+                os.makedirs(target, exist_ok=True)
+                # 目录属性留到最后设置，避免只读目录阻止后续写入
+                dir_members.append((target, member))
+            else:
+                if (
+                    stream
+                    and self.selector is not None
+                    and member.islnk()
+                    and member.linkname not in written
+                ):
+                    # 目标在前面被跳过了，tarfile 会尝试回退到目标的数据处重新读取
+                    raise tarfile.ExtractError(
+                        f"无法从流中单独解压硬链接 {member.name}: 它指向的 "
+                        f"{member.linkname} 未被选中，请同时选择该文件或从压缩包文件解压"
+                    )
+                _extract_special(tf, member, self.extract_dir)
+            # 压缩流按块读取，这里的压缩大小是按读取位置估算的近似值
+            self._record(member.name, member.size, raw.tell() - start_pos, started)
+            self._sync_consumed()
+            self.tracker.advance(files=1)
+            if not stream and self.selector is not None and self.selector.complete:
+                # 要找的文件都已解压，不必再读取 (解压) 压缩包的剩余部分
+                break
+        for target, member in reversed(dir_members):
+            _apply_attrs(target, member.mode, member.mtime)
+
+
+def _apply_attrs(target, mode, mtime):
+    if mode is not None:
+        os.chmod(target, mode & 0o7777)
+    if mtime is not None:
+        os.utime(target, (mtime, mtime))
+
+
+def _apply_zip_attrs(info, target):
+    mode = None
+    if info.create_system == 3:  # 由 Unix 系统创建，external_attr 高 16 位是权限
+        mode = (info.external_attr >> 16) & 0o777 or None
+    mtime = time.mktime(info.date_time + (0, 0, -1))
+    _apply_attrs(target, mode, mtime)
+
+
+def _extract_special(tf, member, extract_dir):
+    # 链接、设备等特殊条目交给 tarfile 处理；过滤器已在前面执行过
+    if _TAR_DATA_FILTER is not None:
+        tf.extract(member, extract_dir, filter="fully_trusted")
+    else:
+        tf.extract(member, extract_dir)
+
+
+def _finish_report(extractor, telemetry, started, meter) -> UnpackReport:
+    # 发送最终进度，汇总计数器、写出的字节数、用时和峰值内存
+    extractor.tracker.finish()
+    telemetry.count("files", extractor.tracker.done_files)
+    telemetry.count("bytes_read", extractor.tracker.done_bytes)
+    telemetry.count("bytes_written", extractor.tracker.written_bytes)
+    extractor.report.written_bytes = extractor.tracker.written_bytes
+    extractor.report.elapsed = time.monotonic() - started
+    extractor.report.peak_rss = meter.peak or 0
+    return extractor.report
+
+
+def unpack_archive(
+    archive_file,
+    extract_dir,
+    progress_callback=None,
+    workers=1,
+    control=None,
+    members=None,
+    buffer_size=None,
+    telemetry=None,
+    preflight=False,
+    max_ratio=None,
+) -> UnpackReport:
+    """
+    基于 zipfile/tarfile 逐条目解压 archive_file 到 extract_dir。
+    进度按已读取的压缩字节计算，同时统计已写出的解压字节；返回包含每个条目耗时的报告。
+    workers > 1 时 zip 条目由多个线程并发解压 (tar 只能顺序读取)。
+    control (JobControl) 用于在各缓冲区之间响应取消和暂停。
+    members 为条目名称或通配符列表时只解压匹配的条目 (见 MemberSelector):
+    zip 直接定位到这些条目，tar 在所有指定的文件都找到后停止读取。
+    buffer_size 为每次读写的字节数 (默认 1 MB)；报告中的 peak_rss 为解压期间的峰值常驻内存，
+    同时有其他任务运行时无法区分，记为 0。
+    telemetry (Telemetry) 如提供，记录读取中央目录、解压和写出文件各阶段的耗时以及字节数。
+    preflight 为 True 时先用 preflight_archive 检查目标磁盘的剩余空间和压缩比，
+    未通过时抛出 PreflightError 且不写出任何文件；max_ratio 为允许的最大压缩比 (None 不检查)，
+    tar 解压过程中也按已读取和已写出的字节数检查。
+    """
+    started = time.monotonic()
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY
+    buffer_size = fastio.buffer_size(buffer_size)
+    selector = MemberSelector(members) if members else None
+    if selector is not None and not selector:
+        selector = None
+    telemetry.gauge("workers", workers)
+    checked = None
+    with fastio.PeakRssMeter() as meter:
+        if preflight and (is_zip_archive(archive_file) or is_tar_archive(archive_file)):
+            with telemetry.timer(PHASE_PREFLIGHT):
+                # MemberSelector 会记录已匹配的名称，预检使用单独的实例
+                checked = preflight_archive(
+                    archive_file,
+                    extract_dir,
+                    predicate=MemberSelector(members) if selector is not None else None,
+                    max_ratio=max_ratio,
+                    control=control,
+                )
+        if is_zip_archive(archive_file):
+            extractor = _Extractor(
+                archive_file,
+                extract_dir,
+                progress_callback,
+                control,
+                selector,
+                buffer_size,
+                telemetry,
+            )
+            extractor.extract_zip(workers)
+        elif is_tar_archive(archive_file):
+            extractor = _Extractor(
+                archive_file,
+                extract_dir,
+                progress_callback,
+                control,
+                selector,
+                buffer_size,
+                telemetry,
+                max_ratio,
+            )
+            extractor.extract_tar()
+        else:
+            # 其他通过 shutil.register_unpack_format 注册的格式
+            if selector is not None:
+                raise shutil.ReadError(f"该格式不支持选择性解压: {archive_file}")
+            shutil.unpack_archive(archive_file, extract_dir)
+            return UnpackReport(
+                archive_format="other", elapsed=time.monotonic() - started
+            )
+    extractor.report.preflight = checked
+    return _finish_report(extractor, telemetry, started, meter)
+
+
+def unpack_stream(
+    fileobj,
+    extract_dir,
+    progress_callback=None,
+    control=None,
+    members=None,
+    buffer_size=None,
+    telemetry=None,
+    max_ratio=None,
+) -> UnpackReport:
+    """
+    从只能顺序读取的二进制文件对象 fileobj (标准输入、管道、套接字等，见 streams.open_stream)
+    中解压 tar 流到 extract_dir，数据只读一遍，内存占用与压缩包大小无关。
+    支持 tar 以及 gz/bz2/xz/zstd/lz4 压缩的 tar (按文件头自动识别)；zip 的中央目录在末尾，
+    无法流式解压。事先不知道总大小，进度只报告已读取的字节数和条目数。
+    其余参数与 unpack_archive 相同；members 指定的条目找齐后仍会读完剩余的流。
+    流不能回退，选中的硬链接 (例如去重生成的副本) 指向的文件也必须被选中，否则抛出 tarfile.ExtractError。
+    流无法预检，max_ratio 只在解压过程中按已读取和已写出的字节数检查。
+    """
+    started = time.monotonic()
+    if telemetry is None:
+        telemetry = NULL_TELEMETRY
+    buffer_size = fastio.buffer_size(buffer_size)
+    selector = MemberSelector(members) if members else None
+    if selector is not None and not selector:
+        selector = None
+    extractor = _Extractor(
+        None,
+        extract_dir,
+        progress_callback,
+        control,
+        selector,
+        buffer_size,
+        telemetry,
+        max_ratio,
+    )
+    with fastio.PeakRssMeter() as meter:
+        extractor.extract_tar_stream(fileobj)
+    return _finish_report(extractor, telemetry, started, meter)
+
+
+def list_archive(archive_file) -> list:
+    """列出压缩包中的条目 (不解压数据): zip 读取中央目录，tar 只读取各条目的头部"""
+    if is_zip_archive(archive_file):
+        members = iter_zip_members(archive_file)
+    elif is_tar_archive(archive_file):
+        members = iter_tar_members(archive_file)
+    else:
+        raise shutil.ReadError(f"不支持列出内容的压缩格式: {archive_file}")
+    return [ArchiveMember(*member) for member in members]
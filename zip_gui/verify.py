@@ -0,0 +1,152 @@
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .fastcodecs import is_tar_archive, open_tar
+from .fastio import DEFAULT_BUFFER_SIZE
+from .progress import JobCancelled, ProgressTracker
+from .volumes import archive_size, is_zip_archive, open_archive, open_zip
+from .zipraw import MemberReader, open_member
+
+
+@dataclass
+class VerifyResult:
+    """完整性校验结果; bad 按条目在压缩包中的顺序排列"""
+
+    archive_format: str = ""
+    checked: int = 0
+    bad: list = field(default_factory=list)  # [(条目名称, 错误信息), ...]
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.bad
+
+
+class ArchiveCorrupted(Exception):
+    """校验发现损坏的条目；failures 按条目在压缩包中的顺序排列"""
+
+    def __init__(self, archive_file, failures):
+        self.archive_file = archive_file
+        self.failures = failures  # [(条目名称, 错误信息), ...]
+        lines = [f"{name}: {message}" for name, message in failures[:5]]
+        if len(failures) > 5:
+            lines.append(f"... 另有 {len(failures) - 5} 个条目损坏")
+        super().__init__(f"{archive_file} 校验失败:\n" + "\n".join(lines))
+
+
+def _drain(src, on_chunk):
+    # 解压到空设备: 只读取不保存，zipfile 会在读到末尾时校验 CRC-32
+    while True:
+        chunk = src.read(DEFAULT_BUFFER_SIZE)
+        if not chunk:
+            break
+        on_chunk(len(chunk))
+
+
+def _test_zip_member(zf, info, tracker):
+    # 返回错误信息，条目完好时返回 None
+    tracker.current = info.filename
+    error = None
+    if not info.is_dir():
+        try:
+            with open_member(zf, info) as src:
+                _drain(src, lambda n: tracker.advance(written=n))
+        except JobCancelled:
+            raise
+        except Exception as e:
+            error = str(e)
+    tracker.advance(info.compress_size, files=1)
+    return error
+
+
+def _test_zip(archive_file, result, tracker, workers):
+    with open_zip(archive_file) as zf:
+        infos = zf.infolist()
+        tracker.total_bytes = sum(info.compress_size for info in infos)
+        tracker.total_files = len(infos)
+        if workers > 1 and len(infos) > 1:
+            failures = _test_zip_parallel(archive_file, infos, tracker, workers)
+        else:
+            failures = []
+            for index, info in enumerate(infos):
+                error = _test_zip_member(zf, info, tracker)
+                if error is not None:
+                    failures.append((index, error))
+    result.checked = len(infos)
+    result.bad = [(infos[index].filename, error) for index, error in failures]
+
+
+def _test_zip_parallel(archive_file, infos, tracker, workers):
+    # 与并行解压相同: 按压缩大小贪心分配给负载最小的线程，每个线程使用独立的文件句柄
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for index in sorted(range(len(infos)), key=lambda i: (-infos[i].compress_size, i)):
+        slot = loads.index(min(loads))
+        buckets[slot].append(index)
+        loads[slot] += infos[index].compress_size + 4096
+
+    def run_bucket(bucket):
+        failures = []
+        with MemberReader(archive_file) as reader:
+            for index in sorted(bucket):
+                error = _test_zip_member(reader, infos[index], tracker)
+                if error is not None:
+                    failures.append((index, error))
+        return failures
+
+    failures = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for bucket_failures in pool.map(run_bucket, buckets):
+            failures.extend(bucket_failures)
+    failures.sort()
+    return failures
+
+
+def _test_tar(archive_file, result, tracker):
+    consumed = 0
+    with open_archive(archive_file) as raw:
+        try:
+            with open_tar(raw) as tf:
+                for member in tf:
+                    tracker.current = member.name
+                    if member.isreg():
+                        with tf.extractfile(member) as src:
+                            _drain(src, lambda n: tracker.advance(written=n))
+                    result.checked += 1
+                    pos = raw.tell()
+                    tracker.advance(pos - consumed, files=1)
+                    consumed = pos
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # gzip/bz2/xz 的流校验和出错时无法继续读取后面的条目
+            result.bad.append((tracker.current or "<stream>", str(e)))
+
+
+def test_archive(
+    archive_file, progress_callback=None, control=None, workers=1
+) -> VerifyResult:
+    """
+    校验 archive_file 的完整性: 逐条目解压到空设备，zip 校验每个条目的 CRC-32，
+    tar.gz/tar.xz/tar.zst 等校验压缩流自身的校验和。损坏的条目记录在结果的 bad 列表中。
+    workers > 1 时 zip 条目分给多个线程同时校验 (解压和 CRC-32 计算期间释放 GIL)；
+    tar 只能按顺序读取压缩流。
+    """
+    started = time.monotonic()
+    tracker = ProgressTracker(
+        archive_size(archive_file), callback=progress_callback, control=control
+    )
+    result = VerifyResult()
+    if is_zip_archive(archive_file):
+        result.archive_format = "zip"
+        _test_zip(archive_file, result, tracker, workers)
+    elif is_tar_archive(archive_file):
+        result.archive_format = "tar"
+        _test_tar(archive_file, result, tracker)
+    else:
+        raise shutil.ReadError(f"不支持校验的压缩格式: {archive_file}")
+    tracker.finish()
+    result.elapsed = time.monotonic() - started
+    return result
@@ -0,0 +1,279 @@
+# 分卷压缩包: 把一个压缩包按固定大小依次写入 name.001、name.002 ...，
+# 与 7-Zip 的分卷以及 split 命令的结果相同 (cat name.* > name 即可合并)。
+# 打包时边写边切分，不会先生成完整大小的临时文件；解压时把各分卷当作一个连续的文件读取，
+# zip 的中央目录偏移和 tar 流都不需要任何改动，磁盘上始终只有一份数据。
+
+import io
+import os
+import re
+import zipfile
+from contextlib import suppress
+
+_VOLUME_SUFFIX = re.compile(r"\.(\d{3})$")
+
+
+def volume_path(path, index) -> str:
+    """第 index 个分卷 (从 1 开始) 的文件名"""
+    return f"{path}.{index:03d}"
+
+
+def is_volume(path) -> bool:
+    """
+    path 是否为分卷文件: 以 .001 这类三位数字结尾，并且同组的第一个分卷 (.001) 存在。
+    backup.2024、dump.123 (没有 dump.001) 这类名称恰好以数字结尾的文件按普通文件打开
+    """
+    if _VOLUME_SUFFIX.search(path) is None:
+        return False
+    return os.path.isfile(volume_path(volume_base(path), 1))
+
+
+def volume_base(path) -> str:
+    """分卷文件对应的完整压缩包名称，例如 backup.zip.003 -> backup.zip"""
+    return _VOLUME_SUFFIX.sub("", path)
+
+
+def volume_set(path) -> list:
+    """
+    path 所在分卷组的全部分卷 (按顺序)。path 可以是其中任意一个分卷，
+    从 .001 开始依次查找，直到下一个编号不存在为止。
+    """
+    base = volume_base(path)
+    paths = []
+    while os.path.isfile(volume_path(base, len(paths) + 1)):
+        paths.append(volume_path(base, len(paths) + 1))
+    if not paths:
+        raise FileNotFoundError(f"找不到第一个分卷: {volume_path(base, 1)}")
+    return paths
+
+
+def remove_volumes(path, start=1):
+    """删除 path 的第 start 个及之后的分卷"""
+    index = start
+    while True:
+        try:
+            os.remove(volume_path(path, index))
+        except FileNotFoundError:
+            return
+        index += 1
+
+
+def archive_size(path) -> int:
+    """压缩包的总大小，分卷时为所有分卷之和"""
+    if is_volume(path):
+        return sum(os.path.getsize(part) for part in volume_set(path))
+    return os.path.getsize(path)
+
+
+class VolumeWriter(io.RawIOBase):
+    """
+    可随机读写的分卷输出: 第 i 个分卷保存整体偏移 [i * volume_size, (i + 1) * volume_size)
+    的数据。zipfile 回写本地文件头、去重时读取已写入的条目都可能跨回前面的分卷，
+    此时重新打开该分卷。同一时刻只打开一个分卷文件。
+    """
+
+    def __init__(self, path, volume_size):
+        if volume_size <= 0:
+            raise ValueError("分卷大小必须大于 0")
+        self.name = path
+        self.volume_size = volume_size
+        self.count = 0  # 已创建的分卷数
+        self._pos = 0
+        self._size = 0
+        self._index = None
+        self._fp = None
+
+    def writable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"无效的位置: {offset}")
+        self._pos = offset
+        return offset
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        if self._pos >= self._size or not len(view):
+            return 0
+        index, offset = divmod(self._pos, self.volume_size)
+        fp = self._volume(index)
+        fp.seek(offset)
+        nbytes = min(len(view), self.volume_size - offset, self._size - self._pos)
+        nbytes = fp.readinto(view[:nbytes])
+        self._pos += nbytes
+        return nbytes
+
+    def _volume(self, index):
+        # 切换到第 index 个分卷 (从 0 开始)，之前的分卷都已存在
+        if index != self._index:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+            while self.count < index:
+                # 跳过了整个分卷 (只在 seek 越过末尾时发生)，补齐为空洞
+                with open(volume_path(self.name, self.count + 1), "wb") as fp:
+                    fp.truncate(self.volume_size)
+                self.count += 1
+            path = volume_path(self.name, index + 1)
+            if index < self.count:
+                self._fp = open(path, "r+b")
+            else:
+                self._fp = open(path, "w+b")
+                self.count += 1
+            self._index = index
+        return self._fp
+
+    def write(self, data):
+        view = memoryview(data).cast("B")
+        written = 0
+        while written < len(view):
+            index, offset = divmod(self._pos, self.volume_size)
+            fp = self._volume(index)
+            if fp.tell() != offset:
+                fp.seek(offset)
+            nbytes = min(len(view) - written, self.volume_size - offset)
+            fp.write(view[written : written + nbytes])
+            written += nbytes
+            self._pos += nbytes
+        self._size = max(self._size, self._pos)
+        return written
+
+    def flush(self):
+        if self._fp is not None:
+            self._fp.flush()
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        elif not self.closed and self.count == 0:
+            # 没有写入任何数据时也生成第一个分卷，使结果总是可以按 .001 打开
+            open(volume_path(self.name, 1), "wb").close()
+            self.count = 1
+        super().close()
+
+
+class VolumeReader(io.RawIOBase):
+    """把按顺序排列的分卷当作一个连续的只读文件"""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self.name = self.paths[0]
+        self._starts = []
+        total = 0
+        for part in self.paths:
+            self._starts.append(total)
+            total += os.path.getsize(part)
+        self._size = total
+        self._pos = 0
+        self._index = None
+        self._fp = None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"无效的位置: {offset}")
+        self._pos = offset
+        return offset
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        if self._pos >= self._size or not len(view):
+            return 0
+        # 找到当前位置所在的分卷；顺序读取时总是当前分卷或下一个
+        index = self._index
+        if index is None or not (
+            self._starts[index] <= self._pos < self._starts[index] + self._length(index)
+        ):
+            index = next(
+                i
+                for i in range(len(self.paths) - 1, -1, -1)
+                if self._starts[i] <= self._pos
+            )
+            if self._fp is not None:
+                self._fp.close()
+            self._fp = open(self.paths[index], "rb", buffering=0)
+            self._index = index
+        offset = self._pos - self._starts[index]
+        nbytes = min(len(view), self._length(index) - offset)
+        self._fp.seek(offset)
+        nbytes = self._fp.readinto(view[:nbytes])
+        if not nbytes:
+            raise EOFError(f"分卷 {self.paths[index]} 在读取期间被截断")
+        self._pos += nbytes
+        return nbytes
+
+    def _length(self, index):
+        end = self._starts[index + 1] if index + 1 < len(self._starts) else self._size
+        return end - self._starts[index]
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        super().close()
+
+
+def open_archive(path):
+    """以二进制方式打开压缩包用于读取；分卷时返回跨越所有分卷的连续文件对象"""
+    if is_volume(path):
+        return io.BufferedReader(VolumeReader(volume_set(path)))
+    return open(path, "rb")
+
+
+class _VolumeZipFile(zipfile.ZipFile):
+    # ZipFile 不会关闭外部传入的文件对象，这里在关闭时一并关闭分卷
+    def __init__(self, path):
+        self._volumes = open_archive(path)
+        try:
+            super().__init__(self._volumes)
+        except BaseException:
+            self._volumes.close()
+            raise
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._volumes.close()
+
+
+def open_zip(path) -> zipfile.ZipFile:
+    """只读打开 zip 压缩包，支持分卷"""
+    if is_volume(path):
+        return _VolumeZipFile(path)
+    return zipfile.ZipFile(path)
+
+
+def is_zip_archive(path) -> bool:
+    """zipfile.is_zipfile 的扩展版本，支持分卷"""
+    if not is_volume(path):
+        return zipfile.is_zipfile(path)
+    with suppress(OSError), open_archive(path) as fp:
+        return zipfile.is_zipfile(fp)
+    return False
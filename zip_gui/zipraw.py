@@ -0,0 +1,288 @@
+# 预压缩 zip 条目: 在任意线程中把文件压缩为原始数据流，再按顺序追加到 ZipFile。
+# zlib/bz2/lzma 在压缩时都会释放 GIL，因此用线程池即可占满多个 CPU 核心。
+
+import bz2
+import lzma
+import struct
+import tempfile
+import zipfile
+import zlib
+from dataclasses import dataclass
+
+from . import fastcodecs, fastio
+from .telemetry import NULL_TELEMETRY, PHASE_COMPRESS, PHASE_READ
+from .volumes import open_archive
+
+# 单个条目在内存中最多缓存 8 MB 压缩数据，超出部分落盘到临时文件
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+_LZMA_FLAG = 0x02  # zip 规范: LZMA 条目使用 EOS 标记
+
+# zip 规范 (APPNOTE 6.3.7) 中 Zstandard 的方法编号；zipfile 在 Python 3.14 之前不支持读写
+ZIP_ZSTD = 93
+_ZIP_ZSTD_VERSION = 63  # 解压所需的最低版本
+_NATIVE_ZSTD = getattr(zipfile, "ZIP_ZSTANDARD", None) == ZIP_ZSTD
+
+# 本地文件头中文件名长度和扩展字段长度的位置
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+
+
+class _LZMACompressor(zipfile.LZMACompressor):
+    """zipfile.LZMACompressor 总是使用默认预设，这里允许指定 0-9 的预设级别"""
+
+    def __init__(self, preset):
+        super().__init__()
+        self._preset = preset
+
+    def _init(self):
+        props = lzma._encode_filter_properties(
+            {"id": lzma.FILTER_LZMA1, "preset": self._preset}
+        )
+        self._comp = lzma.LZMACompressor(
+            lzma.FORMAT_RAW,
+            filters=[lzma._decode_filter_properties(lzma.FILTER_LZMA1, props)],
+        )
+        return struct.pack("<BBH", 9, 4, len(props)) + props
+
+
+@dataclass
+class CompressedEntry:
+    zinfo: zipfile.ZipInfo
+    payload: object  # 可读的二进制文件对象，内容为压缩后的原始数据
+    from_cache: bool = False  # payload 是否直接来自压缩缓存
+
+
+def new_compressor(compress_type, level=None):
+    """返回带 compress()/flush() 的压缩器；存储模式返回 None"""
+    if compress_type == zipfile.ZIP_STORED:
+        return None
+    if compress_type == zipfile.ZIP_DEFLATED:
+        if level is None:
+            level = zlib.Z_DEFAULT_COMPRESSION
+        return zlib.compressobj(level, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(9 if level is None else level)
+    if compress_type == zipfile.ZIP_LZMA:
+        if level is None:
+            return zipfile.LZMACompressor()
+        return _LZMACompressor(level)
+    if compress_type == ZIP_ZSTD:
+        return fastcodecs.zstd_compressor(level).compressobj()
+    raise NotImplementedError(f"不支持的 zip 压缩方法: {compress_type}")
+
+
+def compress_file(
+    path,
+    zinfo,
+    compress_type,
+    level=None,
+    chunk_size=1024 * 1024,
+    on_read=None,
+    spool_dir=None,
+    digest=None,
+    telemetry=NULL_TELEMETRY,
+) -> CompressedEntry:
+    """
+    读取 path 并压缩为 zinfo 对应的原始数据流，同时计算 CRC-32 和大小。
+    on_read(nbytes) 在每读入一块数据后调用，可用于汇报进度。
+    digest (hashlib 对象) 如提供，会用读入的原始数据更新，便于确认压缩的正是预期的内容。
+    存储方式不复制数据: payload 就是源文件本身，由 write_raw_entry 在内核中直接复制。
+    telemetry (Telemetry) 分别记录读取和压缩 (含校验和) 的耗时。
+    """
+    compressor = new_compressor(compress_type, level)
+    payload = None
+    if compressor is not None:
+        payload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, dir=spool_dir)
+    crc = 0
+    file_size = 0
+    # 大文件经 mmap 读取，各块以 memoryview 直接交给 crc32 和压缩器，不产生中间副本
+    for chunk in telemetry.timed(PHASE_READ, fastio.iter_chunks(path, chunk_size)):
+        with telemetry.timer(PHASE_COMPRESS):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            if compressor is not None:
+                payload.write(compressor.compress(chunk))
+        if on_read is not None:
+            on_read(len(chunk))
+    if compressor is not None:
+        with telemetry.timer(PHASE_COMPRESS):
+            payload.write(compressor.flush())
+        compress_size = payload.tell()
+        payload.seek(0)
+    else:
+        # 文件在计算 CRC 之后被截断时，write_raw_entry 会发现数据不足而报错
+        payload = open(path, "rb")
+        compress_size = file_size
+
+    set_compress_type(zinfo, compress_type)
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = compress_size
+    return CompressedEntry(zinfo, payload)
+
+
+def set_compress_type(zinfo, compress_type):
+    """
+    设置条目的压缩方法以及该方法要求的标志位和解压所需版本。
+    不经 compress_file、直接复用压缩数据的条目 (缓存命中等) 也要调用，写出的头部才与新压缩的一致。
+    """
+    zinfo.compress_type = compress_type
+    if compress_type == zipfile.ZIP_LZMA:
+        zinfo.flag_bits |= _LZMA_FLAG
+    if compress_type == ZIP_ZSTD:
+        zinfo.extract_version = max(zinfo.extract_version, _ZIP_ZSTD_VERSION)
+
+
+def write_raw_entry(zf, zinfo, payload, chunk_size=1024 * 1024):
+    """
+    把已压缩的数据追加到以 "w" 模式打开的 zf 中。
+    zinfo 的 CRC、compress_size、file_size 和 compress_type 必须已经正确设置。
+    payload 是普通文件 (源文件、缓存对象、旧压缩包中的条目) 时由内核直接复制。
+    """
+    zinfo.header_offset = zf.fp.tell()
+    zf.fp.write(zinfo.FileHeader())
+    copied = fastio.copy_file(payload, zf.fp, zinfo.compress_size, chunk_size)
+    if copied != zinfo.compress_size:
+        raise OSError(
+            f"条目 {zinfo.filename} 的数据不完整，源文件可能在打包过程中被修改"
+        )
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+
+
+class _WrittenRange:
+    """读取正在写入的压缩包中已经写好的一段数据；每次读取后把位置移回原来的写入点"""
+
+    def __init__(self, fp, offset, size):
+        self.fp = fp
+        self.offset = offset
+        self.remaining = size
+
+    def readinto(self, buffer):
+        want = min(len(buffer), self.remaining)
+        if not want:
+            return 0
+        end = self.fp.tell()
+        self.fp.seek(self.offset)
+        nbytes = self.fp.readinto(memoryview(buffer)[:want])
+        self.fp.seek(end)
+        self.offset += nbytes
+        self.remaining -= nbytes
+        return nbytes
+
+
+def copy_written_entry(zf, original, zinfo, chunk_size=1024 * 1024):
+    """
+    把 zf 中已经写入的 original 条目的压缩数据再追加一份，作为新条目 zinfo (内容相同的文件)，
+    不重新读取和压缩源文件。zf 的文件对象必须同时可读 (例如以 "w+b" 打开)。
+    """
+    end = zf.fp.tell()
+    _seek_entry_data(zf.fp, original)
+    offset = zf.fp.tell()
+    zf.fp.seek(end)
+    zinfo.compress_type = original.compress_type
+    zinfo.flag_bits |= original.flag_bits & _LZMA_FLAG
+    zinfo.extract_version = max(zinfo.extract_version, original.extract_version)
+    zinfo.CRC = original.CRC
+    zinfo.compress_size = original.compress_size
+    zinfo.file_size = original.file_size
+    payload = _WrittenRange(zf.fp, offset, original.compress_size)
+    write_raw_entry(zf, zinfo, payload, chunk_size)
+
+
+class _RawReader(fastio.FileRange):
+    """只读取 size 字节的文件对象，用于把旧条目的压缩数据交给 write_raw_entry"""
+
+    def truncated(self):
+        raise zipfile.BadZipFile("压缩包被截断")
+
+
+def _seek_entry_data(fp, zinfo):
+    # 跳过本地文件头，定位到条目压缩数据的起始位置
+    fp.seek(zinfo.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader:
+        raise zipfile.BadZipFile("压缩包被截断")
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    if fields[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"条目 {zinfo.filename} 的本地文件头无效")
+    fp.seek(fields[_FH_FILENAME_LENGTH] + fields[_FH_EXTRA_FIELD_LENGTH], 1)
+
+
+def open_raw_entry(fp, zinfo):
+    """
+    返回读取已有 zip 中 zinfo 条目原始压缩数据的文件对象 (不解压)。
+    fp 为该 zip 的二进制文件句柄，读取期间不能被其他代码移动位置。
+    """
+    _seek_entry_data(fp, zinfo)
+    return _RawReader(fp, zinfo.compress_size)
+
+
+class _CheckedReader:
+    """解压 zipfile 不支持的条目 (zstd)，读到末尾时与 ZipExtFile 一样校验大小和 CRC-32"""
+
+    def __init__(self, stream, zinfo):
+        self.stream = stream
+        self.zinfo = zinfo
+        self._crc = 0
+        self._size = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        if data:
+            self._crc = zlib.crc32(data, self._crc)
+            self._size += len(data)
+        elif size != 0 and (
+            self._crc != self.zinfo.CRC or self._size != self.zinfo.file_size
+        ):
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {self.zinfo.filename!r}")
+        return data
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_member(zf, zinfo):
+    """
+    zf.open(zinfo) 的替代，额外支持 zstd 条目; zf 为 ZipFile 或 MemberReader。
+    zstd 条目直接从 zf.fp 读取，读取期间同一个 zf 不能再打开其他条目。
+    """
+    if zinfo.compress_type != ZIP_ZSTD or _NATIVE_ZSTD:
+        return zf.open(zinfo)
+    raw = open_raw_entry(zf.fp, zinfo)
+    return _CheckedReader(fastcodecs.zstd_reader(raw), zinfo)
+
+
+class MemberReader:
+    """
+    不解析整个中央目录，直接按 ZipInfo 记录的偏移读取条目，接口与 ZipFile.open() 相同。
+    配合 archive_index.select_zip_infos 使用: 只需为选中的条目创建 ZipInfo。
+    同一个实例只能在一个线程中使用，并且一次只能打开一个条目。
+    """
+
+    def __init__(self, archive_file):
+        self.fp = open_archive(archive_file)
+
+    def open(self, zinfo):
+        _seek_entry_data(self.fp, zinfo)
+        # ZipExtFile 负责解压和 CRC-32 校验
+        return zipfile.ZipExtFile(self.fp, "r", zinfo)
+
+    def close(self):
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()